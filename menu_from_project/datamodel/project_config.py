@@ -1,5 +1,5 @@
 # standard
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from typing import Any, List, Optional
 
 # PyQGIS
@@ -9,6 +9,26 @@ from qgis.core import (
 )
 
 
+def slotted(cls):
+    """Recreate a dataclass with __slots__, so that instances have no __dict__.
+    Same as dataclass slots option, only available since Python 3.10.
+
+    :param cls: dataclass
+    :type cls: type
+    :return: dataclass with slots
+    :rtype: type
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in field_names + ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = field_names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@slotted
 @dataclass
 class MenuLayerConfig:
     """Class to store configuration for layer menu creation"""
@@ -27,8 +47,11 @@ class MenuLayerConfig:
     abstract: str
     title: str
     geometry_type: Optional[QgsWkbTypes.GeometryType] = None
+    # key of metadata store when metadata (titles, abstracts, notes) are not loaded
+    metadata_key: Optional[str] = field(default=None, compare=False)
 
 
+@slotted
 @dataclass
 class MenuGroupConfig:
     """Class to store configuration for group menu creation"""
@@ -38,23 +61,8 @@ class MenuGroupConfig:
     childs: List[Any]  # List of Union[MenuLayerConfig,MenuGroupConfig]
     embedded: bool
 
-    @classmethod
-    def from_json(cls, data):
-        childs = []
-        for child in data["childs"]:
-            if "childs" in child:
-                childs.append(cls.from_json(child))
-            else:
-                childs.append(MenuLayerConfig(**child))
-        res = cls(
-            name=data["name"],
-            filename=data["filename"],
-            embedded=data["embedded"],
-            childs=childs,
-        )
-        return res
-
 
+@slotted
 @dataclass
 class MenuProjectConfig:
     """Class to store configuration for project menu creation"""
@@ -63,22 +71,3 @@ class MenuProjectConfig:
     filename: str
     uri: str
     root_group: MenuGroupConfig
-
-    @classmethod
-    def from_json(cls, data):
-        """
-        Define User from json data
-
-        Args:
-            data: json data
-
-        Returns: User
-
-        """
-        res = cls(
-            filename=data["filename"],
-            uri=data["uri"],
-            project_name=data["project_name"],
-            root_group=MenuGroupConfig.from_json(data["root_group"]),
-        )
-        return res
@@ -1,43 +1,110 @@
 # standard
-from dataclasses import asdict
-import json
+import hashlib
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 # project
 from menu_from_project.datamodel.project_config import MenuProjectConfig
+from menu_from_project.logic.config_codec import (
+    decode_project_config,
+    dumps_cache_data,
+    encode_project_config,
+    encode_project_metadata,
+    loads_cache_data,
+)
+from menu_from_project.logic.file_utils import write_file_atomically
+from menu_from_project.logic.fingerprint import (
+    get_embedded_filenames,
+    is_project_fingerprint_valid,
+)
+from menu_from_project.logic.layer_recipe import RECIPES_SUFFIX, LayerRecipeStore
+
+# cache index of all projects, in the cache directory
+CACHE_INDEX_FILENAME = "index.bin"
+# layer metadata stores, one per project, in the cache directory
+METADATA_FOLDER = "metadata"
 
 
 class CacheManager:
     """Manager to get information from cached data
 
+    Cached data of all projects are stored in a single index file, read once and
+    shared by all managers. The file is replaced atomically when a project is saved.
+    Layer metadata are stored in a separate file per project, read when a layer
+    metadata is needed.
+
     :param iface: QGIS iface
     :type iface: QgsInterface
     """
 
+    # (modification time of index file, cached data by project key)
+    _index: Optional[Tuple[Optional[int], Dict[str, Any]]] = None
+    _index_lock = threading.Lock()
+    # layer metadata by metadata key, for stores already read
+    _metadata: Dict[str, Dict[Tuple[str, str], Tuple]] = {}
+
     def __init__(self, iface) -> None:
         self.iface = iface
 
     def get_project_menu_config(
-        self, project: Dict[str, str]
+        self, project: Dict[str, str], check_fingerprint: bool = True
     ) -> Optional[MenuProjectConfig]:
-        """Get menu project configuration from cache for a project
+        """Get menu project configuration from cache for a project.
+        Layer metadata are not loaded, see get_layer_metadata.
 
         :param project: dict of information about the project
         :type project: Dict[str, str]
+        :param check_fingerprint: check that project sources did not change since
+        the configuration was cached, defaults to True
+        :type check_fingerprint: bool, optional
         :return: menu project configuration from cache, None if no cache available
+        or if project sources changed
         :rtype: Optional[MenuProjectConfig]
         """
-        cache_path = self.get_project_cache_dir(project)
-        json_cache_path = cache_path / "project_config.json"
-        if json_cache_path.exists():
-            with open(json_cache_path, "r", encoding="UTF-8") as f:
-                data = json.load(f)
-                return MenuProjectConfig.from_json(data)
-        return None
+        data = self._read_project_cache_data(project)
+        if data is None:
+            return None
+        if check_fingerprint and not is_project_fingerprint_valid(
+            project["file"], data.get("fingerprint")
+        ):
+            return None
+        return decode_project_config(
+            data["config"], data.get("metadata_key", self.get_project_key(project))
+        )
+
+    def is_project_menu_config_valid(self, project: Dict[str, str]) -> bool:
+        """Check if cached menu project configuration is still up to date,
+        without reading the configuration itself
+
+        :param project: dict of information about the project
+        :type project: Dict[str, str]
+        :return: True if a cached configuration exists and project sources did not change
+        :rtype: bool
+        """
+        data = self._read_project_cache_data(project)
+        if data is None:
+            return False
+        return is_project_fingerprint_valid(project["file"], data.get("fingerprint"))
+
+    def _read_project_cache_data(
+        self, project: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """Read cached data of a project
+
+        :param project: dict of information about the project
+        :type project: Dict[str, str]
+        :return: cached data, None if no cache available
+        :rtype: Optional[Dict[str, Any]]
+        """
+        with self._index_lock:
+            return self._load_index().get(self.get_project_key(project))
 
     def save_project_menu_config(
-        self, project: Dict[str, str], project_config: MenuProjectConfig
+        self,
+        project: Dict[str, str],
+        project_config: MenuProjectConfig,
+        fingerprint: Optional[Dict[str, Any]] = None,
     ) -> None:
         """Save menu project configuration in cache
 
@@ -45,32 +112,242 @@ class CacheManager:
         :type project: Dict[str, str]
         :param project_config: menu project configuration
         :type project_config: MenuProjectConfig
+        :param fingerprint: fingerprint of project sources used to check cache validity,
+        defaults to None
+        :type fingerprint: Optional[Dict[str, Any]], optional
         """
-        cache_path = self.get_project_cache_dir(project)
-        json_cache_path = cache_path / "project_config.json"
+        key = self.get_project_key(project)
+        data = {
+            "fingerprint": fingerprint,
+            "config": encode_project_config(project_config),
+            # metadata store key, kept when the project is renamed
+            "metadata_key": key,
+            # project files read, with layer load recipes
+            "files": sorted(
+                get_embedded_filenames(project_config.root_group).union(
+                    [project_config.filename]
+                )
+            ),
+        }
+        with self._index_lock:
+            write_file_atomically(
+                self.get_metadata_path(key),
+                dumps_cache_data(encode_project_metadata(project_config)),
+            )
+            CacheManager._metadata.pop(key, None)
+
+            # index may have been saved by another QGIS instance
+            projects = dict(self._load_index(reload_if_changed=True))
+            projects[key] = data
+            self._write_index(projects)
+
+    def rename_project(
+        self,
+        previous_project: Dict[str, str],
+        project: Dict[str, str],
+        project_config: MenuProjectConfig,
+    ) -> None:
+        """Move cached data of a renamed project to its new key. The metadata store
+        is kept, layers decoded before the rename still read their metadata.
+
+        :param previous_project: dict of information about the project before rename
+        :type previous_project: Dict[str, str]
+        :param project: dict of information about the renamed project
+        :type project: Dict[str, str]
+        :param project_config: menu project configuration with new project name
+        :type project_config: MenuProjectConfig
+        """
+        previous_key = self.get_project_key(previous_project)
+        with self._index_lock:
+            projects = dict(self._load_index(reload_if_changed=True))
+            data = projects.pop(previous_key, None)
+            if data is None:
+                return
+            projects[self.get_project_key(project)] = dict(
+                data,
+                config=encode_project_config(project_config),
+                metadata_key=data.get("metadata_key", previous_key),
+            )
+            self._write_index(projects)
+
+    def prune_projects(self, projects: List[Dict[str, str]]) -> None:
+        """Remove cached data of projects not in a project list: removed or renamed
+        projects. Their metadata stores are deleted, as well as layer load recipes of
+        project files not used by the remaining projects.
+
+        :param projects: list of dict of information about the configured projects
+        :type projects: List[Dict[str, str]]
+        """
+        keys = {self.get_project_key(project) for project in projects}
+        with self._index_lock:
+            index = self._load_index(reload_if_changed=True)
+            if not keys.issuperset(index):
+                index = {key: data for key, data in index.items() if key in keys}
+                self._write_index(index)
+
+            metadata_keys = {
+                data.get("metadata_key", key) for key, data in index.items()
+            }
+            self._prune_folder(
+                self.get_cache_dir() / METADATA_FOLDER,
+                "*.bin",
+                {self.get_metadata_path(key).name for key in metadata_keys},
+            )
+            for key in set(CacheManager._metadata).difference(metadata_keys):
+                del CacheManager._metadata[key]
+
+            # project files of projects not loaded yet are kept too
+            filenames = {project["file"] for project in projects}
+            for data in index.values():
+                filenames.update(data.get("files", ()))
+            recipe_store = LayerRecipeStore(self.get_layer_recipes_dir())
+            self._prune_folder(
+                recipe_store.folder,
+                f"*{RECIPES_SUFFIX}",
+                {recipe_store.get_recipes_path(name).name for name in filenames},
+            )
+
+    @staticmethod
+    def _prune_folder(folder: Path, pattern: str, kept_names: Iterable[str]) -> None:
+        """Delete files of a folder matching a pattern, except kept ones
+
+        :param folder: folder to prune, ignored if missing
+        :type folder: Path
+        :param pattern: glob pattern of files to delete
+        :type pattern: str
+        :param kept_names: names of files to keep
+        :type kept_names: Iterable[str]
+        """
+        if not folder.is_dir():
+            return
+        kept_names = set(kept_names)
+        for path in folder.glob(pattern):
+            if path.name not in kept_names:
+                path.unlink(missing_ok=True)
 
-        with open(json_cache_path, "w", encoding="UTF-8") as f:
-            json.dump(asdict(project_config), f, indent=4)
+    def get_layer_metadata(
+        self, metadata_key: str, filename: str, layer_id: str
+    ) -> Optional[Tuple[str, str, str, str, str]]:
+        """Get cached metadata of a layer, the metadata store of its project being read
+        on first use
+
+        :param metadata_key: key of metadata store, from layer menu configuration
+        :type metadata_key: str
+        :param filename: filename of the layer menu configuration
+        :type filename: str
+        :param layer_id: layer id
+        :type layer_id: str
+        :return: (metadata_abstract, metadata_title, layer_notes, abstract, title),
+        None if not available
+        :rtype: Optional[Tuple[str, str, str, str, str]]
+        """
+        with self._index_lock:
+            if metadata_key not in CacheManager._metadata:
+                try:
+                    content = self.get_metadata_path(metadata_key).read_bytes()
+                except OSError:
+                    content = b""
+                CacheManager._metadata[metadata_key] = loads_cache_data(content) or {}
+            return CacheManager._metadata[metadata_key].get((filename, layer_id))
+
+    def get_metadata_path(self, metadata_key: str) -> Path:
+        """Get path to the layer metadata store of a project
+
+        :param metadata_key: key of metadata store, project key in cache index when
+        the project was saved
+        :type metadata_key: str
+        :return: path to metadata store
+        :rtype: Path
+        """
+        name = hashlib.sha1(metadata_key.encode("UTF-8")).hexdigest()
+        return self.get_cache_dir() / METADATA_FOLDER / f"{name}.bin"
+
+    @staticmethod
+    def get_project_key(project: Dict[str, str]) -> str:
+        """Get key of a project in cache index
+
+        :param project: dict of information about the project
+        :type project: Dict[str, str]
+        :return: project key
+        :rtype: str
+        """
+        return f"{project['name']}|{project['file']}"
+
+    def _load_index(self, reload_if_changed: bool = False) -> Dict[str, Any]:
+        """Load cache index, read from file only once. Must be called with index lock.
+
+        :param reload_if_changed: read index file again if it changed since last
+        read, defaults to False
+        :type reload_if_changed: bool, optional
+        :return: cached data by project key
+        :rtype: Dict[str, Any]
+        """
+        if CacheManager._index is not None and not reload_if_changed:
+            return CacheManager._index[1]
+
+        index_path = self.get_cache_dir() / CACHE_INDEX_FILENAME
+        try:
+            mtime = index_path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if CacheManager._index is not None and CacheManager._index[0] == mtime:
+            return CacheManager._index[1]
+
+        projects = {}
+        if mtime is not None:
+            try:
+                content = index_path.read_bytes()
+            except OSError:
+                content = b""
+            # index written with another version is rebuilt
+            projects = loads_cache_data(content) or {}
+        CacheManager._index = mtime, projects
+        return projects
+
+    def _write_index(self, projects: Dict[str, Any]) -> None:
+        """Write cache index file, replaced atomically. Must be called with index lock.
+
+        :param projects: cached data by project key
+        :type projects: Dict[str, Any]
+        """
+        index_path = self.get_cache_dir() / CACHE_INDEX_FILENAME
+        write_file_atomically(index_path, dumps_cache_data(projects))
+        CacheManager._index = index_path.stat().st_mtime_ns, projects
+
+    def get_cache_dir(self) -> Path:
+        """Get local cache directory of project menu configurations
+
+        :return: path to cache directory
+        :rtype: Path
+        """
+        cache_path = Path(self.iface.userProfileManager().userProfile().folder())
+        return cache_path / ".cache" / "menu-layer"
 
     def get_project_cache_dir(self, project: Dict[str, str]) -> Path:
-        """Get local project cache directory
+        """Get local project cache directory, not created
 
         :param project: dict of information about the project
         :type project: Dict[str, str]
         :return: path to project cache directory
         :rtype: Path
         """
+        return self.get_cache_dir() / project["name"]
+
+    def get_layer_recipes_dir(self) -> Path:
+        """Get local directory of layer load recipes, shared by all projects
+
+        :return: path to layer load recipes directory
+        :rtype: Path
+        """
         cache_path = Path(self.iface.userProfileManager().userProfile().folder())
-        cache_path = cache_path / ".cache" / "menu-layer" / project["name"]
-        cache_path.mkdir(parents=True, exist_ok=True)
-        return cache_path
+        return cache_path / ".cache" / "menu-layer-recipes"
 
     def get_project_download_dir(self, project: Dict[str, str]) -> Path:
-        """Get local project cache download directory
+        """Get local project cache download directory, created if needed
 
         :param project: dict of information about the project
         :type project: Dict[str, str]
-        :return: path to project cache directory
+        :return: path to project download directory
         :rtype: Path
         """
         cache_path = self.get_project_cache_dir(project)
@@ -0,0 +1,299 @@
+#! python3  # noqa: E265
+
+"""
+    Compact binary encoding of project menu configurations, used by the cache index.
+
+    The structure of a configuration (names, ids, types, tree) is encoded into nested
+    tuples of integers, with a table of distinct strings. Layer metadata (titles,
+    abstracts, notes) are encoded separately, to be read only when needed.
+
+    Data are serialized with marshal. Files start with a header holding a magic
+    number, the schema version and the marshal version: a file written with another
+    version is ignored and the cache is rebuilt.
+"""
+
+# standard
+import marshal
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# PyQGIS
+from qgis.core import QgsMapLayerType, QgsWkbTypes
+
+# project
+from menu_from_project.datamodel.project_config import (
+    MenuGroupConfig,
+    MenuLayerConfig,
+    MenuProjectConfig,
+)
+
+# ############################################################################
+# ########## Globals ###############
+# ##################################
+
+CACHE_MAGIC = b"MFPC"
+# version of the encoded configuration structure, to increase on any change
+CACHE_SCHEMA_VERSION = 2
+_HEADER = struct.Struct("<4sHH")
+
+_GROUP_NODE = 0
+_LAYER_NODE = 1
+# encoded value of None enums
+_NO_ENUM = -1
+
+# ############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class _StringTable:
+    """Table of distinct strings of an encoded configuration"""
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._indexes: Dict[str, int] = {}
+
+    def index(self, value: str) -> int:
+        """Return index of a string, added to the table if needed
+
+        :param value: string
+        :type value: str
+        :return: index of the string in table
+        :rtype: int
+        """
+        index = self._indexes.get(value)
+        if index is None:
+            index = self._indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+# ############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def _encode_enum(value: Any) -> int:
+    """Encode an optional QGIS enum value as an integer
+
+    :param value: enum value or None
+    :type value: Any
+    :return: integer value, _NO_ENUM for None
+    :rtype: int
+    """
+    if value is None:
+        return _NO_ENUM
+    return int(getattr(value, "value", value))
+
+
+def _encode_node(node: Any, strings: _StringTable) -> Tuple:
+    """Encode a group or layer menu configuration
+
+    :param node: group or layer menu configuration
+    :type node: Union[MenuGroupConfig, MenuLayerConfig]
+    :param strings: string table of the encoded configuration
+    :type strings: _StringTable
+    :return: encoded node
+    :rtype: Tuple
+    """
+    if isinstance(node, MenuGroupConfig):
+        return (
+            _GROUP_NODE,
+            strings.index(node.name),
+            strings.index(node.filename),
+            bool(node.embedded),
+            tuple(_encode_node(child, strings) for child in node.childs),
+        )
+    return (
+        _LAYER_NODE,
+        strings.index(node.name),
+        strings.index(node.layer_id),
+        strings.index(node.filename),
+        bool(node.visible),
+        bool(node.expanded),
+        bool(node.embedded),
+        bool(node.is_spatial),
+        _encode_enum(node.layer_type),
+        _encode_enum(node.geometry_type),
+    )
+
+
+def _decode_node(data: Tuple, strings: Tuple[str, ...], metadata_key: str) -> Any:
+    """Decode a group or layer menu configuration, without layer metadata
+
+    :param data: encoded node
+    :type data: Tuple
+    :param strings: string table of the encoded configuration
+    :type strings: Tuple[str, ...]
+    :param metadata_key: key of metadata store of layers
+    :type metadata_key: str
+    :return: group or layer menu configuration
+    :rtype: Union[MenuGroupConfig, MenuLayerConfig]
+    """
+    if data[0] == _GROUP_NODE:
+        _, name, filename, embedded, childs = data
+        return MenuGroupConfig(
+            name=strings[name],
+            filename=sys.intern(strings[filename]),
+            embedded=embedded,
+            childs=[_decode_node(child, strings, metadata_key) for child in childs],
+        )
+
+    (
+        _,
+        name,
+        layer_id,
+        filename,
+        visible,
+        expanded,
+        embedded,
+        is_spatial,
+        layer_type,
+        geometry_type,
+    ) = data
+    return MenuLayerConfig(
+        name=strings[name],
+        layer_id=strings[layer_id],
+        filename=sys.intern(strings[filename]),
+        visible=visible,
+        expanded=expanded,
+        embedded=embedded,
+        is_spatial=is_spatial,
+        layer_type=None if layer_type == _NO_ENUM else QgsMapLayerType(layer_type),
+        metadata_abstract="",
+        metadata_title="",
+        layer_notes="",
+        abstract="",
+        title="",
+        geometry_type=(
+            None
+            if geometry_type == _NO_ENUM
+            else QgsWkbTypes.GeometryType(geometry_type)
+        ),
+        metadata_key=metadata_key,
+    )
+
+
+def encode_project_config(project_config: MenuProjectConfig) -> Tuple:
+    """Encode the structure of a project menu configuration into tuples, with a
+    string table. Layer metadata are not encoded.
+
+    :param project_config: project menu configuration
+    :type project_config: MenuProjectConfig
+    :return: encoded configuration: (string table, project name, filename, uri,
+    encoded root group)
+    :rtype: Tuple
+    """
+    strings = _StringTable()
+    project_name = strings.index(project_config.project_name)
+    filename = strings.index(project_config.filename)
+    uri = strings.index(project_config.uri)
+    root_group = _encode_node(project_config.root_group, strings)
+    return tuple(strings.strings), project_name, filename, uri, root_group
+
+
+def decode_project_config(data: Tuple, metadata_key: str) -> MenuProjectConfig:
+    """Decode a project menu configuration encoded by encode_project_config.
+    Layer metadata are not loaded: they must be read from the metadata store.
+
+    :param data: encoded configuration
+    :type data: Tuple
+    :param metadata_key: key of metadata store of layers
+    :type metadata_key: str
+    :return: project menu configuration
+    :rtype: MenuProjectConfig
+    """
+    strings, project_name, filename, uri, root_group = data
+    return MenuProjectConfig(
+        project_name=strings[project_name],
+        filename=strings[filename],
+        uri=strings[uri],
+        root_group=_decode_node(root_group, strings, metadata_key),
+    )
+
+
+def encode_project_metadata(
+    project_config: MenuProjectConfig,
+) -> Dict[Tuple[str, str], Tuple[str, str, str, str, str]]:
+    """Encode metadata of layers of a project menu configuration
+
+    :param project_config: project menu configuration
+    :type project_config: MenuProjectConfig
+    :return: (metadata_abstract, metadata_title, layer_notes, abstract, title) by
+    (filename, layer id)
+    :rtype: Dict[Tuple[str, str], Tuple[str, str, str, str, str]]
+    """
+    metadata = {}
+    groups = [project_config.root_group]
+    while groups:
+        for child in groups.pop().childs:
+            if isinstance(child, MenuGroupConfig):
+                groups.append(child)
+            else:
+                metadata[child.filename, child.layer_id] = (
+                    child.metadata_abstract,
+                    child.metadata_title,
+                    child.layer_notes,
+                    child.abstract,
+                    child.title,
+                )
+    return metadata
+
+
+def set_layer_metadata(
+    layer: MenuLayerConfig, metadata: Optional[Tuple[str, str, str, str, str]]
+) -> None:
+    """Set metadata of a layer menu configuration, read from metadata store
+
+    :param layer: layer menu configuration
+    :type layer: MenuLayerConfig
+    :param metadata: encoded metadata, None if not available
+    :type metadata: Optional[Tuple[str, str, str, str, str]]
+    """
+    if metadata is not None:
+        (
+            layer.metadata_abstract,
+            layer.metadata_title,
+            layer.layer_notes,
+            layer.abstract,
+            layer.title,
+        ) = metadata
+    layer.metadata_key = None
+
+
+def dumps_cache_data(data: Dict[Any, Any]) -> bytes:
+    """Serialize cache data (index, metadata store): header followed by marshal data
+
+    :param data: cached data, containing only marshal types
+    :type data: Dict[Any, Any]
+    :return: serialized data
+    :rtype: bytes
+    """
+    header = _HEADER.pack(CACHE_MAGIC, CACHE_SCHEMA_VERSION, marshal.version)
+    return header + marshal.dumps(data)
+
+
+def loads_cache_data(content: bytes) -> Optional[Dict[Any, Any]]:
+    """Deserialize cache data written by dumps_cache_data
+
+    :param content: serialized data
+    :type content: bytes
+    :return: cached data, None if content was written with another
+    version or is not valid
+    :rtype: Optional[Dict[Any, Any]]
+    """
+    if len(content) < _HEADER.size:
+        return None
+    magic, schema_version, marshal_version = _HEADER.unpack_from(content)
+    if (
+        magic != CACHE_MAGIC
+        or schema_version != CACHE_SCHEMA_VERSION
+        or marshal_version != marshal.version
+    ):
+        return None
+    try:
+        data = marshal.loads(content[_HEADER.size :])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
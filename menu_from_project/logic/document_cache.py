@@ -0,0 +1,119 @@
+#! python3  # noqa: E265
+
+"""
+    Least recently used cache of project documents, limited by an estimated size.
+"""
+
+# Standard library
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# ############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class DocumentCache:
+    """Least recently used cache of documents, with a budget in bytes.
+
+    The size of each document is estimated by the caller when it is stored. Least
+    recently used documents are evicted until the total size is within the budget,
+    the last stored document being always kept.
+
+    :param max_bytes: budget of the cache in bytes, defaults to None (no limit)
+    :type max_bytes: Optional[int], optional
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        self.max_bytes = max_bytes
+        # key: (value, estimated size)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value, marked as most recently used
+
+        :param key: key of the value
+        :type key: Hashable
+        :return: cached value, None if not cached
+        :rtype: Optional[Any]
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> List[Hashable]:
+        """Store a value and evict least recently used values over budget
+
+        :param key: key of the value
+        :type key: Hashable
+        :param value: value to store
+        :type value: Any
+        :param size: estimated size of the value in bytes
+        :type size: int
+        :return: keys of evicted values
+        :rtype: List[Hashable]
+        """
+        self.pop(key)
+        self._entries[key] = value, size
+        self.total_bytes += size
+
+        evicted = []
+        while (
+            self.max_bytes is not None
+            and self.total_bytes > self.max_bytes
+            and len(self._entries) > 1
+        ):
+            removed_key, (_, removed_size) = self._entries.popitem(last=False)
+            self.total_bytes -= removed_size
+            self.evictions += 1
+            evicted.append(removed_key)
+        return evicted
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove a value from the cache
+
+        :param key: key of the value
+        :type key: Hashable
+        :return: removed value, None if not cached
+        :rtype: Optional[Any]
+        """
+        if key not in self._entries:
+            return None
+        value, size = self._entries.pop(key)
+        self.total_bytes -= size
+        return value
+
+    def clear(self) -> None:
+        """Remove all values, counters are kept"""
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters
+
+        :return: number of documents, total size, hits, misses and evictions
+        :rtype: Dict[str, int]
+        """
+        return {
+            "documents": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
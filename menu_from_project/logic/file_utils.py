@@ -0,0 +1,48 @@
+#! python3  # noqa: E265
+
+"""
+    Atomic file writes, shared by cache, download and layer recipes files.
+
+    Files are written to a temporary file in the same folder, then moved to their
+    final path: readers, in this QGIS instance or another one, never see a partially
+    written file.
+"""
+
+# Standard library
+import os
+import threading
+from pathlib import Path
+
+# ############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def get_temporary_path(path: Path) -> Path:
+    """Get path of the temporary file used to write a file, unique per process and
+    thread
+
+    :param path: path to the file
+    :type path: Path
+    :return: path to the temporary file, in the same folder
+    :rtype: Path
+    """
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def write_file_atomically(path: Path, content: bytes) -> None:
+    """Write a file, replaced atomically. Parent folders are created if needed.
+
+    :param path: path to the file
+    :type path: Path
+    :param content: file content
+    :type content: bytes
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = get_temporary_path(path)
+    try:
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
@@ -0,0 +1,229 @@
+#! python3  # noqa: E265
+
+"""
+    Functions used to compute a fingerprint of QGIS project sources.
+
+    A fingerprint is cheap to compute compared to a project parsing and is used to
+    check if a cached project menu configuration is still up to date.
+"""
+
+# Standard library
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+# PyQGIS
+from qgis.core import QgsApplication, QgsBlockingNetworkRequest
+from qgis.PyQt.QtCore import Qt, QUrl
+from qgis.PyQt.QtNetwork import QNetworkRequest
+
+# project
+from menu_from_project.datamodel.project_config import MenuGroupConfig
+from menu_from_project.logic.tools import guess_type_from_uri
+
+# ############################################################################
+# ########## Globals ###############
+# ##################################
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 20
+
+# ############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def get_file_fingerprint(
+    filename: str, with_hash: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Return fingerprint of a local file: modification time, size and optional content hash
+
+    :param filename: path to the file
+    :type filename: str
+    :param with_hash: add a sha1 of file content, defaults to False
+    :type with_hash: bool, optional
+    :return: fingerprint, None if file is not available
+    :rtype: Optional[Dict[str, Any]]
+    """
+    try:
+        stat = Path(filename).stat()
+    except OSError:
+        return None
+
+    fingerprint = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+    if with_hash:
+        sha1 = hashlib.sha1()
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha1.update(chunk)
+        fingerprint["sha1"] = sha1.hexdigest()
+    return fingerprint
+
+
+def get_database_fingerprint(uri: str) -> Optional[Dict[str, Any]]:
+    """Return fingerprint of a QGIS project stored into a (PostgreSQL) database:
+    last modification date from project storage metadata
+
+    :param uri: connection string to QGIS project stored into a database.
+    :type uri: str
+    :return: fingerprint, None if metadata are not available
+    :rtype: Optional[Dict[str, Any]]
+    """
+    project_storage = QgsApplication.projectStorageRegistry().projectStorageFromUri(uri)
+    if project_storage is None:
+        return None
+    ok, metadata = project_storage.readProjectStorageMetadata(uri)
+    if not ok:
+        return None
+    return {"last_modified": metadata.lastModified.toString(Qt.ISODateWithMs)}
+
+
+def get_http_fingerprint(uri: str) -> Optional[Dict[str, Any]]:
+    """Return fingerprint of a QGIS project on a remote web server:
+    ETag and Last-Modified headers, read with a HEAD request
+
+    :param uri: web URL to the QGIS project
+    :type uri: str
+    :return: fingerprint, None if server is not available or does not send validators
+    :rtype: Optional[Dict[str, Any]]
+    """
+    request = QgsBlockingNetworkRequest()
+    if request.head(QNetworkRequest(QUrl(uri))) != QgsBlockingNetworkRequest.NoError:
+        return None
+
+    reply = request.reply()
+    etag = bytes(reply.rawHeader(b"ETag")).decode()
+    last_modified = bytes(reply.rawHeader(b"Last-Modified")).decode()
+    if not etag and not last_modified:
+        return None
+    return {"etag": etag, "last_modified": last_modified}
+
+
+def get_source_fingerprint(
+    uri: str, with_hash: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Return fingerprint of a QGIS project source, depending on storage type
+
+    :param uri: project uri (filepath, url or connection string)
+    :type uri: str
+    :param with_hash: add a sha1 of file content for local files, defaults to False
+    :type with_hash: bool, optional
+    :return: fingerprint, None if source is not available
+    :rtype: Optional[Dict[str, Any]]
+    """
+    qgs_storage_type = guess_type_from_uri(uri)
+    try:
+        if qgs_storage_type == "database":
+            return get_database_fingerprint(uri)
+        if qgs_storage_type == "http":
+            return get_http_fingerprint(uri)
+        return get_file_fingerprint(uri, with_hash)
+    except Exception as exc:
+        logger.warning(f"Fingerprint not available for {uri}: {exc}")
+        return None
+
+
+def get_embedded_filenames(group: MenuGroupConfig) -> Set[str]:
+    """Return filenames of all embedded projects used in a group menu configuration
+
+    :param group: group menu configuration
+    :type group: MenuGroupConfig
+    :return: embedded project filenames
+    :rtype: Set[str]
+    """
+    filenames = set()
+    for child in group.childs:
+        if child.embedded and child.filename:
+            filenames.add(child.filename)
+        if isinstance(child, MenuGroupConfig):
+            filenames |= get_embedded_filenames(child)
+    return filenames
+
+
+def get_project_fingerprint(
+    source_fingerprint: Optional[Dict[str, Any]],
+    embedded_filenames: Iterable[str],
+    with_hash: bool = False,
+) -> Dict[str, Any]:
+    """Return fingerprint of a project: fingerprint of its source and of each embedded project
+
+    :param source_fingerprint: fingerprint of project source, computed before project read
+    :type source_fingerprint: Optional[Dict[str, Any]]
+    :param embedded_filenames: filenames of embedded projects
+    :type embedded_filenames: Iterable[str]
+    :param with_hash: add a sha1 of file content for embedded projects, defaults to False
+    :type with_hash: bool, optional
+    :return: project fingerprint
+    :rtype: Dict[str, Any]
+    """
+    return {
+        "source": source_fingerprint,
+        "embedded": {
+            filename: get_file_fingerprint(filename, with_hash)
+            for filename in sorted(embedded_filenames)
+        },
+    }
+
+
+def is_file_fingerprint_valid(
+    filename: str, fingerprint: Optional[Dict[str, Any]]
+) -> bool:
+    """Check if a local file fingerprint still matches the file.
+    If modification time or size changed, content hash is compared when available.
+
+    :param filename: path to the file
+    :type filename: str
+    :param fingerprint: stored file fingerprint
+    :type fingerprint: Optional[Dict[str, Any]]
+    :return: True if fingerprint is valid
+    :rtype: bool
+    """
+    current = get_file_fingerprint(filename)
+    if fingerprint is None or current is None:
+        return fingerprint == current
+    if (
+        current["mtime"] == fingerprint["mtime"]
+        and current["size"] == fingerprint["size"]
+    ):
+        return True
+    if "sha1" in fingerprint and current["size"] == fingerprint["size"]:
+        return (
+            get_file_fingerprint(filename, with_hash=True)["sha1"]
+            == fingerprint["sha1"]
+        )
+    return False
+
+
+def is_project_fingerprint_valid(
+    uri: str, fingerprint: Optional[Dict[str, Any]]
+) -> bool:
+    """Check if a project fingerprint still matches its sources.
+
+    If a remote project source is not available (offline, server down), the fingerprint
+    is considered valid so that cached data can still be used.
+
+    :param uri: project uri (filepath, url or connection string)
+    :type uri: str
+    :param fingerprint: stored project fingerprint
+    :type fingerprint: Optional[Dict[str, Any]]
+    :return: True if fingerprint is valid, False if project must be read again
+    :rtype: bool
+    """
+    if not fingerprint or not fingerprint.get("source"):
+        return False
+
+    if guess_type_from_uri(uri) == "file":
+        if not is_file_fingerprint_valid(uri, fingerprint["source"]):
+            return False
+    else:
+        current_source = get_source_fingerprint(uri)
+        if current_source is not None and current_source != fingerprint["source"]:
+            return False
+
+    for filename, stored in fingerprint.get("embedded", {}).items():
+        if not is_file_fingerprint_valid(filename, stored):
+            return False
+
+    return True
@@ -1,6 +1,7 @@
 # Standard library
 import re
 import os
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 
@@ -16,6 +17,7 @@ from qgis.core import (
     QgsVectorTileLayer,
     QgsRelation,
     QgsLayerTreeGroup,
+    QgsLayerTreeLayer,
     QgsMapLayer,
 )
 from qgis.PyQt import QtXml
@@ -30,20 +32,27 @@ from qgis.PyQt.QtWidgets import QMenu, QWidget
 
 # project
 from menu_from_project.__about__ import __title__
+from menu_from_project.datamodel.project_config import MenuLayerConfig
 from menu_from_project.logic.qgs_manager import (
     QgsDomManager,
     is_absolute,
     project_trusted,
 )
-from menu_from_project.logic.xml_utils import getFirstChildByTagNameValue
+from menu_from_project.logic.relation_index import RelationIndex
 
 
 class LayerLoad:
 
-    def __init__(self) -> None:
+    def __init__(self, layer_recipes_folder: Optional[Path] = None) -> None:
         self.canvas = iface.mapCanvas()
         self.plg_settings = PlgOptionsManager()
-        self.qgs_dom_manager = QgsDomManager()
+        # documents are kept between loads, documents of changed projects are
+        # forgotten when menus are updated
+        cache_size = self.plg_settings.get_plg_settings().document_cache_size
+        self.qgs_dom_manager = QgsDomManager(
+            max_document_bytes=cache_size * 1024 * 1024,
+            layer_recipes_folder=layer_recipes_folder,
+        )
         self.mapLayerIds = {}
 
     @staticmethod
@@ -74,6 +83,7 @@ class LayerLoad:
          If layer has any relations and link layer option is enabled, a list of relation dict is defined
 
         :param uri: path to QgsProject file. Needed for relative project path resolve
+        and maplayer lookup
         :type uri: str
         :param doc: The QGIS project as XML document.
         :type doc: QtXml.QDomDocument
@@ -92,95 +102,132 @@ class LayerLoad:
         :return: created QgsMapLayer, list of relation dict
         :rtype: Tuple[Optional[QgsMapLayer], Optional[List[Dict[str, str]]]]
         """
-        theLayer = None
-
         settings = self.plg_settings.get_plg_settings()
 
         # is project in relative path ?
         absolute = is_absolute(doc)
         trusted = project_trusted(doc)
 
-        node = getFirstChildByTagNameValue(
-            doc.documentElement(), "maplayer", "id", layerId
-        )
+        prepared = self.prepareLayerNode(uri, absolute, layerId, loop)
+        if prepared is None:
+            return None, None
+        node, newLayerId = prepared
+
+        # is relations exists ?
+        relationsToBuild = []
+        if settings.optionOpenLinks:
+            relationsToBuild = self.buildRelations(
+                uri, doc, layerId, newLayerId, group, parentsLoop, loop
+            )
+
+        # read modified layer node
+        newLayer = None
+        if settings.optionCreateGroup and group is not None:
+            theLayer = self.createLayer(node, trusted, loop)
+
+            # needed
+            newLayer = QgsProject.instance().addMapLayer(theLayer, False)
+            if newLayer is not None:
+                # add to group
+                treeNode = group.insertLayer(0, newLayer)
+                treeNode.setExpanded(expanded)
+                treeNode.setItemVisibilityChecked(visible)
+        else:
+            # create layer
+            ok = QgsProject.instance().readLayer(node)
+            if ok:
+                newLayer = QgsProject.instance().mapLayer(newLayerId)
+
+        return newLayer, relationsToBuild
+
+    def prepareLayerNode(
+        self, uri: str, absolute: bool, layerId: str, loop: int = 0
+    ) -> Optional[Tuple[QtXml.QDomNode, str]]:
+        """Copy the maplayer node of a layer, with a new layer id and a datasource
+        adapted to project path for relative paths.
+
+        :param uri: path to QgsProject file. Needed for relative project path resolve
+        and maplayer lookup
+        :type uri: str
+        :param absolute: True if project uses absolute paths
+        :type absolute: bool
+        :param layerId: id of layer (from XML document)
+        :type layerId: str
+        :param loop: integer to have indent when displaying log, defaults to 0
+        :type loop: int, optional
+        :return: maplayer node and new layer id, None if layer is not found
+        :rtype: Optional[Tuple[QtXml.QDomNode, str]]
+        """
+        node = self.qgs_dom_manager.getMapLayerDomFromQgs(uri, layerId)
+        if not node:
+            self.log("{} not found".format(layerId), indent=loop)
+            return None
+
         node = node.cloneNode()
-        if node:
-            idNode = node.namedItem("id")
-            layerType = node.toElement().attribute("type", "vector")
-            # give it a new id (for multiple import)
-            newLayerId = "L%s" % re.sub("[{}-]", "", QUuid.createUuid().toString())
-            self.mapLayerIds[newLayerId] = layerId
+        idNode = node.namedItem("id")
+        # give it a new id (for multiple import)
+        newLayerId = "L%s" % re.sub("[{}-]", "", QUuid.createUuid().toString())
+        self.mapLayerIds[newLayerId] = layerId
 
+        try:
+            idNode.firstChild().toText().setData(newLayerId)
+        except Exception:
+            pass
+
+        # if relative path, adapt datasource
+        if not absolute:
             try:
-                idNode.firstChild().toText().setData(newLayerId)
+                datasourceNode = node.namedItem("datasource")
+                ds = datasourceNode.firstChild().toText().data()
+                providerNode = node.namedItem("provider")
+                provider = providerNode.firstChild().toText().data()
+
+                if provider in ["ogr", "gdal"] and (ds.find(".") == 0):
+                    projectpath = QFileInfo(uri).path()
+                    newlayerpath = projectpath + "/" + ds
+                    datasourceNode.firstChild().toText().setData(newlayerpath)
             except Exception:
                 pass
 
-            # if relative path, adapt datasource
-            if not absolute:
-                try:
-                    datasourceNode = node.namedItem("datasource")
-                    ds = datasourceNode.firstChild().toText().data()
-                    providerNode = node.namedItem("provider")
-                    provider = providerNode.firstChild().toText().data()
-
-                    if provider in ["ogr", "gdal"] and (ds.find(".") == 0):
-                        projectpath = QFileInfo(uri).path()
-                        newlayerpath = projectpath + "/" + ds
-                        datasourceNode.firstChild().toText().setData(newlayerpath)
-                except Exception:
-                    pass
+        return node, newLayerId
 
-            # is relations exists ?
-            relationsToBuild = []
-            if settings.optionOpenLinks:
-                relationsToBuild = self.buildRelations(
-                    uri, doc, layerId, newLayerId, group, parentsLoop, loop
-                )
+    def createLayer(
+        self, node: QtXml.QDomNode, trusted: bool, loop: int = 0
+    ) -> QgsMapLayer:
+        """Create a layer from a maplayer node, without adding it to current QgsProject
 
-            # read modified layer node
-            newLayer = None
-            if settings.optionCreateGroup and group is not None:
-                if layerType == "raster":
-                    theLayer = QgsRasterLayer()
-                elif layerType == "vector-tile":
-                    theLayer = QgsVectorTileLayer()
-                else:
-                    theLayer = QgsVectorLayer()
-                    theLayer.setReadExtentFromXml(trusted)
-
-                theLayer.readLayerXml(node.toElement(), QgsReadWriteContext())
-
-                # Special process if the plugin "DB Style Manager" is installed
-                flag = "use_db_style_manager_in_custom_menu" in os.environ
-                if flag and "db-style-manager" in plugins:
-                    try:
-                        plugins["db-style-manager"].load_style_from_database(theLayer)
-                    except Exception:
-                        self.log(
-                            "DB-Style-Manager failed to load the style.",
-                            indent=loop,
-                        )
-
-                # needed
-                newLayer = QgsProject.instance().addMapLayer(theLayer, False)
-                if newLayer is not None:
-                    # add to group
-                    treeNode = group.insertLayer(0, newLayer)
-                    treeNode.setExpanded(expanded)
-                    treeNode.setItemVisibilityChecked(visible)
-            else:
-                # create layer
-                ok = QgsProject.instance().readLayer(node)
-                if ok:
-                    newLayer = QgsProject.instance().mapLayer(newLayerId)
+        :param node: maplayer node
+        :type node: QtXml.QDomNode
+        :param trusted: True if project is trusted, extent is then read from node
+        :type trusted: bool
+        :param loop: integer to have indent when displaying log, defaults to 0
+        :type loop: int, optional
+        :return: created layer
+        :rtype: QgsMapLayer
+        """
+        layerType = node.toElement().attribute("type", "vector")
+        if layerType == "raster":
+            theLayer = QgsRasterLayer()
+        elif layerType == "vector-tile":
+            theLayer = QgsVectorTileLayer()
+        else:
+            theLayer = QgsVectorLayer()
+            theLayer.setReadExtentFromXml(trusted)
 
-            return newLayer, relationsToBuild
+        theLayer.readLayerXml(node.toElement(), QgsReadWriteContext())
 
-        else:
-            self.log("{} not found".format(layerId), indent=loop)
+        # Special process if the plugin "DB Style Manager" is installed
+        flag = "use_db_style_manager_in_custom_menu" in os.environ
+        if flag and "db-style-manager" in plugins:
+            try:
+                plugins["db-style-manager"].load_style_from_database(theLayer)
+            except Exception:
+                self.log(
+                    "DB-Style-Manager failed to load the style.",
+                    indent=loop,
+                )
 
-        return None, None
+        return theLayer
 
     def getRelations(self, doc: QtXml.QDomDocument) -> List[Dict[str, str]]:
         """Load available relation from a QgsProject xml document.
@@ -232,41 +279,24 @@ class LayerLoad:
 
         return relations
 
-    def getRelationsForLayer(
-        self,
-        relations: List[Dict[str, str]],
-        source: Optional[str] = None,
-        target: Optional[str] = None,
-    ) -> List[Dict[str, str]]:
-        """Return relations dict list filtered from referencedLayer and/or referencingLayer.
-
-        :param relations: input relations dict list
-        :type relations: List[Dict[str, str]]
-        :param source: layer id for referencedLayer, defaults to None
-        :type source: Optional[str], optional
-        :param target: layer id for referencingLayer, defaults to None
-        :type target: Optional[str], optional
-        :return: _description_
-        :rtype: List[Dict[str, str]]
-        """
-
-        r = []
-        try:
-            for relation in relations:
-                if source is not None and source == relation["referencedLayer"]:
-                    r.append(relation)
+    def getRelationIndex(self, uri: str, doc: QtXml.QDomDocument) -> RelationIndex:
+        """Return the index of relations of a project, built once per document.
 
-                if target is not None and target == relation["referencingLayer"]:
-                    r.append(relation)
-        except Exception as e:
-            for m in e.args:
-                self.log(m)
-
-        return r
+        :param uri: The URI of the project.
+        :type uri: str
+        :param doc: The QGIS project as XML document.
+        :type doc: QtXml.QDomDocument
+        :return: relations index
+        :rtype: RelationIndex
+        """
+        relationIndexes = self.qgs_dom_manager.relation_indexes
+        if uri not in relationIndexes:
+            relationIndexes[uri] = RelationIndex(self.getRelations(doc))
+        return relationIndexes[uri]
 
     def fixForm(
         self,
-        doc: QtXml.QDomDocument,
+        uri: str,
         newLayerId: str,
         oldRelationId: str,
         newRelationId: str,
@@ -275,8 +305,8 @@ class LayerLoad:
 
         Principle: reading the source XML document, updating identifiers, updating editFormConfig
 
-        :param doc: The QGIS project as XML document.
-        :type doc: QtXml.QDomDocument
+        :param uri: path to QgsProject file of the source XML document
+        :type uri: str
         :param newLayerId: id of created new layer
         :type newLayerId: str
         :param oldRelationId: id of old relation
@@ -287,9 +317,7 @@ class LayerLoad:
         theLayer = QgsProject.instance().mapLayer(newLayerId)
         oldLayerId = self.mapLayerIds[newLayerId]
 
-        layerNode = getFirstChildByTagNameValue(
-            doc.documentElement(), "maplayer", "id", oldLayerId
-        )
+        layerNode = self.qgs_dom_manager.getMapLayerDomFromQgs(uri, oldLayerId)
 
         nodes = layerNode.toElement().elementsByTagName("attributeEditorForm")
         if nodes.count() == 0:
@@ -314,13 +342,11 @@ class LayerLoad:
                 editFormConfig.readXml(layerNode, QgsReadWriteContext())
                 theLayer.setEditFormConfig(editFormConfig)
 
-    def buildProjectRelation(
-        self, doc: QtXml.QDomDocument, relDict: Dict[str, str]
-    ) -> None:
+    def buildProjectRelation(self, uri: str, relDict: Dict[str, str]) -> None:
         """Build project relation and add it to QgsProject
 
-        :param doc: The QGIS project as XML document.
-        :type doc: QtXml.QDomDocument
+        :param uri: path to QgsProject file of the relation
+        :type uri: str
         :param relDict: relation dictionnary
         :type relDict: Dict[str, str]
         """
@@ -349,7 +375,7 @@ class LayerLoad:
                 # Adapter le formulaire de la couche referencedLayer
                 try:
                     self.fixForm(
-                        doc,
+                        uri,
                         relDict["referencedLayer"],
                         oldRelationId,
                         newRelationId,
@@ -400,9 +426,7 @@ class LayerLoad:
         """
         relationsToBuild, targetRelations = [], []
 
-        relations = self.getRelations(doc)
-        relsTarget = self.getRelationsForLayer(relations, source=oldLayerId)
-        # relsSource = self.getRelationsForLayer(relations, target=oldLayerId)
+        relsTarget = self.getRelationIndex(uri, doc).get_relations(source=oldLayerId)
 
         if len(relsTarget) > 0:
             for relDict in relsTarget:
@@ -435,11 +459,260 @@ class LayerLoad:
 
         return targetRelations + relationsToBuild
 
+    def getLayerTreeGroup(self, menu: Optional[QMenu]) -> Optional[QgsLayerTreeGroup]:
+        """Get layer tree group named after a menu, created if needed, when group
+        creation option is enabled
+
+        :param menu: QMenu where the action is located
+        :type menu: Optional[QMenu]
+        :return: layer tree group, None if layers are not added to a group
+        :rtype: Optional[QgsLayerTreeGroup]
+        """
+        settings = self.plg_settings.get_plg_settings()
+        if not (
+            menu
+            and isinstance(menu.parentWidget(), (QMenu, QWidget))
+            and settings.optionCreateGroup
+        ):
+            return None
+
+        groupName = menu.title().replace("&", "")
+        group = QgsProject.instance().layerTreeRoot().findGroup(groupName)
+        if group is None:
+            group = QgsProject.instance().layerTreeRoot().insertGroup(0, groupName)
+        return group
+
+    def addLinkedLayers(
+        self,
+        fileName: str,
+        uri: str,
+        doc: QtXml.QDomDocument,
+        layer: Optional[QgsMapLayer],
+        relationsToBuild: List[Dict[str, str]],
+        group: Optional[QgsLayerTreeGroup],
+    ) -> None:
+        """Build relations of a loaded layer and add its joined layers
+
+        :param fileName: path to QgsProject file
+        :type fileName: str
+        :param uri: path to QgsProject file. Needed for relative project path resolve
+        :type uri: str
+        :param doc: The QGIS project as XML document.
+        :type doc: QtXml.QDomDocument
+        :param layer: loaded layer
+        :type layer: Optional[QgsMapLayer]
+        :param relationsToBuild: list of relation dict to create
+        :type relationsToBuild: List[Dict[str, str]]
+        :param group: layer tree group where the layers are added
+        :type group: Optional[QgsLayerTreeGroup]
+        """
+        settings = self.plg_settings.get_plg_settings()
+
+        for relDict in relationsToBuild:
+            self.buildProjectRelation(fileName, relDict)
+
+        # is joined layers exists ?
+        if settings.optionOpenLinks and layer and isinstance(layer, QgsVectorLayer):
+            for j in layer.vectorJoins():
+                try:
+                    joinLayer, joinRelations = self.addLayer(
+                        uri, doc, j.joinLayerId(), group
+                    )
+                    for relDict in joinRelations:
+                        self.buildProjectRelation(fileName, relDict)
+
+                    if joinLayer:
+                        j.setJoinLayerId(joinLayer.id())
+                        j.setJoinLayer(joinLayer)
+                        layer.addJoin(j)
+                except Exception:
+                    self.log("Joined layer {} not added.".format(j.joinLayerId()))
+
+    def loadLayers(
+        self, layers: List[MenuLayerConfig], menu: Optional[QMenu] = None
+    ) -> None:
+        """Load several layers to current QgsProject in one pass ("Load all" option)
+
+        Each project document is read once. With a layer tree group, layers are added
+        to the project with a single call and inserted in the group in one pass. Map
+        canvas is refreshed once. Relations and joined layers are added afterwards.
+
+        :param layers: layer menu configurations, in menu order
+        :type layers: List[MenuLayerConfig]
+        :param menu: QMenu where the layers are located, defaults to None
+        :type menu: Optional[QMenu], optional
+        """
+        self.canvas.freeze(True)
+        self.canvas.setRenderFlag(False)
+        QgsApplication.setOverrideCursor(Qt.WaitCursor)
+        self.mapLayerIds = {}
+
+        try:
+            group = self.getLayerTreeGroup(menu)
+            projects = self.getLayersProjects(layers)
+            if group is None:
+                loadedLayers = self.readLayers(layers, projects)
+            else:
+                loadedLayers = self.addLayersToGroup(
+                    self.createLayers(layers, projects), group
+                )
+            self.addLoadedLinkedLayers(loadedLayers, projects, group)
+
+        except Exception as e:
+            for m in e.args:
+                self.log(m)
+
+        finally:
+            self.canvas.freeze(False)
+            self.canvas.setRenderFlag(True)
+            self.canvas.refresh()
+            QgsApplication.restoreOverrideCursor()
+
+    def getLayersProjects(
+        self, layers: List[MenuLayerConfig]
+    ) -> Dict[str, Tuple[QtXml.QDomDocument, bool, bool]]:
+        """Read documents of the projects of several layers, once per project file
+
+        :param layers: layer menu configurations
+        :type layers: List[MenuLayerConfig]
+        :return: document, absolute and trusted flags by project file
+        :rtype: Dict[str, Tuple[QtXml.QDomDocument, bool, bool]]
+        """
+        layerIds = {}
+        for layerConfig in layers:
+            layerIds.setdefault(layerConfig.filename, []).append(layerConfig.layer_id)
+
+        projects = {}
+        for fileName, fileLayerIds in layerIds.items():
+            doc, _ = self.qgs_dom_manager.getLayersQgsDoc(fileName, fileLayerIds)
+            projects[fileName] = (doc, is_absolute(doc), project_trusted(doc))
+        return projects
+
+    def readLayers(
+        self,
+        layers: List[MenuLayerConfig],
+        projects: Dict[str, Tuple[QtXml.QDomDocument, bool, bool]],
+    ) -> List[Tuple[MenuLayerConfig, Optional[QgsMapLayer]]]:
+        """Read layers with current QgsProject, one by one: layers are inserted in
+        layer tree at current insertion point
+
+        :param layers: layer menu configurations, in menu order
+        :type layers: List[MenuLayerConfig]
+        :param projects: document, absolute and trusted flags by project file
+        :type projects: Dict[str, Tuple[QtXml.QDomDocument, bool, bool]]
+        :return: layer menu configurations and loaded layers
+        :rtype: List[Tuple[MenuLayerConfig, Optional[QgsMapLayer]]]
+        """
+        loadedLayers = []
+        for layerConfig in layers:
+            absolute = projects[layerConfig.filename][1]
+            prepared = self.prepareLayerNode(
+                layerConfig.filename, absolute, layerConfig.layer_id
+            )
+            if prepared is None:
+                continue
+            node, newLayerId = prepared
+            if QgsProject.instance().readLayer(node):
+                loadedLayers.append(
+                    (layerConfig, QgsProject.instance().mapLayer(newLayerId))
+                )
+        return loadedLayers
+
+    def createLayers(
+        self,
+        layers: List[MenuLayerConfig],
+        projects: Dict[str, Tuple[QtXml.QDomDocument, bool, bool]],
+    ) -> List[Tuple[MenuLayerConfig, QgsMapLayer]]:
+        """Create layers, without adding them to current QgsProject
+
+        :param layers: layer menu configurations, in menu order
+        :type layers: List[MenuLayerConfig]
+        :param projects: document, absolute and trusted flags by project file
+        :type projects: Dict[str, Tuple[QtXml.QDomDocument, bool, bool]]
+        :return: layer menu configurations and created layers
+        :rtype: List[Tuple[MenuLayerConfig, QgsMapLayer]]
+        """
+        createdLayers = []
+        for layerConfig in layers:
+            _, absolute, trusted = projects[layerConfig.filename]
+            prepared = self.prepareLayerNode(
+                layerConfig.filename, absolute, layerConfig.layer_id
+            )
+            if prepared is not None:
+                createdLayers.append(
+                    (layerConfig, self.createLayer(prepared[0], trusted))
+                )
+        return createdLayers
+
+    def addLayersToGroup(
+        self,
+        createdLayers: List[Tuple[MenuLayerConfig, QgsMapLayer]],
+        group: QgsLayerTreeGroup,
+    ) -> List[Tuple[MenuLayerConfig, QgsMapLayer]]:
+        """Add created layers to current QgsProject with a single call, and insert
+        them at the top of a layer tree group, in menu order
+
+        :param createdLayers: layer menu configurations and created layers
+        :type createdLayers: List[Tuple[MenuLayerConfig, QgsMapLayer]]
+        :param group: layer tree group where the layers are inserted
+        :type group: QgsLayerTreeGroup
+        :return: layer menu configurations and layers added to the project
+        :rtype: List[Tuple[MenuLayerConfig, QgsMapLayer]]
+        """
+        addedLayers = QgsProject.instance().addMapLayers(
+            [layer for _, layer in createdLayers], False
+        )
+        addedIds = {layer.id() for layer in addedLayers}
+        loadedLayers = [
+            (layerConfig, layer)
+            for layerConfig, layer in createdLayers
+            if layer.id() in addedIds
+        ]
+
+        treeNodes = []
+        for layerConfig, layer in loadedLayers:
+            treeNode = QgsLayerTreeLayer(layer)
+            treeNode.setExpanded(layerConfig.expanded)
+            treeNode.setItemVisibilityChecked(layerConfig.visible)
+            treeNodes.append(treeNode)
+        group.insertChildNodes(0, treeNodes)
+        return loadedLayers
+
+    def addLoadedLinkedLayers(
+        self,
+        loadedLayers: List[Tuple[MenuLayerConfig, Optional[QgsMapLayer]]],
+        projects: Dict[str, Tuple[QtXml.QDomDocument, bool, bool]],
+        group: Optional[QgsLayerTreeGroup],
+    ) -> None:
+        """Build relations and add joined layers of loaded layers
+
+        :param loadedLayers: layer menu configurations and loaded layers
+        :type loadedLayers: List[Tuple[MenuLayerConfig, Optional[QgsMapLayer]]]
+        :param projects: document, absolute and trusted flags by project file
+        :type projects: Dict[str, Tuple[QtXml.QDomDocument, bool, bool]]
+        :param group: layer tree group where the layers are added
+        :type group: Optional[QgsLayerTreeGroup]
+        """
+        settings = self.plg_settings.get_plg_settings()
+        for layerConfig, layer in loadedLayers:
+            if layer is None:
+                continue
+            fileName = layerConfig.filename
+            doc = projects[fileName][0]
+            relationsToBuild = []
+            if settings.optionOpenLinks:
+                relationsToBuild = self.buildRelations(
+                    fileName, doc, layerConfig.layer_id, layer.id(), group, {}, 0
+                )
+            self.addLinkedLayers(
+                fileName, fileName, doc, layer, relationsToBuild, group
+            )
+
     def loadLayer(
         self,
-        uri: Optional[str],
-        fileName: Optional[str],
-        layerId: Optional[str],
+        uri: str,
+        fileName: str,
+        layerId: str,
         menu: Optional[QMenu] = None,
         visible: Optional[bool] = None,
         expanded: Optional[bool] = None,
@@ -447,11 +720,11 @@ class LayerLoad:
         """Load layer to current QgsProject
 
         :param uri: The layer URI (file path or PG URI)
-        :type uri: Optional[str]
-        :param fileName: path to QgsProject file, None for Load all option
-        :type fileName: Optional[str]
-        :param layerId: id of layer to load (from QgsProject file), None for Load all option
-        :type layerId: Optional[str]
+        :type uri: str
+        :param fileName: path to QgsProject file
+        :type fileName: str
+        :param layerId: id of layer to load (from QgsProject file)
+        :type layerId: str
         :param menu: QMenu where the action is located, defaults to None
         :type menu: Optional[QMenu], optional
         :param visible: define layer visibility in layer tree, defaults to None
@@ -461,66 +734,20 @@ class LayerLoad:
         """
         self.canvas.freeze(True)
         self.canvas.setRenderFlag(False)
-        group = None
         QgsApplication.setOverrideCursor(Qt.WaitCursor)
         self.mapLayerIds = {}
 
-        settings = self.plg_settings.get_plg_settings()
-
         try:
-            if (
-                menu
-                and isinstance(menu.parentWidget(), (QMenu, QWidget))
-                and settings.optionCreateGroup
-            ):
-                groupName = menu.title().replace("&", "")
-                group = QgsProject.instance().layerTreeRoot().findGroup(groupName)
-                if group is None:
-                    group = (
-                        QgsProject.instance().layerTreeRoot().insertGroup(0, groupName)
-                    )
-
-            # load all layers
-            if fileName is None and layerId is None and settings.optionLoadAll:
-                for action in menu.actions()[::-1]:
-                    if (
-                        action.text() != self.tr("Load all")
-                        and action.text() != "Load all"
-                    ):
-                        action.trigger()
-            else:
-                doc, _ = self.qgs_dom_manager.getQgsDoc(fileName)
-
-                # Loading layer
-                layer, relationsToBuild = self.addLayer(
-                    uri, doc, layerId, group, visible, expanded, {}, 0
-                )
-                for relDict in relationsToBuild:
-                    self.buildProjectRelation(doc, relDict)
-
-                # is joined layers exists ?
-                if (
-                    settings.optionOpenLinks
-                    and layer
-                    and isinstance(layer, QgsVectorLayer)
-                ):
-                    for j in layer.vectorJoins():
-                        try:
-                            joinLayer, joinRelations = self.addLayer(
-                                uri, doc, j.joinLayerId(), group
-                            )
-                            for relDict in joinRelations:
-                                self.buildProjectRelation(doc, relDict)
-
-                            if joinLayer:
-                                j.setJoinLayerId(joinLayer.id())
-                                j.setJoinLayer(joinLayer)
-                                layer.addJoin(j)
-                        except Exception as e:
-                            self.log(
-                                "Joined layer {} not added.".format(j.joinLayerId())
-                            )
-                            pass
+            group = self.getLayerTreeGroup(menu)
+            doc, _ = self.qgs_dom_manager.getLayersQgsDoc(fileName, [layerId])
+
+            # Loading layer
+            layer, relationsToBuild = self.addLayer(
+                uri, doc, layerId, group, visible, expanded, {}, 0
+            )
+            self.addLinkedLayers(
+                fileName, uri, doc, layer, relationsToBuild or [], group
+            )
 
         except Exception as e:
             # fixme fileName is not defined
@@ -0,0 +1,289 @@
+#! python3  # noqa: E265
+
+"""
+    Layer load recipes: positions or copies of the maplayer and relations elements of
+    projects.
+
+    Recipes are saved when projects are scanned to build the menu configuration, so
+    that a layer can later be loaded from a small XML document containing only this
+    layer and its linked layers, without reading its whole project again.
+
+    For .qgs files, only the position of elements in the file is stored. For other
+    projects (.qgz archives, downloaded projects), elements are copied. In both cases,
+    recipes are used only while the project file is unchanged.
+"""
+
+# Standard library
+import hashlib
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+# project
+from menu_from_project.logic.file_utils import get_temporary_path
+from menu_from_project.logic.project_scan import ScannedProject, scan_project
+
+# ############################################################################
+# ########## Globals ###############
+# ##################################
+
+RECIPES_SUFFIX = ".recipes"
+# version of the recipes index, recipes files of other versions are ignored
+RECIPES_VERSION = 2
+
+# size of the footer containing index offset, at the end of a recipes file
+_FOOTER_SIZE = 20
+
+_DOCUMENT_HEADER = b"<!DOCTYPE qgis PUBLIC 'http://mrcc.com/qgis.dtd' 'SYSTEM'>\n<qgis>"
+
+# ############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class LayerRecipeStore:
+    """Store of layer load recipes, with one recipes file per project file.
+
+    A recipes file contains the copied elements, if any, followed by a JSON index and
+    a footer with the index offset. Files are replaced atomically.
+
+    :param folder: folder where recipes files are stored
+    :type folder: Path
+    """
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+        # filename: (recipes file modification time, index)
+        self._indexes: Dict[str, tuple] = {}
+
+    def get_recipes_path(self, filename: str) -> Path:
+        """Get path to recipes file of a project file
+
+        :param filename: path to the project file
+        :type filename: str
+        :return: path to recipes file
+        :rtype: Path
+        """
+        key = hashlib.sha1(filename.encode("UTF-8")).hexdigest()
+        return self.folder / f"{key}{RECIPES_SUFFIX}"
+
+    def clear(self) -> None:
+        """Forget indexes read from recipes files"""
+        self._indexes.clear()
+
+    def scan_project(self, filename: str) -> ScannedProject:
+        """Scan a QGIS project file and save recipes of its layers
+
+        :param filename: path to the QGIS project file
+        :type filename: str
+        :return: scanned project
+        :rtype: ScannedProject
+        """
+        recipes_path = self.get_recipes_path(filename)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        tmp_path = get_temporary_path(recipes_path)
+
+        # elements of .qgs files are read from the file itself
+        located = Path(filename).suffix.lower() == ".qgs"
+        # recipes are outdated once the project file changed
+        stat = Path(filename).stat()
+        source = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+        try:
+            with open(tmp_path, "wb") as f:
+                if located:
+                    scan = scan_project(filename, locate_elements=True)
+                else:
+                    scan = scan_project(filename, copy_stream=f)
+                index_offset = f.tell()
+                index = self._create_index(filename, scan)
+                index["version"] = RECIPES_VERSION
+                index["located"] = located
+                index["source"] = source
+                f.write(json.dumps(index).encode())
+                f.write(f"{index_offset:0{_FOOTER_SIZE}d}".encode())
+            os.replace(tmp_path, recipes_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return scan
+
+    @staticmethod
+    def _create_index(filename: str, scan: ScannedProject) -> Dict[str, Any]:
+        """Create index of recipes of a scanned project
+
+        :param filename: path to the QGIS project file
+        :type filename: str
+        :param scan: scanned project, with copied or located elements
+        :type scan: ScannedProject
+        :return: recipes index
+        :rtype: Dict[str, Any]
+        """
+        links = {
+            layer_id: list(maplayer.joined_layer_ids)
+            for layer_id, maplayer in scan.maplayers.items()
+        }
+        # layers referencing a layer are loaded with it
+        for referenced, referencing in scan.relations:
+            if referenced in links and referencing:
+                links[referenced].append(referencing)
+
+        return {
+            "filename": filename,
+            "absolute": scan.absolute,
+            "trusted": scan.trusted,
+            "relations": [scan.relations_xml_offset, scan.relations_xml_length],
+            "layers": {
+                layer_id: [maplayer.xml_offset, maplayer.xml_length]
+                for layer_id, maplayer in scan.maplayers.items()
+                if maplayer.xml_offset >= 0
+            },
+            "links": links,
+        }
+
+    @staticmethod
+    def _is_source_unchanged(filename: str, index: Dict[str, Any]) -> bool:
+        """Check that a project file did not change since its recipes were saved
+
+        :param filename: path to the project file
+        :type filename: str
+        :param index: recipes index of the project file
+        :type index: Dict[str, Any]
+        :return: True if modification time and size of the file are unchanged
+        :rtype: bool
+        """
+        source = index.get("source")
+        try:
+            stat = Path(filename).stat()
+        except OSError:
+            return False
+        return (
+            source is not None
+            and stat.st_mtime_ns == source["mtime"]
+            and stat.st_size == source["size"]
+        )
+
+    def _get_index(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Get recipes index of a project file
+
+        :param filename: path to the project file
+        :type filename: str
+        :return: recipes index, None if no recipes are available or if the project
+        file changed since recipes were saved
+        :rtype: Optional[Dict[str, Any]]
+        """
+        recipes_path = self.get_recipes_path(filename)
+        try:
+            mtime = recipes_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        if filename in self._indexes and self._indexes[filename][0] == mtime:
+            index = self._indexes[filename][1]
+            return index if self._is_source_unchanged(filename, index) else None
+
+        try:
+            with open(recipes_path, "rb") as f:
+                f.seek(-_FOOTER_SIZE, os.SEEK_END)
+                index_offset = int(f.read(_FOOTER_SIZE))
+                f.seek(index_offset)
+                index = json.loads(f.read()[:-_FOOTER_SIZE])
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != RECIPES_VERSION or index.get("filename") != filename:
+            return None
+
+        self._indexes[filename] = mtime, index
+        return index if self._is_source_unchanged(filename, index) else None
+
+    def _open_data(self, filename: str, index: Dict[str, Any]) -> mmap.mmap:
+        """Map the file containing the elements of a project in memory:
+        the project file itself if elements were located, else the recipes file
+
+        :param filename: path to the project file
+        :type filename: str
+        :param index: recipes index of the project file
+        :type index: Dict[str, Any]
+        :raises ValueError: project file changed since recipes were saved
+        :return: memory map of the file, must be closed by caller
+        :rtype: mmap.mmap
+        """
+        if not self._is_source_unchanged(filename, index):
+            raise ValueError(f"{filename} changed since it was scanned")
+        if index.get("located"):
+            data_path = Path(filename)
+        else:
+            data_path = self.get_recipes_path(filename)
+
+        with open(data_path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_layer_ids(
+        self, filename: str, layer_ids: Iterable[str]
+    ) -> Optional[Set[str]]:
+        """Get ids of layers needed to load layers: layers, their joined layers and
+        layers referencing them in relations
+
+        :param filename: path to the project file
+        :type filename: str
+        :param layer_ids: ids of layers to load
+        :type layer_ids: Iterable[str]
+        :return: ids of needed layers, None if a layer to load has no recipe
+        :rtype: Optional[Set[str]]
+        """
+        index = self._get_index(filename)
+        if index is None:
+            return None
+
+        needed = set()
+        to_visit = list(layer_ids)
+        for layer_id in to_visit:
+            if layer_id not in index["layers"]:
+                return None
+        while to_visit:
+            layer_id = to_visit.pop()
+            if layer_id in needed or layer_id not in index["layers"]:
+                continue
+            needed.add(layer_id)
+            to_visit.extend(index["links"].get(layer_id, []))
+        return needed
+
+    def get_document_content(
+        self, filename: str, layer_ids: Iterable[str]
+    ) -> Optional[bytes]:
+        """Build a QGIS project document with some layers of a project file, its
+        project properties and its relations
+
+        :param filename: path to the project file
+        :type filename: str
+        :param layer_ids: ids of layers to add to the document
+        :type layer_ids: Iterable[str]
+        :return: document content, None if recipes are not available
+        :rtype: Optional[bytes]
+        """
+        index = self._get_index(filename)
+        if index is None:
+            return None
+
+        absolute = "true" if index["absolute"] else "false"
+        trusted = "1" if index["trusted"] else "0"
+        parts = [
+            _DOCUMENT_HEADER,
+            f'<properties><Paths><Absolute type="bool">{absolute}</Absolute></Paths>'
+            f'</properties><trust active="{trusted}"/>'.encode(),
+        ]
+        try:
+            with self._open_data(filename, index) as data:
+                offset, length = index["relations"]
+                if offset >= 0:
+                    parts.append(data[offset : offset + length])
+                parts.append(b"<projectlayers>")
+                for layer_id in sorted(layer_ids):
+                    offset, length = index["layers"][layer_id]
+                    parts.append(data[offset : offset + length])
+        except (OSError, KeyError, ValueError):
+            return None
+        parts.append(b"</projectlayers></qgis>")
+        return b"".join(parts)
@@ -0,0 +1,49 @@
+#! python3  # noqa: E265
+
+"""
+    Comparison of configured project lists, used to update only changed project menus.
+"""
+
+# Standard library
+from typing import Dict, List, Optional
+
+# ############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def match_projects(
+    previous: List[Dict[str, str]], projects: List[Dict[str, str]]
+) -> List[Optional[int]]:
+    """Match projects of a new list with projects of a previous list.
+
+    Projects with same uri and name are matched first, then projects with same uri
+    and another name (renamed projects). Each previous project is matched at most once.
+
+    :param previous: previous list of dict of information about the projects
+    :type previous: List[Dict[str, str]]
+    :param projects: new list of dict of information about the projects
+    :type projects: List[Dict[str, str]]
+    :return: index of matching previous project for each new project, None for
+    added projects
+    :rtype: List[Optional[int]]
+    """
+    # uri: indexes of unmatched previous projects
+    available: Dict[str, List[int]] = {}
+    for index, project in enumerate(previous):
+        available.setdefault(project["file"], []).append(index)
+
+    matches: List[Optional[int]] = [None] * len(projects)
+    for index, project in enumerate(projects):
+        candidates = available.get(project["file"], [])
+        for candidate in candidates:
+            if previous[candidate]["name"] == project["name"]:
+                candidates.remove(candidate)
+                matches[index] = candidate
+                break
+
+    for index, project in enumerate(projects):
+        candidates = available.get(project["file"])
+        if matches[index] is None and candidates:
+            matches[index] = candidates.pop(0)
+    return matches
@@ -1,9 +1,10 @@
 # standard
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
 
 # PyQGIS
-from qgis.PyQt import QtXml
 from qgis.PyQt.QtCore import QFileInfo
 from qgis.core import (
     QgsMapLayerType,
@@ -13,101 +14,275 @@ from qgis.core import (
 
 # project
 from menu_from_project.__about__ import __title__
-from menu_from_project.logic.xml_utils import getFirstChildByAttrValue
-from menu_from_project.logic.qgs_manager import (
-    QgsDomManager,
-    get_project_title,
-    create_map_layer_dict,
-    is_absolute,
+from menu_from_project.logic.project_scan import (
+    LAYER_TREE_GROUP,
+    LAYER_TREE_LAYER,
+    ScannedMapLayer,
+    ScannedProject,
+    ScannedTreeNode,
 )
+from menu_from_project.logic.qgs_manager import QgsDomManager
 from menu_from_project.datamodel.project_config import (
     MenuProjectConfig,
     MenuGroupConfig,
     MenuLayerConfig,
 )
 
+# maximum number of embedded projects scanned at the same time
+MAX_EMBEDDED_SCANS = 4
+
+
+class ReadCanceled(Exception):
+    """Raised when a project menu configuration read is canceled"""
+
+
+@dataclass
+class EmbeddedResolutionCache:
+    """Embedded projects resolved while building a project menu configuration.
+
+    Projects embedding the same project many times resolve each embedded file,
+    group and group configuration once.
+    """
+
+    # id of layer tree node: (node, embedded project path from node and its parents)
+    embedded_files: Dict[int, Tuple[ScannedTreeNode, str]] = field(default_factory=dict)
+    # embedded project path: {group name: first root group with this name}
+    group_indexes: Dict[str, Dict[str, ScannedTreeNode]] = field(default_factory=dict)
+    # (embedded project path, group name): group menu configuration
+    group_configs: Dict[Tuple[str, str], Optional[MenuGroupConfig]] = field(
+        default_factory=dict
+    )
+
 
 def get_embedded_project_from_layer_tree(
-    node: QtXml.QDomNode, init_filename: str, absolute_project: bool
+    node: ScannedTreeNode,
+    init_filename: str,
+    absolute_project: bool,
+    cache: Optional[EmbeddedResolutionCache] = None,
+    origin_id: Optional[str] = None,
 ) -> str:
-    """Get embedded project path from layer tree and his parent
+    """Get embedded project path from layer tree and his parent.
+    A missing embedded project is logged once, when the root is reached.
 
-    :param layer_tree: layer tree to inspect
-    :type layer_tree: QgsLayerTreeNode
-    :param project: project where layer tree is used
-    :type project: QgsProject
+    :param node: layer tree node to inspect
+    :type node: ScannedTreeNode
+    :param init_filename: initial filename of project
+    :type init_filename: str
+    :param absolute_project: True if project is absolute, False otherwise
+    :type absolute_project: bool
+    :param cache: embedded resolution cache of current build, defaults to None
+    :type cache: Optional[EmbeddedResolutionCache], optional
+    :param origin_id: id of the node where the search started, defaults to None
+    (id of node)
+    :type origin_id: Optional[str], optional
     :return: path to embedded project
     :rtype: str
     """
-    element = node.toElement()
-    customproperties_nd = element.elementsByTagName("customproperties")
-    if customproperties_nd.size() > 0:
-        eFileNd = getFirstChildByAttrValue(
-            customproperties_nd.at(0), "property", "key", "embedded_project"
-        ) or getFirstChildByAttrValue(
-            customproperties_nd.at(0), "Option", "name", "embedded_project"
-        )
-        filename = ""
-        if eFileNd:
-            # get project file name
-            embeddedFile = eFileNd.toElement().attribute("value")
-            if not absolute_project and (embeddedFile.find(".") == 0):
-                filename = QFileInfo(init_filename).path() + "/" + embeddedFile
-            else:
-                filename = QFileInfo(embeddedFile).absoluteFilePath()
+    if cache is not None and id(node) in cache.embedded_files:
+        return cache.embedded_files[id(node)][1]
+
+    filename = ""
+    embeddedFile = node.custom_properties.get("embedded_project")
+    if embeddedFile is not None:
+        # get project file name
+        if not absolute_project and (embeddedFile.find(".") == 0):
+            filename = QFileInfo(init_filename).path() + "/" + embeddedFile
         else:
-            layer_id = element.attribute("id")
+            filename = QFileInfo(embeddedFile).absoluteFilePath()
 
-            QgsMessageLog.logMessage(
-                f"Menu from layer: Embeded project not found for {layer_id}",
-                __title__,
-                notifyUser=True,
-            )
-            filename = ""
-    if filename == "" and not node.parentNode().isNull():
-        return get_embedded_project_from_layer_tree(
-            node.parentNode(),
+    if origin_id is None:
+        origin_id = node.attribute("id")
+    if filename == "" and node.parent is not None:
+        filename = get_embedded_project_from_layer_tree(
+            node.parent,
             init_filename=init_filename,
             absolute_project=absolute_project,
+            cache=cache,
+            origin_id=origin_id,
+        )
+    elif filename == "":
+        QgsMessageLog.logMessage(
+            f"Menu from layer: Embeded project not found for {origin_id}",
+            __title__,
+            notifyUser=True,
         )
 
+    if cache is not None:
+        cache.embedded_files[id(node)] = node, filename
     return filename
 
 
 def read_embedded_properties(
-    node: QtXml.QDomNode, init_filename: str, absolute_project: bool
+    node: ScannedTreeNode,
+    init_filename: str,
+    absolute_project: bool,
+    cache: Optional[EmbeddedResolutionCache] = None,
 ) -> Tuple[bool, str]:
-    """Read embedded properties from a QgsLayerTreeNode in a QgsProject
+    """Read embedded properties from a layer tree node of a project
 
-    :param layer_tree: layer tree to inspect
-    :type layer_tree: QgsLayerTreeNode
-    :param project: project where layer tree is used
-    :type project: QgsProject
+    :param node: layer tree node to inspect
+    :type node: ScannedTreeNode
+    :param init_filename: initial filename of project
+    :type init_filename: str
+    :param absolute_project: True if project is absolute, False otherwise
+    :type absolute_project: bool
+    :param cache: embedded resolution cache of current build, defaults to None
+    :type cache: Optional[EmbeddedResolutionCache], optional
     :return: Boolean indicating if the layer tree is embedded and the filename of the project used
     :rtype: Tuple[bool, str]
     """
-    element = node.toElement()
-
     embedded = False
     filename = init_filename
 
-    customproperties_nd = element.elementsByTagName("customproperties")
-    if customproperties_nd.size() > 0:
-        embedNd = getFirstChildByAttrValue(
-            customproperties_nd.at(0), "property", "key", "embedded"
-        ) or getFirstChildByAttrValue(
-            customproperties_nd.at(0), "Option", "name", "embedded"
+    if node.custom_properties.get("embedded") == "1":
+        embedded = True
+        filename = get_embedded_project_from_layer_tree(
+            node=node,
+            init_filename=init_filename,
+            absolute_project=absolute_project,
+            cache=cache,
         )
 
-        if embedNd and embedNd.toElement().attribute("value") == "1":
-            embedded = True
-            filename = get_embedded_project_from_layer_tree(
-                node=node,
+    return embedded, filename
+
+
+def get_embedded_groups_from_layer_tree(
+    nodes: Iterable[ScannedTreeNode],
+    init_filename: str,
+    absolute_project: bool,
+    cache: EmbeddedResolutionCache,
+) -> Dict[str, Set[str]]:
+    """Get paths of embedded projects used by layer tree nodes and their childs, with
+    the names of the groups embedded from each project
+
+    :param nodes: layer tree nodes to inspect
+    :type nodes: Iterable[ScannedTreeNode]
+    :param init_filename: initial filename of project
+    :type init_filename: str
+    :param absolute_project: True if project is absolute, False otherwise
+    :type absolute_project: bool
+    :param cache: embedded resolution cache of current build
+    :type cache: EmbeddedResolutionCache
+    :return: embedded project path: names of embedded groups (empty if only layers
+    are embedded)
+    :rtype: Dict[str, Set[str]]
+    """
+    embedded_groups = {}
+    for node in nodes:
+        embedded, filename = read_embedded_properties(
+            node=node,
+            init_filename=init_filename,
+            absolute_project=absolute_project,
+            cache=cache,
+        )
+        if embedded and filename:
+            names = embedded_groups.setdefault(filename, set())
+            if node.tag == LAYER_TREE_GROUP:
+                names.add(node.attribute("name"))
+        if node.tag == LAYER_TREE_GROUP:
+            for filename, names in get_embedded_groups_from_layer_tree(
+                nodes=node.childs,
                 init_filename=init_filename,
                 absolute_project=absolute_project,
+                cache=cache,
+            ).items():
+                embedded_groups.setdefault(filename, set()).update(names)
+    return embedded_groups
+
+
+def get_root_groups(
+    filename: str, scan: ScannedProject, cache: EmbeddedResolutionCache
+) -> Dict[str, ScannedTreeNode]:
+    """Get groups of the layer tree root of a project, first one for each name
+
+    :param filename: project path
+    :type filename: str
+    :param scan: scanned project
+    :type scan: ScannedProject
+    :param cache: embedded resolution cache of current build
+    :type cache: EmbeddedResolutionCache
+    :return: group name: group node
+    :rtype: Dict[str, ScannedTreeNode]
+    """
+    if filename not in cache.group_indexes:
+        groups = {}
+        if node := scan.layer_tree:
+            for child in node.childs:
+                if child.tag == LAYER_TREE_GROUP:
+                    groups.setdefault(child.attribute("name"), child)
+        cache.group_indexes[filename] = groups
+    return cache.group_indexes[filename]
+
+
+def prefetch_embedded_projects(
+    node: ScannedTreeNode,
+    init_filename: str,
+    absolute_project: bool,
+    qgs_dom_manager: QgsDomManager,
+    cache: EmbeddedResolutionCache,
+) -> None:
+    """Scan concurrently all embedded projects used by a layer tree, before the
+    menu configuration is built. Projects embedded by the embedded groups are
+    scanned in following waves.
+
+    :param node: layer tree root node
+    :type node: ScannedTreeNode
+    :param init_filename: initial filename of project
+    :type init_filename: str
+    :param absolute_project: True if project is absolute, False otherwise
+    :type absolute_project: bool
+    :param qgs_dom_manager: manager to get scanned project for embedded project
+    :type qgs_dom_manager: QgsDomManager
+    :param cache: embedded resolution cache of current build
+    :type cache: EmbeddedResolutionCache
+    """
+    scans = {}
+    visited_files = {init_filename}
+    visited_groups = set()
+    embedded_groups = get_embedded_groups_from_layer_tree(
+        nodes=node.childs,
+        init_filename=init_filename,
+        absolute_project=absolute_project,
+        cache=cache,
+    )
+    while embedded_groups:
+        to_scan = set(embedded_groups) - visited_files
+        visited_files |= to_scan
+        if to_scan:
+            wave_scans, errors = qgs_dom_manager.prefetchProjectScans(
+                to_scan, MAX_EMBEDDED_SCANS
             )
+            scans.update(wave_scans)
+            # failed projects are read again, and fail, when their groups are built
+            for filename, exc in errors.items():
+                QgsMessageLog.logMessage(
+                    f"Menu from layer: Embedded project {filename} can't be read: {exc}",
+                    __title__,
+                    notifyUser=False,
+                )
 
-    return embedded, filename
+        # only embedded groups are walked, other groups of embedded projects are
+        # not used by the menu
+        next_groups = {}
+        for filename, names in embedded_groups.items():
+            scan = scans.get(filename)
+            if scan is None:
+                continue
+            groups = get_root_groups(filename, scan, cache)
+            nodes = [
+                groups[name]
+                for name in sorted(names)
+                if name in groups and (filename, name) not in visited_groups
+            ]
+            visited_groups.update((filename, name) for name in names)
+            for embedded_file, embedded_names in get_embedded_groups_from_layer_tree(
+                nodes=nodes,
+                init_filename=filename,
+                absolute_project=scan.absolute,
+                cache=cache,
+            ).items():
+                next_groups.setdefault(embedded_file, set()).update(embedded_names)
+        embedded_groups = next_groups
 
 
 def get_layer_type_from_geometry_str(
@@ -145,79 +320,78 @@ def get_layer_type_from_geometry_str(
 
 
 def get_layer_menu_config(
-    node: QtXml.QDomNode,
-    maplayer_dict: Dict[str, QtXml.QDomNode],
+    node: ScannedTreeNode,
+    maplayer_dict: Dict[str, ScannedMapLayer],
     qgs_dom_manager: QgsDomManager,
     init_filename: str,
     absolute_project: bool,
+    cache: Optional[EmbeddedResolutionCache] = None,
 ) -> MenuLayerConfig:
-    """Get layer menu configuration from a xml node
+    """Get layer menu configuration from a layer tree node
 
-    :param node: xml node
-    :type node: QtXml.QDomNode
-    :param maplayer_dict: dict of maplayer nodes
-    :type maplayer_dict: Dict[str, QtXml.QDomNode]
-    :param qgs_dom_manager: manager to get qgs doc for embedded project
+    :param node: layer tree node
+    :type node: ScannedTreeNode
+    :param maplayer_dict: dict of scanned maplayers
+    :type maplayer_dict: Dict[str, ScannedMapLayer]
+    :param qgs_dom_manager: manager to get scanned project for embedded project
     :type qgs_dom_manager: QgsDomManager
-    :param init_filename: _description_
     :param init_filename: initial filename of project
     :type init_filename: str
     :param absolute_project: True if project is absolute, False otherwise
     :type absolute_project: bool
+    :param cache: embedded resolution cache of current build, defaults to None
+    :type cache: Optional[EmbeddedResolutionCache], optional
     :return: layer menu configuration
     :rtype: MenuLayerConfig
     """
 
     embedded, filename = read_embedded_properties(
-        node=node, init_filename=init_filename, absolute_project=absolute_project
+        node=node,
+        init_filename=init_filename,
+        absolute_project=absolute_project,
+        cache=cache,
     )
 
-    element = node.toElement()
-    layer_id = element.attribute("id")
+    layer_id = node.attribute("id")
 
     if embedded:
-        ml = qgs_dom_manager.getMapLayerDomFromQgs(filename, layer_id)
+        ml = qgs_dom_manager.getMapLayerScanFromQgs(filename, layer_id)
     else:
-        ml = maplayer_dict[layer_id]
+        ml = maplayer_dict.get(layer_id)
 
     if ml:
         # Metadata infos
-        md = ml.namedItem("resourceMetadata")
-        metadata_title = md.namedItem("title").firstChild().toText().data()
-        metadata_abstract = md.namedItem("abstract").firstChild().toText().data()
+        metadata_title = ml.metadata_title
+        metadata_abstract = ml.metadata_abstract
 
         # Layer info
-        title = ml.namedItem("title").firstChild().toText().data()
-        abstract = ml.namedItem("abstract").firstChild().toText().data()
+        title = ml.title
+        abstract = ml.abstract
 
         # Layer notes
-        layer_notes = ""
-        elt_note = ml.namedItem("userNotes")
-        if elt_note.toElement().hasAttribute("value"):
-            layer_notes = elt_note.toElement().attribute("value")
+        layer_notes = ml.layer_notes
 
         # Geometry and layer type
-        ml_elem = ml.toElement()
-        geometry_type_str = ml_elem.attribute("geometry")
+        geometry_type_str = ml.geometry
         if geometry_type_str == "":
             # A TMS has not a geometry attribute.
             # Let's read the "type"
-            geometry_type_str = ml_elem.attribute("type")
+            geometry_type_str = ml.layer_type
         layer_type, geometry_type, is_spatial = get_layer_type_from_geometry_str(
             geometry_type_str
         )
     else:
-        metadata_abstract, metadata_title, title, abstract, layer_notes = ""
+        metadata_abstract = metadata_title = title = abstract = layer_notes = ""
         layer_type = None
         geometry_type = None
         is_spatial = False
 
     return MenuLayerConfig(
-        name=element.attribute("name"),
+        name=node.attribute("name"),
         layer_id=layer_id,
-        filename=filename,
-        visible=element.attribute("checked", "") == "Qt::Checked",
-        expanded=element.attribute("expanded", "0") == "1",
+        filename=sys.intern(filename),
+        visible=node.attribute("checked") == "Qt::Checked",
+        expanded=node.attribute("expanded", "0") == "1",
         embedded=embedded,
         layer_type=layer_type,
         metadata_abstract=metadata_abstract,
@@ -231,7 +405,11 @@ def get_layer_menu_config(
 
 
 def get_embedded_group_config(
-    filename: str, group_name: str, qgs_dom_manager: QgsDomManager
+    filename: str,
+    group_name: str,
+    qgs_dom_manager: QgsDomManager,
+    cache: Optional[EmbeddedResolutionCache] = None,
+    is_canceled: Optional[Callable[[], bool]] = None,
 ) -> Optional[MenuGroupConfig]:
     """Get group menu configuration for an embedded group name
 
@@ -239,66 +417,80 @@ def get_embedded_group_config(
     :type filename: str
     :param group_name: embedded group name
     :type group_name: str
-    :param qgs_dom_manager: manager to get qgs doc for embedded project
+    :param qgs_dom_manager: manager to get scanned project for embedded project
     :type qgs_dom_manager: QgsDomManager
+    :param cache: embedded resolution cache of current build, defaults to None
+    :type cache: Optional[EmbeddedResolutionCache], optional
+    :param is_canceled: function returning True if the read is canceled, checked
+    for each group, defaults to None
+    :type is_canceled: Optional[Callable[[], bool]], optional
+    :raises ReadCanceled: read was canceled
     :return: Optional menu group configuration
     :rtype: Optional[MenuGroupConfig]
     """
-    doc, _ = qgs_dom_manager.getQgsDoc(filename)
-    # Get layer tree root
-    layer_tree_roots = doc.elementsByTagName("layer-tree-group")
-    if layer_tree_roots.length() > 0:
-        if node := layer_tree_roots.item(0):
-            # Get all layer / group in tree
-            childrens = node.childNodes()
-            for i in range(0, childrens.size()):
-                child = childrens.at(i)
-                element = child.toElement()
-                name = element.attribute("name")
-                # Get only group with same name
-                if child.nodeName() == "layer-tree-group" and name == group_name:
-                    # Create dict of maplayer nodes
-                    maplayer_dict = create_map_layer_dict(doc)
-
-                    return get_group_menu_config(
-                        node=child,
-                        maplayer_dict=maplayer_dict,
-                        qgs_dom_manager=qgs_dom_manager,
-                        init_filename=filename,
-                        absolute_project=is_absolute(doc=doc),
-                    )
-
-    return None
+    if cache is None:
+        cache = EmbeddedResolutionCache()
+    key = filename, group_name
+    if key in cache.group_configs:
+        return cache.group_configs[key]
+
+    scan, _ = qgs_dom_manager.getProjectScan(filename)
+
+    group_config = None
+    if child := get_root_groups(filename, scan, cache).get(group_name):
+        group_config = get_group_menu_config(
+            node=child,
+            maplayer_dict=scan.maplayers,
+            qgs_dom_manager=qgs_dom_manager,
+            init_filename=filename,
+            absolute_project=scan.absolute,
+            cache=cache,
+            is_canceled=is_canceled,
+        )
+    cache.group_configs[key] = group_config
+    return group_config
 
 
 def get_group_menu_config(
-    node: QtXml.QDomNode,
-    maplayer_dict: Dict[str, QtXml.QDomNode],
+    node: ScannedTreeNode,
+    maplayer_dict: Dict[str, ScannedMapLayer],
     qgs_dom_manager: QgsDomManager,
     init_filename: str,
     absolute_project: bool,
+    cache: Optional[EmbeddedResolutionCache] = None,
+    is_canceled: Optional[Callable[[], bool]] = None,
 ) -> MenuGroupConfig:
-    """Get group menu configuration from a xml node
+    """Get group menu configuration from a layer tree node
 
-    :param node: xml node
-    :type node: QtXml.QDomNode
-    :param maplayer_dict: dict of maplayer nodes
-    :type maplayer_dict: Dict[str, QtXml.QDomNode]
-    :param qgs_dom_manager: manager to get qgs doc for embedded project
+    :param node: layer tree node
+    :type node: ScannedTreeNode
+    :param maplayer_dict: dict of scanned maplayers
+    :type maplayer_dict: Dict[str, ScannedMapLayer]
+    :param qgs_dom_manager: manager to get scanned project for embedded project
     :type qgs_dom_manager: QgsDomManager
     :param init_filename: initial filename of project
     :type init_filename: str
     :param absolute_project: True if project is absolute, False otherwise
     :type absolute_project: bool
+    :param cache: embedded resolution cache of current build, defaults to None
+    :type cache: Optional[EmbeddedResolutionCache], optional
+    :param is_canceled: function returning True if the read is canceled, checked
+    for each group, defaults to None
+    :type is_canceled: Optional[Callable[[], bool]], optional
+    :raises ReadCanceled: read was canceled
     :return: group menu configuration
     :rtype: MenuGroupConfig
     """
+    if is_canceled and is_canceled():
+        raise ReadCanceled()
 
-    element = node.toElement()
-    name = element.attribute("name")
+    name = node.attribute("name")
 
     embedded, filename = read_embedded_properties(
-        node=node, init_filename=init_filename, absolute_project=absolute_project
+        node=node,
+        init_filename=init_filename,
+        absolute_project=absolute_project,
+        cache=cache,
     )
 
     childs = []
@@ -306,16 +498,17 @@ def get_group_menu_config(
     # If embedded group, add all layer and subgroup from the group of same name
     if embedded:
         embedded_group = get_embedded_group_config(
-            filename=filename, group_name=name, qgs_dom_manager=qgs_dom_manager
+            filename=filename,
+            group_name=name,
+            qgs_dom_manager=qgs_dom_manager,
+            cache=cache,
+            is_canceled=is_canceled,
         )
         if embedded_group:
             childs += embedded_group.childs
 
-    childrens = node.childNodes()
-
-    for i in range(0, childrens.size()):
-        child = childrens.at(i)
-        if child.nodeName() == "layer-tree-group":
+    for child in node.childs:
+        if child.tag == LAYER_TREE_GROUP:
             childs.append(
                 get_group_menu_config(
                     node=child,
@@ -323,9 +516,11 @@ def get_group_menu_config(
                     qgs_dom_manager=qgs_dom_manager,
                     init_filename=init_filename,
                     absolute_project=absolute_project,
+                    cache=cache,
+                    is_canceled=is_canceled,
                 )
             )
-        elif child.nodeName() == "layer-tree-layer":
+        elif child.tag == LAYER_TREE_LAYER:
             childs.append(
                 get_layer_menu_config(
                     node=child,
@@ -333,60 +528,80 @@ def get_group_menu_config(
                     qgs_dom_manager=qgs_dom_manager,
                     init_filename=init_filename,
                     absolute_project=absolute_project,
+                    cache=cache,
                 )
             )
 
     return MenuGroupConfig(
-        name=name, embedded=embedded, filename=filename, childs=childs
+        name=name, embedded=embedded, filename=sys.intern(filename), childs=childs
     )
 
 
 def get_project_menu_config(
     project: Dict[str, str],
     qgs_dom_manager: QgsDomManager,
+    is_canceled: Optional[Callable[[], bool]] = None,
 ) -> Optional[MenuProjectConfig]:
     """Get project menu configuration for a project
 
+    The project is read with a streaming scanner: no XML document is built.
+    Embedded projects are scanned concurrently before the menu configuration is built.
+
     :param project: dict of information about the project
     :type project: Dict[str, str]
-    :param qgs_dom_manager: manager to get qgs doc for project
+    :param qgs_dom_manager: manager to get scanned project
     :type qgs_dom_manager: QgsDomManager
-    :return: Optional menu project configuration
+    :param is_canceled: function returning True if the read is canceled, checked
+    for the project and for each group, defaults to None
+    :type is_canceled: Optional[Callable[[], bool]], optional
+    :return: Optional menu project configuration, None if read was canceled
     :rtype: Optional[MenuProjectConfig]
     """
+    if is_canceled and is_canceled():
+        return None
 
     # Get path to QgsProject file, local / downloaded / from postgres database
     uri = project["file"]
     qgs_dom_manager.set_project(project)
-    doc, filename = qgs_dom_manager.getQgsDoc(uri)
+    scan, filename = qgs_dom_manager.getProjectScan(uri)
 
     # Define project name
     name = project["name"]
     if name == "":
-        name = get_project_title(doc)
+        name = scan.title
     if name == "":
         name = Path(filename).stem
 
     # Get layer tree root
-    layer_tree_roots = doc.elementsByTagName("layer-tree-group")
-    if layer_tree_roots.length() > 0:
-        if node := layer_tree_roots.item(0):
-            # Create dict of maplayer nodes
-            maplayer_dict = create_map_layer_dict(doc)
-            # Parse node for group and layers
-            menu_project_config = MenuProjectConfig(
-                project_name=name,
-                filename=filename,
-                uri=uri,
-                root_group=get_group_menu_config(
-                    node=node,
-                    maplayer_dict=maplayer_dict,
-                    qgs_dom_manager=qgs_dom_manager,
-                    init_filename=filename,
-                    absolute_project=is_absolute(doc),
-                ),
-            )
+    if node := scan.layer_tree:
+        # Scan embedded projects first, concurrently
+        cache = EmbeddedResolutionCache()
+        prefetch_embedded_projects(
+            node=node,
+            init_filename=filename,
+            absolute_project=scan.absolute,
+            qgs_dom_manager=qgs_dom_manager,
+            cache=cache,
+        )
 
+        # Parse node for group and layers
+        try:
+            root_group = get_group_menu_config(
+                node=node,
+                maplayer_dict=scan.maplayers,
+                qgs_dom_manager=qgs_dom_manager,
+                init_filename=filename,
+                absolute_project=scan.absolute,
+                cache=cache,
+                is_canceled=is_canceled,
+            )
+        except ReadCanceled:
             qgs_dom_manager.set_project(None)
-            return menu_project_config
+            return None
+        menu_project_config = MenuProjectConfig(
+            project_name=name, filename=filename, uri=uri, root_group=root_group
+        )
+
+        qgs_dom_manager.set_project(None)
+        return menu_project_config
     return None
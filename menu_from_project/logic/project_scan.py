@@ -0,0 +1,448 @@
+#! python3  # noqa: E265
+
+"""
+    Streaming scanner for QGIS project files.
+
+    Only the parts of the project needed to build the menus are kept (layer tree,
+    maplayer metadata and project properties), so memory does not grow with the
+    size of the project file.
+"""
+
+# Standard library
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from xml.parsers import expat
+
+# ############################################################################
+# ########## Globals ###############
+# ##################################
+
+# tags of the layer tree nodes
+LAYER_TREE_GROUP = "layer-tree-group"
+LAYER_TREE_LAYER = "layer-tree-layer"
+
+# maplayer direct childs read by the scanner: ScannedMapLayer attribute
+_MAPLAYER_TEXT_CHILDS = {"id": "layer_id", "title": "title", "abstract": "abstract"}
+# maplayer resourceMetadata childs read by the scanner: ScannedMapLayer attribute
+_METADATA_TEXT_CHILDS = {"title": "metadata_title", "abstract": "metadata_abstract"}
+
+# paths of project properties read by the scanner
+_TITLE_PATH = ["qgis", "title"]
+_TRUST_PATH = ["qgis", "trust"]
+_ABSOLUTE_PATH = ["qgis", "properties", "Paths", "Absolute"]
+_RELATIONS_PATH = ["qgis", "relations"]
+
+# size of chunks read when element content is copied
+SCAN_CHUNK_SIZE = 1 << 16
+
+# ############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+@dataclass
+class ScannedMapLayer:
+    """Information read from a maplayer element"""
+
+    layer_id: str = ""
+    layer_type: str = ""
+    geometry: str = ""
+    title: str = ""
+    abstract: str = ""
+    metadata_title: str = ""
+    metadata_abstract: str = ""
+    layer_notes: str = ""
+    # ids of layers joined to this layer
+    joined_layer_ids: List[str] = field(default_factory=list)
+    # position of maplayer element in copy stream, or in source if only located
+    xml_offset: int = -1
+    xml_length: int = 0
+
+
+@dataclass
+class ScannedTreeNode:
+    """Node of the layer tree (layer-tree-group or layer-tree-layer element)"""
+
+    tag: str
+    attributes: Dict[str, str]
+    custom_properties: Dict[str, str] = field(default_factory=dict)
+    childs: List["ScannedTreeNode"] = field(default_factory=list)
+    parent: Optional["ScannedTreeNode"] = field(default=None, repr=False, compare=False)
+
+    def attribute(self, name: str, default: str = "") -> str:
+        """Return an attribute value of the node, like QDomElement.attribute
+
+        :param name: attribute name
+        :type name: str
+        :param default: value returned if the attribute is not defined, defaults to ""
+        :type default: str, optional
+        :return: attribute value
+        :rtype: str
+        """
+        return self.attributes.get(name, default)
+
+
+@dataclass
+class ScannedProject:
+    """Information read from a QGIS project file"""
+
+    title: str = ""
+    absolute: bool = False
+    trusted: bool = False
+    layer_tree: Optional[ScannedTreeNode] = None
+    maplayers: Dict[str, ScannedMapLayer] = field(default_factory=dict)
+    # (referenced layer id, referencing layer id) of project relations
+    relations: List[Tuple[str, str]] = field(default_factory=list)
+    # position of relations element in copy stream, or in source if only located
+    relations_xml_offset: int = -1
+    relations_xml_length: int = 0
+
+
+class ProjectScanner:
+    """One pass scanner of a .qgs XML stream.
+
+    Elements are never kept in memory: only the values needed for the menu
+    configuration are stored while the stream is parsed.
+
+    :param copy_stream: binary stream where maplayer and relations elements are
+    copied, defaults to None (no copy)
+    :type copy_stream: Optional[BinaryIO], optional
+    :param locate_elements: store the position of maplayer and relations elements in
+    the scanned stream, when they are not copied, defaults to False
+    :type locate_elements: bool, optional
+    """
+
+    def __init__(
+        self, copy_stream: Optional[BinaryIO] = None, locate_elements: bool = False
+    ) -> None:
+        self.project = ScannedProject()
+
+        # copy of elements: bytes read since buffer start, start of copied element
+        self._copy_stream = copy_stream
+        self._locate_elements = locate_elements or copy_stream is not None
+        self._parser = None
+        self._buffer = bytearray()
+        self._buffer_start = 0
+        self._copy_start: Optional[int] = None
+
+        # path of element names from document root
+        self._path: List[str] = []
+        self._text: Optional[List[str]] = None
+
+        # layer tree
+        self._tree_depth = 0
+        self._tree_node: Optional[ScannedTreeNode] = None
+        self._custom_properties_depth = 0
+        self._custom_properties: Dict[str, str] = {}
+        self._custom_options: Dict[str, str] = {}
+
+        # maplayer
+        self._maplayer: Optional[ScannedMapLayer] = None
+        self._maplayer_depth = 0
+
+        # handlers of elements outside of maplayer and custom properties, by name
+        self._start_handlers = {
+            "maplayer": self._start_maplayer,
+            LAYER_TREE_GROUP: self._start_tree_node,
+            LAYER_TREE_LAYER: self._start_tree_node,
+            "customproperties": self._start_custom_properties,
+            "title": self._start_property_text,
+            "Absolute": self._start_property_text,
+            "trust": self._start_trust,
+            "relations": self._start_relations,
+            "relation": self._start_relation,
+        }
+        self._end_handlers = {
+            LAYER_TREE_GROUP: self._end_tree_node,
+            LAYER_TREE_LAYER: self._end_tree_node,
+            "title": self._end_title,
+            "Absolute": self._end_absolute,
+            "relations": self._end_relations,
+        }
+
+    def scan(self, stream: BinaryIO) -> ScannedProject:
+        """Parse a binary stream of a .qgs document
+
+        :param stream: opened stream of .qgs content
+        :type stream: BinaryIO
+        :return: scanned project
+        :rtype: ScannedProject
+        """
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = self._start_element
+        parser.EndElementHandler = self._end_element
+        parser.CharacterDataHandler = self._character_data
+
+        if not self._locate_elements:
+            parser.ParseFile(stream)
+            return self.project
+
+        # read bytes are kept until copied elements are complete
+        self._parser = parser
+        for chunk in iter(lambda: stream.read(SCAN_CHUNK_SIZE), b""):
+            self._buffer += chunk
+            parser.Parse(chunk, False)
+            self._trim_buffer()
+        parser.Parse(b"", True)
+        return self.project
+
+    def _start_copy(self) -> None:
+        """Start copy of current element, if copy or location is requested"""
+        if self._parser is not None:
+            self._copy_start = self._parser.CurrentByteIndex
+
+    def _end_copy(self) -> Tuple[int, int]:
+        """Copy current element, from its start tag to its end tag
+
+        :return: offset and length of element copy, or of element in scanned stream
+        if it is only located, (-1, 0) if copy or location is not requested
+        :rtype: Tuple[int, int]
+        """
+        if self._parser is None or self._copy_start is None:
+            return -1, 0
+        # end of start tag, or of end tag for an element with content
+        end = self._buffer.index(b">", self._copy_start - self._buffer_start)
+        if self._buffer[end - 1 : end] != b"/":
+            end = self._buffer.index(
+                b">", self._parser.CurrentByteIndex - self._buffer_start
+            )
+        start = self._copy_start
+        self._copy_start = None
+        if self._copy_stream is None:
+            return start, self._buffer_start + end + 1 - start
+
+        content = self._buffer[start - self._buffer_start : end + 1]
+        offset = self._copy_stream.tell()
+        self._copy_stream.write(content)
+        return offset, len(content)
+
+    def _trim_buffer(self) -> None:
+        """Remove bytes not needed for element copy from buffer.
+        Bytes after last element event may not be parsed yet and are kept.
+        """
+        keep_start = self._parser.CurrentByteIndex
+        if self._copy_start is not None:
+            keep_start = min(keep_start, self._copy_start)
+        del self._buffer[: keep_start - self._buffer_start]
+        self._buffer_start = keep_start
+
+    def _start_element(self, name: str, attrs: Dict[str, str]) -> None:
+        self._path.append(name)
+
+        if self._maplayer is not None:
+            self._start_maplayer_child(name, attrs)
+        elif self._custom_properties_depth:
+            self._start_custom_property(name, attrs)
+        elif handler := self._start_handlers.get(name):
+            handler(attrs)
+
+    def _end_element(self, name: str) -> None:
+        text = self._pop_text()
+
+        if self._maplayer is not None:
+            self._end_maplayer_child(name, text)
+        elif self._custom_properties_depth:
+            if len(self._path) == self._custom_properties_depth:
+                self._end_custom_properties()
+        elif handler := self._end_handlers.get(name):
+            handler(text)
+
+        self._path.pop()
+
+    def _start_maplayer_child(self, name: str, attrs: Dict[str, str]) -> None:
+        relative_depth = len(self._path) - self._maplayer_depth
+        if relative_depth == 1 and name in _MAPLAYER_TEXT_CHILDS:
+            self._text = []
+        elif relative_depth == 1 and name == "userNotes":
+            self._maplayer.layer_notes = attrs.get("value", "")
+        elif relative_depth != 2:
+            return
+        elif self._path[-2] == "resourceMetadata" and name in _METADATA_TEXT_CHILDS:
+            self._text = []
+        elif self._path[-2] == "vectorjoins" and name == "join":
+            if attrs.get("joinLayerId"):
+                self._maplayer.joined_layer_ids.append(attrs["joinLayerId"])
+
+    def _end_maplayer_child(self, name: str, text: str) -> None:
+        relative_depth = len(self._path) - self._maplayer_depth
+        if relative_depth == 0:
+            self._end_maplayer()
+        elif relative_depth == 1 and name in _MAPLAYER_TEXT_CHILDS:
+            setattr(self._maplayer, _MAPLAYER_TEXT_CHILDS[name], text)
+        elif (
+            relative_depth == 2
+            and self._path[-2] == "resourceMetadata"
+            and name in _METADATA_TEXT_CHILDS
+        ):
+            setattr(self._maplayer, _METADATA_TEXT_CHILDS[name], text)
+
+    def _start_maplayer(self, attrs: Dict[str, str]) -> None:
+        self._maplayer = ScannedMapLayer(
+            layer_type=attrs.get("type", ""), geometry=attrs.get("geometry", "")
+        )
+        self._maplayer_depth = len(self._path)
+        self._start_copy()
+
+    def _end_maplayer(self) -> None:
+        offset, length = self._end_copy()
+        self._maplayer.xml_offset = offset
+        self._maplayer.xml_length = length
+        # like QDomDocument lookups, first maplayer with an id is used
+        layer_id = self._maplayer.layer_id
+        if layer_id and layer_id not in self.project.maplayers:
+            self.project.maplayers[layer_id] = self._maplayer
+        self._maplayer = None
+
+    def _start_tree_node(self, attrs: Dict[str, str]) -> None:
+        name = self._path[-1]
+        if not self._tree_depth and (
+            self.project.layer_tree is not None or name == LAYER_TREE_LAYER
+        ):
+            # other layer tree, or layer outside of a layer tree group
+            return
+        node = ScannedTreeNode(tag=name, attributes=dict(attrs))
+        if self._tree_node is None:
+            self.project.layer_tree = node
+        else:
+            node.parent = self._tree_node
+            self._tree_node.childs.append(node)
+        self._tree_node = node
+        self._tree_depth += 1
+
+    def _end_tree_node(self, text: str) -> None:
+        if self._tree_depth:
+            self._tree_depth -= 1
+            self._tree_node = self._tree_node.parent
+
+    def _start_custom_properties(self, attrs: Dict[str, str]) -> None:
+        if self._tree_node is not None and self._path[-2] in (
+            LAYER_TREE_GROUP,
+            LAYER_TREE_LAYER,
+        ):
+            self._custom_properties_depth = len(self._path)
+            self._custom_properties = {}
+            self._custom_options = {}
+
+    def _start_custom_property(self, name: str, attrs: Dict[str, str]) -> None:
+        # first definition of a key is used
+        if name == "property" and "key" in attrs:
+            self._custom_properties.setdefault(attrs["key"], attrs.get("value", ""))
+        elif name == "Option" and "name" in attrs:
+            self._custom_options.setdefault(attrs["name"], attrs.get("value", ""))
+
+    def _end_custom_properties(self) -> None:
+        # property elements are read before Option elements
+        custom_properties = dict(self._custom_options)
+        custom_properties.update(self._custom_properties)
+        self._tree_node.custom_properties = custom_properties
+        self._custom_properties_depth = 0
+
+    def _start_property_text(self, attrs: Dict[str, str]) -> None:
+        if self._path == _TITLE_PATH or self._path == _ABSOLUTE_PATH:
+            self._text = []
+
+    def _end_title(self, text: str) -> None:
+        if self._path == _TITLE_PATH:
+            self.project.title = text
+
+    def _end_absolute(self, text: str) -> None:
+        if self._path == _ABSOLUTE_PATH:
+            self.project.absolute = text == "true"
+
+    def _start_trust(self, attrs: Dict[str, str]) -> None:
+        if self._path == _TRUST_PATH:
+            self.project.trusted = attrs.get("active", "") == "1"
+
+    def _start_relations(self, attrs: Dict[str, str]) -> None:
+        if self._path == _RELATIONS_PATH:
+            self._start_copy()
+
+    def _end_relations(self, text: str) -> None:
+        if self._path == _RELATIONS_PATH:
+            offset, length = self._end_copy()
+            self.project.relations_xml_offset = offset
+            self.project.relations_xml_length = length
+
+    def _start_relation(self, attrs: Dict[str, str]) -> None:
+        if self._path[:-1] == _RELATIONS_PATH:
+            self.project.relations.append(
+                (attrs.get("referencedLayer", ""), attrs.get("referencingLayer", ""))
+            )
+
+    def _character_data(self, data: str) -> None:
+        if self._text is not None:
+            self._text.append(data)
+
+    def _pop_text(self) -> str:
+        """Return the text read for current element.
+        Like QDomDocument, whitespace-only text is ignored.
+
+        :return: text of current element
+        :rtype: str
+        """
+        if self._text is None:
+            return ""
+        text = "".join(self._text)
+        self._text = None
+        if not text.strip():
+            return ""
+        return text
+
+
+# ############################################################################
+# ########## Functions #############
+# ##################################
+
+
+def open_qgs_stream(filename: str) -> BinaryIO:
+    """Open a binary stream on the .qgs content of a QGIS project.
+    For a .qgz archive, only the .qgs member is read.
+
+    :param filename: path to the .qgs or .qgz file
+    :type filename: str
+    :raises ValueError: the file is not a QGIS project
+    :return: opened binary stream, must be closed by caller
+    :rtype: BinaryIO
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".qgs":
+        return open(filename, "rb")
+    if suffix == ".qgz":
+        archive = zipfile.ZipFile(filename, "r")
+        try:
+            for member in archive.namelist():
+                if member.lower().endswith(".qgs"):
+                    stream = archive.open(member)
+                    # archive is closed when the member stream is closed
+                    archive.close()
+                    return stream
+        except Exception:
+            archive.close()
+            raise
+        archive.close()
+    raise ValueError(f"No QGIS project (.qgs) found in {filename}")
+
+
+def scan_project(
+    filename: str,
+    copy_stream: Optional[BinaryIO] = None,
+    locate_elements: bool = False,
+) -> ScannedProject:
+    """Scan a QGIS project file (.qgs or .qgz)
+
+    :param filename: path to the QGIS project file
+    :type filename: str
+    :param copy_stream: binary stream where maplayer and relations elements are
+    copied, defaults to None (no copy)
+    :type copy_stream: Optional[BinaryIO], optional
+    :param locate_elements: store the position of maplayer and relations elements in
+    the .qgs content, when they are not copied, defaults to False
+    :type locate_elements: bool, optional
+    :return: scanned project
+    :rtype: ScannedProject
+    """
+    with open_qgs_stream(filename) as stream:
+        return ProjectScanner(copy_stream, locate_elements).scan(stream)
@@ -5,38 +5,46 @@
 """
 
 # Standard library
+import json
 import logging
 import os
 import zipfile
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
 from urllib.parse import urlparse
 
 # PyQGIS
 from qgis.core import (
-    QgsFileDownloader,
+    QgsBlockingNetworkRequest,
     QgsReadWriteContext,
     QgsMessageLog,
     QgsApplication,
 )
 from qgis.PyQt import QtXml
 from qgis.PyQt.QtCore import (
-    QDir,
-    QEventLoop,
     QFile,
     QFileInfo,
     QIODevice,
-    QTemporaryDir,
+    Qt,
     QUrl,
 )
+from qgis.PyQt.QtNetwork import QNetworkRequest
 
 from qgis.utils import iface
 
 # project
 from menu_from_project.logic.cache_manager import CacheManager
+from menu_from_project.logic.document_cache import DocumentCache
+from menu_from_project.logic.file_utils import get_temporary_path, write_file_atomically
+from menu_from_project.logic.layer_recipe import LayerRecipeStore
+from menu_from_project.logic.project_scan import (
+    ScannedMapLayer,
+    ScannedProject,
+    open_qgs_stream,
+    scan_project,
+)
 from menu_from_project.logic.tools import guess_type_from_uri
-from menu_from_project.logic.xml_utils import getFirstChildByTagNameValue
 from menu_from_project.__about__ import __title__, __title_clean__
 
 # ############################################################################
@@ -48,6 +56,13 @@ logger = logging.getLogger(__name__)
 cache_folder = Path.home() / f".cache/QGIS/{__title_clean__}"
 cache_folder.mkdir(exist_ok=True, parents=True)
 
+# HTTP validators (ETag, Last-Modified) are stored next to downloaded projects
+HTTP_VALIDATORS_SUFFIX = ".http.json"
+# Project storage metadata are stored next to projects exported from database
+STORAGE_METADATA_SUFFIX = ".storage.json"
+# memory used by a QDomDocument, relative to the size of its XML content
+DOM_SIZE_FACTOR = 5
+
 
 # ############################################################################
 # ########## Functions #############
@@ -93,7 +108,8 @@ def project_trusted(doc):
 
 
 def create_map_layer_dict(doc: QtXml.QDomDocument) -> Dict[str, QtXml.QDomNode]:
-    """Create dict key : layer id, value : layer node
+    """Create dict key : layer id, value : layer node.
+    If several maplayer nodes use the same id, the first one is kept.
 
     :param doc: input qgis project xml document
     :type doc: QtXml.QDomDocument
@@ -105,28 +121,35 @@ def create_map_layer_dict(doc: QtXml.QDomDocument) -> Dict[str, QtXml.QDomNode]:
     for node in (nodes.at(i) for i in range(nodes.size())):
         nd = node.namedItem("id")
         if nd:
-            r[nd.firstChild().toText().data()] = node
+            r.setdefault(nd.firstChild().toText().data(), node)
 
     return r
 
 
-def get_project_title(doc: QtXml.QDomDocument) -> str:
-    """Return the project title defined in the XML document.
-    :param doc: The QGIS project as XML document. Default to None.
-    :type doc: QDomDocument
-    :return: The title or None.
-    :rtype: string
-    """
-    tags = doc.elementsByTagName("qgis")
-    if tags.count():
-        node = tags.at(0)
-        title_node = node.namedItem("title")
-        return title_node.firstChild().toText().data()
+def estimate_document_size(project_path: str) -> int:
+    """Estimate memory used by the XML document of a QGIS project file, from the
+    size of its .qgs content
 
-    return None
+    :param project_path: path to the .qgs or .qgz file
+    :type project_path: str
+    :return: estimated size in bytes, 0 if the file is not available
+    :rtype: int
+    """
+    try:
+        if Path(project_path).suffix.lower() == ".qgz":
+            with zipfile.ZipFile(project_path) as archive:
+                size = sum(
+                    info.file_size
+                    for info in archive.infolist()
+                    if info.filename.lower().endswith(".qgs")
+                )
+        else:
+            size = Path(project_path).stat().st_size
+    except (OSError, zipfile.BadZipFile):
+        size = 0
+    return size * DOM_SIZE_FACTOR
 
 
-@lru_cache()
 def read_from_file(uri: str) -> QtXml.QDomDocument:
     """Read a QGIS project (.qgs and .qgz) from a file path and returns d
 
@@ -146,16 +169,9 @@ def read_from_file(uri: str) -> QtXml.QDomDocument:
         doc.setContent(file)
 
     elif file.exists() and (QFileInfo(file).suffix() == "qgz"):
-        temporary_unzip = QTemporaryDir()
-        temporary_unzip.setAutoRemove(False)
-        with zipfile.ZipFile(uri, "r") as zip_ref:
-            zip_ref.extractall(temporary_unzip.path())
-
-        project_filename = QDir(temporary_unzip.path()).entryList(["*.qgs"])[0]
-        project_path = os.path.join(temporary_unzip.path(), project_filename)
-        xml = QFile(project_path)
-        if xml.open(QIODevice.ReadOnly | QIODevice.Text):
-            doc.setContent(xml)
+        # only the .qgs member is decompressed, in memory
+        with open_qgs_stream(uri) as qgs_stream:
+            doc.setContent(qgs_stream.read())
 
     return doc
 
@@ -171,19 +187,86 @@ def read_from_database(
     :return: a tuple with XML document and the filepath.
     :rtype: Tuple[QtXml.QDomDocument, str]
     """
+    project_file = download_from_database(uri, project_registry, download_folder)
+    doc = read_from_file(project_file)
+    return doc, project_file
+
+
+def download_from_database(uri: str, project_registry, download_folder: Path) -> str:
+    """Export a QGIS project stored into a (PostgreSQL) database to a local .qgz file.
+
+    The last modification date of the project is stored next to the exported file:
+    if it did not change, the project is not exported again. If the export fails, the
+    previous export is used if any. The file is replaced atomically, the modification
+    date being written last.
+
+    :param uri: connection string to QGIS project stored into a database.
+    :type uri: str
+    :param project_registry: QGIS project storage registry
+    :type project_registry: QgsProjectStorageRegistry
+    :param download_folder: folder where the project is exported
+    :type download_folder: Path
+    :raises OSError: project metadata can't be read, or export failed and no previous
+    export is available
+
+    :return: path to the exported file
+    :rtype: str
+    """
     # uri PG
     project_storage = project_registry.projectStorageFromUri(uri)
-    _, metadata = project_storage.readProjectStorageMetadata(uri)
+    if project_storage is None:
+        raise OSError(f"No project storage available for {uri}")
+    ok, metadata = project_storage.readProjectStorageMetadata(uri)
+    if not ok:
+        raise OSError(f"Project storage metadata of {uri} can't be read")
 
     project_file = download_folder / f"{metadata.name}.qgz"
-    temporary_zip = QFile(str(project_file))
-    temporary_zip.open(QIODevice.WriteOnly)
+    storage_filepath = project_file.with_name(
+        project_file.name + STORAGE_METADATA_SUFFIX
+    )
+    storage_metadata = {
+        "uri": uri,
+        "last_modified": metadata.lastModified.toString(Qt.ISODateWithMs),
+    }
+
+    # project not modified since last export
+    if project_file.exists() and storage_filepath.exists():
+        try:
+            previous_metadata = json.loads(storage_filepath.read_text(encoding="UTF-8"))
+        except ValueError:
+            previous_metadata = None
+        if previous_metadata == storage_metadata:
+            return str(project_file)
+
+    # remove storage metadata while export is not finished
+    storage_filepath.unlink(missing_ok=True)
+
+    # project is exported to a temporary file, an interrupted export leaves the
+    # previous export unchanged
+    download_folder.mkdir(parents=True, exist_ok=True)
+    tmp_path = get_temporary_path(project_file)
+    temporary_zip = QFile(str(tmp_path))
+    try:
+        if not temporary_zip.open(QIODevice.WriteOnly):
+            raise OSError(f"{tmp_path} can't be written")
+        exported = project_storage.readProject(
+            uri, temporary_zip, QgsReadWriteContext()
+        )
+        temporary_zip.close()
+        if exported:
+            os.replace(tmp_path, project_file)
+    finally:
+        temporary_zip.close()
+        tmp_path.unlink(missing_ok=True)
 
-    project_storage.readProject(uri, temporary_zip, QgsReadWriteContext())
-    temporary_zip.close()
+    if not exported:
+        downloadError([f"Export of {uri} failed"])
+        if not project_file.exists():
+            raise OSError(f"Export of {uri} failed")
+        return str(project_file)
 
-    doc = read_from_file(str(project_file))
-    return doc, str(project_file)
+    write_file_atomically(storage_filepath, json.dumps(storage_metadata).encode())
+    return str(project_file)
 
 
 def downloadError(errorMessages):
@@ -193,7 +276,6 @@ def downloadError(errorMessages):
         )
 
 
-@lru_cache()
 def read_from_http(uri: str, download_folder: Path):
     """Read a QGIS project stored into on a remote web server accessible through HTTP.
 
@@ -203,6 +285,27 @@ def read_from_http(uri: str, download_folder: Path):
     :return: a tuple with XML document and the filepath.
     :rtype: Tuple[QtXml.QDomDocument, str]
     """
+    cached_filepath = download_from_http(uri, download_folder)
+    return read_from_file(cached_filepath), cached_filepath
+
+
+def download_from_http(uri: str, download_folder: Path) -> str:
+    """Download a QGIS project stored into on a remote web server accessible through HTTP.
+
+    Validators (ETag, Last-Modified) of the response are stored next to the downloaded
+    file and sent back in a conditional request: on 304 Not Modified, the local copy
+    is used without downloading it again. If the download fails, the previous copy is
+    used if any. Files are replaced atomically, validators being written last.
+
+    :param uri: web URL to the QGIS project
+    :type uri: str
+    :param download_folder: folder where the project is downloaded
+    :type download_folder: Path
+    :raises OSError: download failed and no previous copy is available
+
+    :return: path to the downloaded file
+    :rtype: str
+    """
     # get filename from URL parts
     parsed = urlparse(uri)
     if not parsed.path.rpartition("/")[2].endswith((".qgs", ".qgz")):
@@ -212,18 +315,50 @@ def read_from_http(uri: str, download_folder: Path):
             )
         )
     cached_filepath = download_folder / parsed.path.rpartition("/")[2]
+    validators_filepath = cached_filepath.with_name(
+        cached_filepath.name + HTTP_VALIDATORS_SUFFIX
+    )
+
+    # conditional request if a previous download is available
+    validators = {}
+    if cached_filepath.exists() and validators_filepath.exists():
+        try:
+            validators = json.loads(validators_filepath.read_text(encoding="UTF-8"))
+        except ValueError:
+            validators = {}
+
+    request = QNetworkRequest(QUrl(uri))
+    if validators.get("etag"):
+        request.setRawHeader(b"If-None-Match", validators["etag"].encode())
+    if validators.get("last_modified"):
+        request.setRawHeader(b"If-Modified-Since", validators["last_modified"].encode())
 
     # download it
-    loop = QEventLoop()
-    project_download = QgsFileDownloader(
-        url=QUrl(uri), outputFileName=str(cached_filepath), delayStart=True
-    )
-    project_download.downloadExited.connect(loop.quit)
-    project_download.downloadError.connect(downloadError)
-    project_download.startDownload()
-    loop.exec_()
+    project_download = QgsBlockingNetworkRequest()
+    error = project_download.get(request, forceRefresh=True)
+    reply = project_download.reply()
+    status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+
+    if status == 304:
+        # Not Modified: local copy is up to date
+        return str(cached_filepath)
+
+    if error != QgsBlockingNetworkRequest.NoError:
+        downloadError([project_download.errorMessage()])
+        if not cached_filepath.exists():
+            raise OSError(
+                f"Download of {uri} failed: {project_download.errorMessage()}"
+            )
+        return str(cached_filepath)
+
+    write_file_atomically(cached_filepath, bytes(reply.content()))
+    validators = {
+        "etag": bytes(reply.rawHeader(b"ETag")).decode(),
+        "last_modified": bytes(reply.rawHeader(b"Last-Modified")).decode(),
+    }
+    write_file_atomically(validators_filepath, json.dumps(validators).encode())
 
-    return read_from_file(str(cached_filepath)), str(cached_filepath)
+    return str(cached_filepath)
 
 
 class QgsDomManager:
@@ -231,15 +366,63 @@ class QgsDomManager:
     - file
     - postgres
     - url
-    Read xml document are stored in a dict.
+    Read xml documents are kept in a least recently used cache limited by their
+    estimated size, scanned projects are stored in a dict.
+
+    :param project: project used to check cache in project cache directory,
+    defaults to None
+    :type project: Optional[Dict[str, str]], optional
+    :param max_document_bytes: estimated memory budget of xml documents, least
+    recently used documents are removed first, defaults to None (no limit)
+    :type max_document_bytes: Optional[int], optional
+    :param layer_recipes_folder: folder of layer load recipes, saved when projects
+    are scanned and used to load layers without reading their project,
+    defaults to None (no recipes)
+    :type layer_recipes_folder: Optional[Path], optional
     """
 
-    def __init__(self, project: Optional[Dict[str, str]] = None) -> None:
-        self.docs = dict()
+    def __init__(
+        self,
+        project: Optional[Dict[str, str]] = None,
+        max_document_bytes: Optional[int] = None,
+        layer_recipes_folder: Optional[Path] = None,
+    ) -> None:
+        # uri: (xml document, project path)
+        # ("recipes", uri): (xml document built from recipes, layer ids, maplayer nodes index)
+        self.docs = DocumentCache(max_document_bytes)
+        self.recipe_store = None
+        if layer_recipes_folder is not None:
+            self.recipe_store = LayerRecipeStore(layer_recipes_folder)
+        self.layer_indexes = dict()
+        # uri: relations index, built once per document
+        self.relation_indexes = dict()
+        self.scans = dict()
         self.project_registry = QgsApplication.projectStorageRegistry()
         self.project = project
         self.cache_manager = CacheManager(iface)
 
+    def clear(self) -> None:
+        """Remove all read xml documents and scanned projects"""
+        self.docs.clear()
+        self.layer_indexes.clear()
+        self.relation_indexes.clear()
+        self.scans.clear()
+        if self.recipe_store is not None:
+            self.recipe_store.clear()
+
+    def forget(self, uri: str) -> None:
+        """Remove read xml documents and scanned project of an uri, other documents
+        are kept
+
+        :param uri: uri of the project
+        :type uri: str
+        """
+        for key in (uri, ("recipes", uri)):
+            self.docs.pop(key)
+            self.layer_indexes.pop(key, None)
+            self.relation_indexes.pop(key, None)
+        self.scans.pop(uri, None)
+
     def set_project(self, project: Optional[Dict[str, str]]) -> None:
         """Define project used to check cache in project cache directory
 
@@ -266,6 +449,7 @@ class QgsDomManager:
 
         :param uri: The URI to fetch.
         :type uri: str
+        :raises ValueError: unrecognized project type
 
         :return: Tuple with XML document and the filepath.
         :rtype: (QDomDocument, str)
@@ -274,8 +458,9 @@ class QgsDomManager:
         qgs_storage_type = guess_type_from_uri(uri)
 
         # check if docs is already here
-        if uri in self.docs:
-            return self.docs[uri], uri
+        cached = self.docs.get(uri)
+        if cached is not None:
+            return cached
 
         if qgs_storage_type == "file":
             doc = read_from_file(uri)
@@ -290,14 +475,97 @@ class QgsDomManager:
             QgsMessageLog.logMessage(
                 f"Unrecognized project type: {uri}", __title__, notifyUser=True
             )
+            raise ValueError(f"Unrecognized project type: {uri}")
 
         # store doc into the plugin registry
-        self.docs[uri] = doc
+        self.layer_indexes.pop(uri, None)
+        self.relation_indexes.pop(uri, None)
+        self.storeDoc(uri, (doc, project_path), estimate_document_size(project_path))
 
         return doc, project_path
 
+    def storeDoc(self, key: Hashable, value: Tuple, size: int) -> None:
+        """Store a document in cache, remove least recently used documents over
+        budget and their indexes.
+
+        :param key: uri of the project, or ("recipes", uri) for recipes documents
+        :type key: Hashable
+        :param value: cached tuple, starting with the xml document
+        :type value: Tuple
+        :param size: estimated size of the document in bytes
+        :type size: int
+        """
+        for removed_key in self.docs.put(key, value, size):
+            self.layer_indexes.pop(removed_key, None)
+            self.relation_indexes.pop(removed_key, None)
+
+    def getLayersQgsDoc(
+        self, uri: str, layerIds: List[str]
+    ) -> Tuple[QtXml.QDomDocument, str]:
+        """Return a XML document containing some layers of a project and the path.
+
+        If layer load recipes are available for all layers, the document is built from
+        recipes and only contains these layers and their linked layers. Otherwise the
+        project XML document is returned.
+
+        :param uri: The URI of the project.
+        :type uri: str
+        :param layerIds: ids of the layers needed in the document
+        :type layerIds: List[str]
+
+        :return: Tuple with XML document and the filepath.
+        :rtype: (QDomDocument, str)
+        """
+        if uri not in self.docs and self.recipe_store is not None:
+            doc = self.getRecipeDoc(uri, layerIds)
+            if doc is not None:
+                return doc, uri
+        return self.getQgsDoc(uri)
+
+    def getRecipeDoc(
+        self, uri: str, layerIds: List[str]
+    ) -> Optional[QtXml.QDomDocument]:
+        """Return a XML document built from layer load recipes of a project.
+        The document of a project is built again with previous layers when new layers
+        are needed.
+
+        :param uri: The URI of the project.
+        :type uri: str
+        :param layerIds: ids of the layers needed in the document
+        :type layerIds: List[str]
+
+        :return: XML document, None if recipes are not available for all layers
+        :rtype: Optional[QDomDocument]
+        """
+        layer_ids = self.recipe_store.get_layer_ids(uri, layerIds)
+        if layer_ids is None:
+            return None
+
+        cached = self.docs.get(("recipes", uri))
+        if cached is not None:
+            doc, loaded_ids, _ = cached
+            if layer_ids <= loaded_ids:
+                return doc
+            layer_ids |= loaded_ids
+
+        content = self.recipe_store.get_document_content(uri, layer_ids)
+        if content is None:
+            return None
+        doc = QtXml.QDomDocument()
+        doc.setContent(content)
+        if doc.documentElement().isNull():
+            return None
+
+        self.storeDoc(
+            ("recipes", uri),
+            (doc, layer_ids, create_map_layer_dict(doc)),
+            len(content) * DOM_SIZE_FACTOR,
+        )
+        return doc
+
     def getMapLayerDomFromQgs(self, fileName: str, layerId: str) -> QtXml.QDomNode:
         """Return the maplayer node in a project filepath given a maplayer ID.
+        Documents built from layer load recipes are used first.
 
         :param fileName: The project filepath on the filesystem.
         :type fileName: basestring
@@ -305,10 +573,115 @@ class QgsDomManager:
         :param layerId: The layer ID to look for in the project.
         :type layerId: basestring
 
-        :return: The XML node of the layer.
+        :return: The XML node of the layer, None if not found.
         :rtype: QDomNode
         """
-        doc, _ = self.getQgsDoc(fileName)
-        return getFirstChildByTagNameValue(
-            doc.documentElement(), "maplayer", "id", layerId
-        )
+        if ("recipes", fileName) in self.docs:
+            node = self.docs.get(("recipes", fileName))[2].get(layerId)
+            if node is not None:
+                return node
+        return self.getMapLayerIndex(fileName).get(layerId)
+
+    def getMapLayerIndex(self, uri: str) -> Dict[str, QtXml.QDomNode]:
+        """Return the index of maplayer nodes of a project, built once per document.
+
+        :param uri: The URI of the project.
+        :type uri: str
+
+        :return: dict of layer id to maplayer node
+        :rtype: Dict[str, QtXml.QDomNode]
+        """
+        if uri not in self.layer_indexes:
+            doc, _ = self.getQgsDoc(uri)
+            self.layer_indexes[uri] = create_map_layer_dict(doc)
+        return self.layer_indexes[uri]
+
+    def getProjectScan(self, uri: str) -> Tuple[ScannedProject, str]:
+        """Return the scanned project and the path from an URI.
+
+        The project is read with a streaming scanner, no XML document is built.
+
+        :param uri: The URI to fetch.
+        :type uri: str
+        :raises ValueError: unrecognized project type
+
+        :return: Tuple with scanned project and the filepath.
+        :rtype: (ScannedProject, str)
+        """
+        # check if project is already scanned
+        if uri in self.scans:
+            return self.scans[uri]
+
+        # determine storage type: file, database or http
+        qgs_storage_type = guess_type_from_uri(uri)
+        if qgs_storage_type == "file":
+            project_path = uri
+        elif qgs_storage_type == "database":
+            project_path = download_from_database(
+                uri, self.project_registry, self._get_download_folder()
+            )
+        elif qgs_storage_type == "http":
+            project_path = download_from_http(uri, self._get_download_folder())
+        else:
+            QgsMessageLog.logMessage(
+                f"Unrecognized project type: {uri}", __title__, notifyUser=True
+            )
+            raise ValueError(f"Unrecognized project type: {uri}")
+
+        if self.recipe_store is not None:
+            # layer load recipes are saved while scanning
+            scan = self.recipe_store.scan_project(project_path)
+        else:
+            scan = scan_project(project_path)
+        self.scans[uri] = scan, project_path
+
+        return self.scans[uri]
+
+    def prefetchProjectScans(
+        self, uris: Iterable[str], max_workers: int
+    ) -> Tuple[Dict[str, ScannedProject], Dict[str, Exception]]:
+        """Scan several projects concurrently, so that projects on slow storage
+        (network share, web server) are fetched at the same time.
+
+        Errors are returned, not raised: they are raised again when the project is
+        used.
+
+        :param uris: The URIs of the projects.
+        :type uris: Iterable[str]
+        :param max_workers: maximum number of projects scanned at the same time
+        :type max_workers: int
+
+        :return: dict of uri to scanned project, for successfully scanned projects,
+        and dict of uri to exception, for failed scans
+        :rtype: Tuple[Dict[str, ScannedProject], Dict[str, Exception]]
+        """
+        uris = set(uris)
+        to_scan = [uri for uri in uris if uri not in self.scans]
+        errors = {}
+        if to_scan:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self.getProjectScan, uri): uri for uri in to_scan
+                }
+                for future in as_completed(futures):
+                    if exc := future.exception():
+                        errors[futures[future]] = exc
+
+        scans = {uri: self.scans[uri][0] for uri in uris if uri in self.scans}
+        return scans, errors
+
+    def getMapLayerScanFromQgs(
+        self, fileName: str, layerId: str
+    ) -> Optional[ScannedMapLayer]:
+        """Return the scanned maplayer in a project filepath given a maplayer ID.
+
+        :param fileName: The project filepath on the filesystem.
+        :type fileName: str
+        :param layerId: The layer ID to look for in the project.
+        :type layerId: str
+
+        :return: The scanned maplayer, None if not found.
+        :rtype: Optional[ScannedMapLayer]
+        """
+        scan, _ = self.getProjectScan(fileName)
+        return scan.maplayers.get(layerId)
@@ -0,0 +1,55 @@
+#! python3  # noqa: E265
+
+"""
+    Index of the relations of a QGIS project, used to load linked layers.
+"""
+
+# Standard library
+from typing import Dict, List, Optional
+
+# ############################################################################
+# ########## Classes ###############
+# ##################################
+
+
+class RelationIndex:
+    """Relations of a project indexed by referenced and referencing layer ids.
+
+    Relations are dicts with the attributes of the relation and field pair
+    (strength, referencedLayer, id, name, referencingLayer, referencedField,
+    referencingField). Copies are returned, so that callers can modify them.
+
+    :param relations: relations of the project
+    :type relations: List[Dict[str, str]]
+    """
+
+    def __init__(self, relations: List[Dict[str, str]]) -> None:
+        self.relations = relations
+        self.by_referenced: Dict[str, List[Dict[str, str]]] = {}
+        self.by_referencing: Dict[str, List[Dict[str, str]]] = {}
+        for relation in relations:
+            self.by_referenced.setdefault(relation["referencedLayer"], []).append(
+                relation
+            )
+            self.by_referencing.setdefault(relation["referencingLayer"], []).append(
+                relation
+            )
+
+    def get_relations(
+        self, source: Optional[str] = None, target: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Return copies of relations with referencedLayer and/or referencingLayer.
+
+        :param source: layer id for referencedLayer, defaults to None
+        :type source: Optional[str], optional
+        :param target: layer id for referencingLayer, defaults to None
+        :type target: Optional[str], optional
+        :return: relations dict list
+        :rtype: List[Dict[str, str]]
+        """
+        relations = []
+        if source is not None:
+            relations += self.by_referenced.get(source, [])
+        if target is not None:
+            relations += self.by_referencing.get(target, [])
+        return [dict(relation) for relation in relations]
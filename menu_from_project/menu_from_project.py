@@ -21,11 +21,21 @@ email                : xavier.culos@eau-adour-garonne.fr
 # Standard library
 import logging
 import os
-from typing import Dict, Optional, List, Tuple, Any
+from collections import deque
+from dataclasses import dataclass, field, replace
+from functools import partial
+from typing import Callable, Dict, Optional, List, Set, Tuple, Any
 
 # PyQGIS
 from menu_from_project.logic.cache_manager import CacheManager
+from menu_from_project.logic.config_codec import set_layer_metadata
+from menu_from_project.logic.fingerprint import (
+    get_embedded_filenames,
+    get_project_fingerprint,
+    get_source_fingerprint,
+)
 from menu_from_project.logic.layer_load import LayerLoad
+from menu_from_project.logic.project_diff import match_projects
 from menu_from_project.toolbelt.preferences import (
     SOURCE_MD_LAYER,
     SOURCE_MD_NOTE,
@@ -38,19 +48,15 @@ from qgis.core import (
     QgsSettings,
     QgsTask,
 )
-from qgis.PyQt.QtCore import QCoreApplication, QFileInfo, Qt, QTranslator
+from qgis.PyQt.QtCore import QCoreApplication, QFileInfo, Qt, QTimer, QTranslator
 from qgis.PyQt.QtGui import QFont, QIcon
-from qgis.PyQt.QtWidgets import QAction, QMenu
+from qgis.PyQt.QtWidgets import QAction, QMenu, QWidget
 from qgis.PyQt.QtCore import QLocale, QUrl, QDir
 from qgis.PyQt.QtGui import QDesktopServices
 
 # project
 from menu_from_project.__about__ import DIR_PLUGIN_ROOT, __title__, __title_clean__
-from menu_from_project.logic.qgs_manager import (
-    QgsDomManager,
-    read_from_file,
-    read_from_http,
-)
+from menu_from_project.logic.qgs_manager import QgsDomManager
 from menu_from_project.logic.tools import (
     icon_per_layer_type,
 )
@@ -69,6 +75,9 @@ from menu_from_project.logic.project_read import get_project_menu_config
 
 logger = logging.getLogger(__name__)
 
+# delay before menus are updated, requests received meanwhile are coalesced (ms)
+MENUS_UPDATE_DELAY = 200
+
 # ############################################################################
 # ########## Functions #############
 # ##################################
@@ -115,14 +124,25 @@ def showPluginHelp(packageName: str = None, filename: str = "index", section: st
 # ##################################
 
 
+@dataclass
+class ProjectMenuHost:
+    """Menu added to QGIS instance for a project and its following "merge" projects"""
+
+    location: str
+    project_indexes: List[int] = field(default_factory=list)
+    menu: Optional[QMenu] = None
+    action: Optional[QAction] = None
+    # (layer config or layers of "Load all", menu) of actions, by action data key
+    entries: List[Tuple[Any, QMenu]] = field(default_factory=list)
+
+
 class MenuFromProject:
 
     def on_initializationCompleted(self):
         # build menu
-        self.initMenus()
+        self.request_menus_update()
 
     def __init__(self, iface):
-        self.task = None
         self.path = QFileInfo(os.path.realpath(__file__)).path()
 
         # default lang
@@ -140,14 +160,36 @@ class MenuFromProject:
         self.iface = iface
         self.toolBar = None
 
-        self.qgs_dom_manager = QgsDomManager()
         self.menubarActions = []
         self.layerMenubarActions = []
+        # project menu configurations and menus added to QGIS instance
+        self.project_configs = []
+        self.hosts = []
+        # options used to build menus, menus are built again when they change
+        self.menu_options = None
+        # project loads: indexes of projects not loaded yet, waiting and running tasks
+        self.pending_indexes = set()
+        self.load_queue = deque()
+        self.load_tasks = {}
+        # canceled tasks still running: (generation, index) -> project file. They
+        # count in parallel loads and their project file isn't read again meanwhile
+        self.canceled_loads: Dict[Tuple[int, int], str] = {}
+        # increased on each loads cancelation, results of previous loads are ignored
+        self.load_generation = 0
+        # menus update requests are coalesced
+        self.menus_update_timer = QTimer()
+        self.menus_update_timer.setSingleShot(True)
+        self.menus_update_timer.setInterval(MENUS_UPDATE_DELAY)
+        self.menus_update_timer.timeout.connect(self.initMenus)
         self.canvas = self.iface.mapCanvas()
 
         self.mapLayerIds = {}
 
         self.plg_settings = PlgOptionsManager()
+        # layer loader shared by all menu actions
+        self.layer_loader = LayerLoad(
+            layer_recipes_folder=CacheManager(self.iface).get_layer_recipes_dir()
+        )
 
         self.action_project_configuration = None
         self.action_menu_help = None
@@ -163,166 +205,638 @@ class MenuFromProject:
             f"{indent_chars}{message}", application, notifyUser=True
         )
 
+    def request_menus_update(self) -> None:
+        """Request a menus update: menus are updated once after a short delay, even if
+        many requests are received meanwhile"""
+        self.menus_update_timer.start()
+
     def initMenus(self):
+        """Build project menus from configured projects.
+
+        Projects of previous build are matched by uri and name: their configurations
+        and menus are kept, only menus of added, removed, renamed or moved projects
+        are changed and only added, renamed or not loaded projects are loaded. All
+        menus are built again, without loading projects, if menu options changed.
+        """
+        settings = self.plg_settings.get_plg_settings()
+        menu_options = (settings.optionTooltip, settings.optionLoadAll)
+        rebuild_all = menu_options != self.menu_options
+        self.menu_options = menu_options
+
+        # projects of previous build not checked yet are loaded again
+        unchecked = self.pending_indexes.union(self.load_queue, self.load_tasks)
+        self.cancel_project_loads()
+
+        previous_configs = self.project_configs
+        matches = match_projects(
+            [project for project, _ in previous_configs], settings.projects
+        )
+        project_configs = []
+        index_map = {}
+        changed_indexes = set()
+        pending_indexes = set()
+        load_queue = deque()
+        for index, (project, previous_index) in enumerate(
+            zip(settings.projects, matches)
+        ):
+            if previous_index is None:
+                project_configs.append((project, None))
+                changed_indexes.add(index)
+                load_queue.append(index)
+                continue
+
+            index_map[previous_index] = index
+            previous_project, project_config = previous_configs[previous_index]
+            if previous_project["name"] != project["name"]:
+                # renamed project: menu title changes, cache is saved under new name
+                changed_indexes.add(index)
+                load_queue.append(index)
+                project_config = self.rename_project_config(project, project_config)
+            elif previous_index in unchecked or project_config is None:
+                load_queue.append(index)
+            if previous_index in self.pending_indexes:
+                pending_indexes.add(index)
+            project_configs.append((project, project_config))
+
+        if settings.cache_background_refresh:
+            # Menus are built from cache right now, projects are checked in background
+            for index in changed_indexes:
+                if project_configs[index][1] is None:
+                    project_configs[index] = self.load_cached_project_configs(
+                        [project_configs[index][0]]
+                    )[0]
+        else:
+            # Menus are built as soon as their projects are loaded
+            pending_indexes.update(
+                index for index in changed_indexes if project_configs[index][1] is None
+            )
+
+        self.prune_removed_projects(previous_configs, project_configs, index_map)
+        self.keep_host_menus(index_map)
+
+        self.project_configs = project_configs
+        self.pending_indexes = pending_indexes
+        if rebuild_all:
+            changed_indexes = set(range(len(project_configs)))
+        self.update_menus(changed_indexes)
+
+        self.load_queue = load_queue
+        self.start_project_loads()
+
+    def rename_project_config(
+        self,
+        project: Dict[str, str],
+        project_config: Optional[MenuProjectConfig],
+    ) -> Optional[MenuProjectConfig]:
+        """Get menu config of a renamed project
+
+        :param project: dict of information about the renamed project
+        :type project: Dict[str, str]
+        :param project_config: project menu config before rename, None if not loaded
+        :type project_config: Optional[MenuProjectConfig]
+        :return: project menu config with new name, None if the project must be
+            loaded again
+        :rtype: Optional[MenuProjectConfig]
+        """
+        if not project_config or not project["name"]:
+            return None
+        return replace(project_config, project_name=project["name"])
+
+    def prune_removed_projects(
+        self,
+        previous_configs: List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]],
+        project_configs: List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]],
+        index_map: Dict[int, int],
+    ) -> None:
+        """Forget documents and cached data of removed projects. Cached data of
+        renamed projects are moved to their new name.
+
+        :param previous_configs: projects and their menu config of previous build
+        :type previous_configs: List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]]
+        :param project_configs: projects and their menu config of new build
+        :type project_configs: List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]]
+        :param index_map: new index of kept projects, by previous index
+        :type index_map: Dict[int, int]
+        """
+        for previous_index, (project, project_config) in enumerate(previous_configs):
+            if previous_index not in index_map:
+                self.forget_project_documents(project, project_config)
+
+        try:
+            cache_manager = CacheManager(self.iface)
+            for previous_index, index in index_map.items():
+                previous_project = previous_configs[previous_index][0]
+                project, project_config = project_configs[index]
+                if project_config and previous_project["name"] != project["name"]:
+                    cache_manager.rename_project(
+                        previous_project, project, project_config
+                    )
+            cache_manager.prune_projects([project for project, _ in project_configs])
+        except OSError as exc:
+            self.log(f"Cache of removed projects can't be pruned: {exc}")
+
+    def keep_host_menus(self, index_map: Dict[int, int]) -> None:
+        """Remove menus of removed projects. Other menus are kept if their projects
+        are still grouped in the same way.
+
+        :param index_map: new index of kept projects, by previous index
+        :type index_map: Dict[int, int]
+        """
+        hosts = []
+        for host in self.hosts:
+            project_indexes = [index_map.get(i) for i in host.project_indexes]
+            if None in project_indexes:
+                self.remove_host_menu(host)
+            else:
+                host.project_indexes = project_indexes
+                hosts.append(host)
+        self.hosts = hosts
+
+    def forget_project_documents(
+        self, project: Dict[str, str], project_config: Optional[MenuProjectConfig]
+    ) -> None:
+        """Remove read xml documents of a project from layer loader
+
+        :param project: dict of information about the project
+        :type project: Dict[str, str]
+        :param project_config: project menu config, None if not loaded
+        :type project_config: Optional[MenuProjectConfig]
+        """
+        qgs_dom_manager = self.layer_loader.qgs_dom_manager
+        qgs_dom_manager.forget(project["file"])
+        if project_config:
+            qgs_dom_manager.forget(project_config.filename)
+            for filename in get_embedded_filenames(project_config.root_group):
+                qgs_dom_manager.forget(filename)
+
+    def remove_menus(self) -> None:
+        """Remove all project menus from QGIS instance"""
         menuBar = self.iface.editMenu().parentWidget()
         for action in self.menubarActions:
             menuBar.removeAction(action)
             del action
 
-        self.menubarActions = []
-
         menuBar = self.iface.addLayerMenu()
         for action in self.layerMenubarActions:
             menuBar.removeAction(action)
             del action
 
+        self.menubarActions = []
         self.layerMenubarActions = []
+        self.hosts = []
 
-        self.task = QgsTask.fromFunction(
-            self.tr("Load projects menu configuration"),
-            self.load_all_project_config,
-            on_finished=self.project_config_loaded,
-        )
+    def load_cached_project_configs(
+        self, projects: List[Dict[str, str]]
+    ) -> List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]]:
+        """Load project menu configurations from cache, without checking if projects changed
 
-        QgsApplication.taskManager().addTask(self.task)
+        :param projects: list of dict of information about the projects
+        :type projects: List[Dict[str, str]]
+        :return: list of tuple of project dict and project menu config, None if not cached
+        :rtype: List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]]
+        """
+        cache_manager = CacheManager(self.iface)
+        result = []
+        for project in projects:
+            try:
+                project_config = cache_manager.get_project_menu_config(
+                    project, check_fingerprint=False
+                )
+            except Exception as exc:
+                self.log(f"Invalid cache for project {project['name']}: {exc}")
+                project_config = None
+            result.append((project, project_config))
+        return result
 
-    def load_all_project_config(
-        self, task: QgsTask
-    ) -> List[Tuple[Any, MenuProjectConfig]]:
-        """Load all project config in a task
+    def start_project_loads(self) -> None:
+        """Start project load tasks waiting in queue, up to the maximum number of
+        parallel loads"""
+        settings = self.plg_settings.get_plg_settings()
+        while self.load_queue and len(self.load_tasks) + len(self.canceled_loads) < max(
+            1, settings.max_parallel_loads
+        ):
+            # a project file still read by a canceled task waits for its end
+            canceled_files = set(self.canceled_loads.values())
+            index = next(
+                (
+                    index
+                    for index in self.load_queue
+                    if self.project_configs[index][0]["file"] not in canceled_files
+                ),
+                None,
+            )
+            if index is None:
+                break
+            self.load_queue.remove(index)
+            project, cached_config = self.project_configs[index]
+            task = QgsTask.fromFunction(
+                self.tr("Load project menu configuration: {}").format(project["name"]),
+                self.load_project_config,
+                project=project,
+                cached_config=cached_config,
+                on_finished=partial(
+                    self.project_config_loaded, self.load_generation, index
+                ),
+            )
+            self.load_tasks[index] = task
+            QgsApplication.taskManager().addTask(task)
+
+    def cancel_project_loads(self) -> None:
+        """Cancel running project load tasks and forget waiting ones. Running tasks
+        stop at their next check of cancelation, their results are ignored. They
+        are still counted as running until they end."""
+        self.load_queue.clear()
+        for index, task in self.load_tasks.items():
+            task.cancel()
+            self.canceled_loads[(self.load_generation, index)] = self.project_configs[
+                index
+            ][0]["file"]
+        self.load_tasks = {}
+        self.load_generation += 1
+
+    def load_project_config(
+        self,
+        task: QgsTask,
+        project: Dict[str, str],
+        cached_config: Optional[MenuProjectConfig],
+    ) -> Optional[MenuProjectConfig]:
+        """Load a project menu configuration in a task
 
         :param task: task where the function is run
         :type task: QgsTask
-        :return: list of tuple of project dict and project menu config
-        :rtype: List[Tuple[Any, MenuProjectConfig]]
+        :param project: dict of information about the project
+        :type project: Dict[str, str]
+        :param cached_config: project menu config already used for menus, None if no
+        menu is displayed for the project
+        :type cached_config: Optional[MenuProjectConfig]
+        :return: new project menu config, None if project can't be read or if
+        cached_config is still up to date
+        :rtype: Optional[MenuProjectConfig]
         """
-        result = []
-        settings = self.plg_settings.get_plg_settings()
-        nb_projects = len(settings.projects)
-        for i, project in enumerate(settings.projects):
-            task.setProgress(i * 100.0 / nb_projects)
-            cache_manager = CacheManager(self.iface)
-            # Try to get project configuration from cache
+        if task.isCanceled():
+            return None
+
+        cache_manager = CacheManager(self.iface)
+        if cached_config is None:
+            # Try to get project configuration from cache, if project did not change
             project_config = cache_manager.get_project_menu_config(project)
-            if not project_config:
-                # Create project menu configuration from QgsProject
-                project_config = get_project_menu_config(project, self.qgs_dom_manager)
-                # Save in cache
-                cache_manager.save_project_menu_config(project, project_config)
+            if project_config:
+                return project_config
+        elif cache_manager.is_project_menu_config_valid(project):
+            return None
+
+        if task.isCanceled():
+            return None
+        try:
+            # Each task uses its own manager, documents are not shared between threads
+            qgs_dom_manager = QgsDomManager(
+                layer_recipes_folder=cache_manager.get_layer_recipes_dir()
+            )
+            return self.read_project_config(
+                project, qgs_dom_manager, cache_manager, task.isCanceled
+            )
+        except Exception as exc:
+            self.log(f"Can't load project {project['name']}: {exc}")
+            return None
 
-            result.append((project, project_config))
-        return result
+    def read_project_config(
+        self,
+        project: Dict[str, str],
+        qgs_dom_manager: QgsDomManager,
+        cache_manager: CacheManager,
+        is_canceled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[MenuProjectConfig]:
+        """Read project menu configuration from project source and save it in cache
+
+        :param project: dict of information about the project
+        :type project: Dict[str, str]
+        :param qgs_dom_manager: manager used to read projects
+        :type qgs_dom_manager: QgsDomManager
+        :param cache_manager: manager used to save configuration in cache
+        :type cache_manager: CacheManager
+        :param is_canceled: function returning True if the read is canceled,
+        defaults to None
+        :type is_canceled: Optional[Callable[[], bool]], optional
+        :return: project menu config, None if project can't be read or if read was
+        canceled
+        :rtype: Optional[MenuProjectConfig]
+        """
+        settings = self.plg_settings.get_plg_settings()
+        # Fingerprint is computed before read to never miss a change
+        source_fingerprint = get_source_fingerprint(
+            project["file"], settings.cache_content_hash
+        )
+        # Create project menu configuration from QgsProject
+        project_config = get_project_menu_config(
+            project, qgs_dom_manager, is_canceled=is_canceled
+        )
+        if not project_config:
+            return None
+        # Save in cache
+        fingerprint = get_project_fingerprint(
+            source_fingerprint,
+            get_embedded_filenames(project_config.root_group),
+            settings.cache_content_hash,
+        )
+        cache_manager.save_project_menu_config(project, project_config, fingerprint)
+        return project_config
 
     def project_config_loaded(
-        self, exception: Any, project_configs: List[Tuple[Any, MenuProjectConfig]]
+        self,
+        generation: int,
+        index: int,
+        exception: Any,
+        project_config: Optional[MenuProjectConfig] = None,
     ) -> None:
-        """Add menu after project configuration load
+        """Update menus after a project configuration load
 
+        :param generation: menus update generation when the load was started
+        :type generation: int
+        :param index: index of loaded project
+        :type index: int
         :param exception: possible exception raised during load
         :type exception: Any
-        :param project_configs: list of tuple of project dict and project menu config
-        :type project_configs: List[Tuple[Any, MenuProjectConfig]]
+        :param project_config: new project menu config, None if not changed
+        :type project_config: Optional[MenuProjectConfig]
         """
-        QgsApplication.setOverrideCursor(Qt.WaitCursor)
-        previous = None
-        for project, project_config in project_configs:
-            # Add to QGIS instance
-            previous = self.add_project_config(project, project_config, previous)
+        if generation != self.load_generation:
+            # load was canceled: its slot and project file are free again
+            self.canceled_loads.pop((generation, index), None)
+            self.start_project_loads()
+            return
+
+        self.load_tasks.pop(index, None)
+        self.pending_indexes.discard(index)
+        if exception:
+            self.log(f"Project menu configuration load failed: {exception}")
+
+        changed_indexes = set()
+        if project_config:
+            # project changed: documents read before are outdated
+            self.forget_project_documents(*self.project_configs[index])
+            self.project_configs[index] = (
+                self.project_configs[index][0],
+                project_config,
+            )
+            changed_indexes.add(index)
+        self.update_menus(changed_indexes)
+
+        self.start_project_loads()
 
+    def update_menus(self, changed_indexes: Set[int]) -> None:
+        """Update menus of QGIS instance from current project menu configurations.
+        Menus of changed projects are replaced, other menus are kept.
+
+        :param changed_indexes: indexes of projects with a new project menu config
+        :type changed_indexes: Set[int]
+        """
+        QgsApplication.setOverrideCursor(Qt.WaitCursor)
+        previous_hosts = {
+            (host.location, tuple(host.project_indexes)): host for host in self.hosts
+        }
+
+        hosts = self.get_menu_hosts(self.project_configs, self.pending_indexes)
+        for host in hosts:
+            previous = previous_hosts.pop(
+                (host.location, tuple(host.project_indexes)), None
+            )
+            if previous and not changed_indexes.intersection(host.project_indexes):
+                host.menu = previous.menu
+                host.action = previous.action
+                host.entries = previous.entries
+            elif previous:
+                self.remove_host_menu(previous)
+        for previous in previous_hosts.values():
+            self.remove_host_menu(previous)
+
+        # Menus are added in configured order, when all their projects are loaded
+        for i, host in enumerate(hosts):
+            if host.action or self.pending_indexes.intersection(host.project_indexes):
+                continue
+            before = next(
+                (
+                    next_host.action
+                    for next_host in hosts[i + 1 :]
+                    if next_host.action and next_host.location == host.location
+                ),
+                None,
+            )
+            self.add_host_menu(host, before)
+
+        # kept menus are moved if projects were reordered
+        for location in ("new", "layer"):
+            actions = [
+                host.action
+                for host in hosts
+                if host.action and host.location == location
+            ]
+            menu_bar = self.get_menu_bar(location)
+            added = [action for action in menu_bar.actions() if action in actions]
+            if added != actions:
+                for action in actions:
+                    menu_bar.removeAction(action)
+                    menu_bar.addAction(action)
+            self.get_menubar_actions(location)[:] = actions
+
+        self.hosts = hosts
         QgsApplication.restoreOverrideCursor()
 
-    def add_project_config(
-        self,
-        project: Dict[str, str],
-        project_config: MenuProjectConfig,
-        previous: Optional[QMenu],
-    ) -> QMenu:
-        """Add a project menu configuration to current QGIS instance
+    @staticmethod
+    def get_menu_hosts(
+        project_configs: List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]],
+        pending_indexes: Set[int],
+    ) -> List[ProjectMenuHost]:
+        """Define menus to add to QGIS instance: projects with "merge" location are added
+        to the menu of previous project
 
-        :param menu_name: Name of the menu to create
-        :type menu_name: str
-        :param project: dict of information about the project
-        :type project: Dict[str, str]
-        :param project_config: project menu configuration
-        :type project_config: MenuProjectConfig
-        :param previous: previous created menu
-        :type previous: Optional[QMenu]
-        :return: created menu
-        :rtype: QMenu
+        :param project_configs: list of tuple of project dict and project menu config
+        :type project_configs: List[Tuple[Dict[str, str], Optional[MenuProjectConfig]]]
+        :param pending_indexes: indexes of projects not loaded yet, considered as
+        available until they are loaded
+        :type pending_indexes: Set[int]
+        :return: menus to add
+        :rtype: List[ProjectMenuHost]
         """
-        project_menu = self.create_project_menu(
-            menu_name=project_config.project_name, project=project, previous=previous
-        )
-        self.add_group_childs(project_config.root_group, project_menu)
+        hosts = []
+        for index, (project, project_config) in enumerate(project_configs):
+            if not project_config and index not in pending_indexes:
+                continue
+            location = project["location"]
+            if location == "merge" and hosts:
+                hosts[-1].project_indexes.append(index)
+            else:
+                if location != "layer":
+                    location = "new"
+                hosts.append(
+                    ProjectMenuHost(location=location, project_indexes=[index])
+                )
+        return hosts
 
-        return project_menu
+    def get_menu_bar(self, location: str) -> QWidget:
+        """Get QGIS widget where project menus are added
 
-    def create_project_menu(
-        self, menu_name: str, project: Dict[str, str], previous: Optional[QMenu]
-    ) -> QMenu:
-        """Create project menu and add it to QGIS instance
+        :param location: project menu location ("new" or "layer")
+        :type location: str
+        :return: menu bar or add layer menu
+        :rtype: QWidget
+        """
+        if location == "layer":
+            return self.iface.addLayerMenu()
+        return self.iface.editMenu().parentWidget()
 
-        :param menu_name: Name of the menu to create
-        :type menu_name: str
-        :param project: dict of information about the project
-        :type project: Dict[str, str]
-        :param previous: previous created menu
-        :type previous: Optional[QMenu]
-        :return: created menu
-        :rtype: QMenu
+    def get_menubar_actions(self, location: str) -> List[QAction]:
+        """Get actions of project menus added to QGIS widget
+
+        :param location: project menu location ("new" or "layer")
+        :type location: str
+        :return: actions of project menus
+        :rtype: List[QAction]
         """
-        location = project["location"]
-        if location == "merge" and previous:
-            project_menu = previous
-            project_menu.addSeparator()
-        else:
-            if location == "layer":
-                menu_bar = self.iface.addLayerMenu()
-            if location == "new":
-                menu_bar = self.iface.editMenu().parentWidget()
-
-            project_menu = QMenu("&" + menu_name, menu_bar)
-            project_menu.setToolTipsVisible(
-                self.plg_settings.get_plg_settings().optionTooltip
+        if location == "layer":
+            return self.layerMenubarActions
+        return self.menubarActions
+
+    def add_host_menu(
+        self, host: ProjectMenuHost, before: Optional[QAction] = None
+    ) -> None:
+        """Create menu of projects and add it to QGIS instance
+
+        :param host: menu definition
+        :type host: ProjectMenuHost
+        :param before: action before which the menu is inserted, defaults to None
+        (menu added at the end)
+        :type before: Optional[QAction], optional
+        """
+        menu_bar = self.get_menu_bar(host.location)
+        first_config = self.project_configs[host.project_indexes[0]][1]
+
+        settings = self.plg_settings.get_plg_settings()
+        project_menu = QMenu("&" + first_config.project_name, menu_bar)
+        project_menu.setToolTipsVisible(settings.optionTooltip)
+        # actions of all submenus are dispatched by the project menu
+        project_menu.triggered.connect(
+            partial(self.on_menu_action_triggered, host.entries)
+        )
+        if settings.optionTooltip:
+            project_menu.hovered.connect(
+                partial(self.on_menu_action_hovered, host.entries)
             )
+
+        # only first level is added, group childs are added when shown
+        for i, index in enumerate(host.project_indexes):
+            if i:
+                project_menu.addSeparator()
+            self.add_group_childs(
+                self.project_configs[index][1].root_group, project_menu, host.entries
+            )
+
+        if before:
+            project_action = menu_bar.insertMenu(before, project_menu)
+        else:
             project_action = menu_bar.addMenu(project_menu)
+        self.get_menubar_actions(host.location).append(project_action)
+
+        host.menu = project_menu
+        host.action = project_action
+
+    def remove_host_menu(self, host: ProjectMenuHost) -> None:
+        """Remove menu of projects from QGIS instance
+
+        :param host: menu definition
+        :type host: ProjectMenuHost
+        """
+        if not host.action:
+            return
+        self.get_menu_bar(host.location).removeAction(host.action)
+        self.get_menubar_actions(host.location).remove(host.action)
+        host.menu.deleteLater()
+        host.menu = None
+        host.action = None
+        host.entries = []
+
+    def on_menu_action_triggered(
+        self, entries: List[Tuple[Any, QMenu]], action: QAction
+    ) -> None:
+        """Load layers of a triggered action of a project menu
+
+        :param entries: entries of project menu actions
+        :type entries: List[Tuple[Any, QMenu]]
+        :param action: triggered action, with its entry key as data
+        :type action: QAction
+        """
+        key = action.data()
+        if not isinstance(key, int) or not 0 <= key < len(entries):
+            return
+        item, menu = entries[key]
+        if isinstance(item, MenuLayerConfig):
+            self.layer_loader.loadLayer(
+                item.filename,
+                item.filename,
+                item.layer_id,
+                menu,
+                item.visible,
+                item.expanded,
+            )
+        else:
+            self.layer_loader.loadLayers(item, menu)
 
-            if location == "layer":
-                self.layerMenubarActions.append(project_action)
-            if location == "new":
-                self.menubarActions.append(project_action)
-        return project_menu
+    def on_menu_action_hovered(
+        self, entries: List[Tuple[Any, QMenu]], action: QAction
+    ) -> None:
+        """Set tooltip of a hovered layer action of a project menu
 
-    def add_group_childs(self, group: MenuGroupConfig, grp_menu: QMenu) -> bool:
+        :param entries: entries of project menu actions
+        :type entries: List[Tuple[Any, QMenu]]
+        :param action: hovered action, with its entry key as data
+        :type action: QAction
+        """
+        key = action.data()
+        if not isinstance(key, int) or not 0 <= key < len(entries):
+            return
+        item, _ = entries[key]
+        if isinstance(item, MenuLayerConfig):
+            self.set_layer_tooltip(action, item)
+
+    def add_group_childs(
+        self,
+        group: MenuGroupConfig,
+        grp_menu: QMenu,
+        entries: List[Tuple[Any, QMenu]],
+    ) -> bool:
         """Add all childs of a group config
 
-        :param uri: initial uri of project (can be from local file / http / postgres)
-        :type uri: str
         :param group: group menu configuration
         :type group: MenuGroupConfig
         :param grp_menu: menu for group
         :type grp_menu: QMenu
+        :param entries: entries of project menu actions
+        :type entries: List[Tuple[Any, QMenu]]
         :return: True if a layer was inserted, False otherwise
         :rtype: bool
         """
         layer_inserted = False
         for child in group.childs:
             if isinstance(child, MenuGroupConfig):
-                self.add_group(child, grp_menu)
+                self.add_group(child, grp_menu, entries)
             elif isinstance(child, MenuLayerConfig):
                 layer_inserted = True
-                self.add_layer(child, grp_menu)
+                self.add_layer(child, grp_menu, entries)
         return layer_inserted
 
-    def add_group(self, group: MenuGroupConfig, menu: QMenu) -> None:
+    def add_group(
+        self,
+        group: MenuGroupConfig,
+        menu: QMenu,
+        entries: List[Tuple[Any, QMenu]],
+    ) -> None:
         """Add group menu configuration to a menu
 
-        :param uri: initial uri of project (can be from local file / http / postgres)
-        :type uri: str
         :param group: group menu configuration
         :type group: MenuGroupConfig
         :param menu: input menu
         :type menu: QMenu
+        :param entries: entries of project menu actions
+        :type entries: List[Tuple[Any, QMenu]]
         """
 
         name = group.name
@@ -335,83 +849,117 @@ class MenuFromProject:
             menu.addSeparator()
         # "-*" => insert a title
         elif name.startswith("-"):
-            action = QAction(name[1:], self.iface.mainWindow())
+            action = menu.addAction(name[1:])
             font = QFont()
             font.setBold(True)
             action.setFont(font)
-            menu.addAction(action)
         # regular group
         else:
             grp_menu = menu.addMenu("&" + name)
             grp_menu.setToolTipsVisible(settings.optionTooltip)
+            # childs are added when the menu is shown for the first time
+            grp_menu.aboutToShow.connect(
+                partial(self.populate_group_menu, group, grp_menu, entries)
+            )
 
-            layer_inserted = self.add_group_childs(group=group, grp_menu=grp_menu)
-
-            if layer_inserted and settings.optionLoadAll:
-                action = QAction(self.tr("Load all"), self.iface.mainWindow())
-                font = QFont()
-                font.setBold(True)
-                action.setFont(font)
-                grp_menu.addAction(action)
-                action.triggered.connect(
-                    lambda checked, f=None, w=None, m=grp_menu: LayerLoad().loadLayer(
-                        None, f, w, m
-                    )
-                )
+    def populate_group_menu(
+        self,
+        group: MenuGroupConfig,
+        grp_menu: QMenu,
+        entries: List[Tuple[Any, QMenu]],
+    ) -> None:
+        """Add childs of a group menu configuration to a group menu, if not already done
+
+        :param group: group menu configuration
+        :type group: MenuGroupConfig
+        :param grp_menu: menu for group
+        :type grp_menu: QMenu
+        :param entries: entries of project menu actions
+        :type entries: List[Tuple[Any, QMenu]]
+        """
+        if not grp_menu.isEmpty():
+            return
+
+        layer_inserted = self.add_group_childs(
+            group=group, grp_menu=grp_menu, entries=entries
+        )
+
+        if layer_inserted and self.plg_settings.get_plg_settings().optionLoadAll:
+            action = grp_menu.addAction(self.tr("Load all"))
+            font = QFont()
+            font.setBold(True)
+            action.setFont(font)
+            layers = [
+                child for child in group.childs if isinstance(child, MenuLayerConfig)
+            ]
+            action.setData(len(entries))
+            entries.append((layers, grp_menu))
 
-    def add_layer(self, layer: MenuLayerConfig, menu: QMenu) -> None:
-        """Add layer menu configuration to a menu
+    def add_layer(
+        self,
+        layer: MenuLayerConfig,
+        menu: QMenu,
+        entries: List[Tuple[Any, QMenu]],
+    ) -> None:
+        """Add layer menu configuration to a menu. The action is triggered through
+        the project menu dispatcher, with its entry key as data.
 
-        :param uri: initial uri of project (can be from local file / http / postgres)
-        :type uri: str
         :param layer: layer menu configuration
         :type layer: MenuLayerConfig
         :param menu: input menu
         :type menu: QMenu
+        :param entries: entries of project menu actions
+        :type entries: List[Tuple[Any, QMenu]]
         """
-        settings = self.plg_settings.get_plg_settings()
-        action = QAction(layer.name, self.iface.mainWindow())
-
         # add menu item
-        action.triggered.connect(
-            lambda checked, uri=layer.filename, f=layer.filename, lid=layer.layer_id, m=menu, v=layer.visible, x=layer.expanded: LayerLoad().loadLayer(
-                uri, f, lid, m, v, x
-            )
-        )
-        action.setIcon(
-            icon_per_layer_type(layer.is_spatial, layer.layer_type, layer.geometry_type)
+        action = menu.addAction(
+            icon_per_layer_type(
+                layer.is_spatial, layer.layer_type, layer.geometry_type
+            ),
+            layer.name,
         )
-        if settings.optionTooltip:
-            if settings.optionSourceMD == SOURCE_MD_OGC:
-                abstract = layer.abstract or layer.metadata_abstract
-                title = layer.title or layer.metadata_title
-            else:
-                abstract = layer.metadata_abstract or layer.abstract
-                title = layer.metadata_title or layer.title
-
-            abstract = ""
-            title = ""
-            for oSource in settings.optionSourceMD:
-                if oSource == SOURCE_MD_OGC:
-                    abstract = layer.metadata_abstract if abstract == "" else abstract
-                    title = title or layer.metadata_title
+        action.setData(len(entries))
+        entries.append((layer, menu))
 
-                if oSource == SOURCE_MD_LAYER:
-                    abstract = layer.abstract if abstract == "" else abstract
-                    title = title or layer.title
+    def set_layer_tooltip(self, action: QAction, layer: MenuLayerConfig) -> None:
+        """Set tooltip of a layer action from layer metadata, read from cache if they
+        are not loaded yet. Called when the layer is hovered.
 
-                if oSource == SOURCE_MD_NOTE:
-                    abstract = layer.layer_notes if abstract == "" else abstract
+        :param action: layer action
+        :type action: QAction
+        :param layer: layer menu configuration
+        :type layer: MenuLayerConfig
+        """
+        if layer.metadata_key is not None:
+            set_layer_metadata(
+                layer,
+                CacheManager(self.iface).get_layer_metadata(
+                    layer.metadata_key, layer.filename, layer.layer_id
+                ),
+            )
 
-            if (abstract != "") and (title == ""):
-                action.setToolTip("<p>{}</p>".format(abstract))
+        settings = self.plg_settings.get_plg_settings()
+        abstract = ""
+        title = ""
+        for oSource in settings.optionSourceMD:
+            if oSource == SOURCE_MD_OGC:
+                abstract = layer.metadata_abstract if abstract == "" else abstract
+                title = title or layer.metadata_title
+
+            if oSource == SOURCE_MD_LAYER:
+                abstract = layer.abstract if abstract == "" else abstract
+                title = title or layer.title
+
+            if oSource == SOURCE_MD_NOTE:
+                abstract = layer.layer_notes if abstract == "" else abstract
+
+        if (abstract != "") and (title == ""):
+            action.setToolTip("<p>{}</p>".format(abstract))
+        else:
+            if abstract != "" or title != "":
+                action.setToolTip("<b>{}</b><br/>{}".format(title, abstract))
             else:
-                if abstract != "" or title != "":
-                    action.setToolTip("<b>{}</b><br/>{}".format(title, abstract))
-                else:
-                    action.setToolTip("")
-
-        menu.addAction(action)
+                action.setToolTip("")
 
     def initGui(self):
         settings = self.plg_settings.get_plg_settings()
@@ -446,18 +994,9 @@ class MenuFromProject:
         self.iface.initializationCompleted.connect(self.on_initializationCompleted)
 
     def unload(self):
-        menuBar = self.iface.editMenu().parentWidget()
-        for action in self.menubarActions:
-            menuBar.removeAction(action)
-            del action
-
-        menuBar = self.iface.addLayerMenu()
-        for action in self.layerMenubarActions:
-            menuBar.removeAction(action)
-            del action
-
-        self.menubarActions = []
-        self.layerMenubarActions = []
+        self.menus_update_timer.stop()
+        self.cancel_project_loads()
+        self.remove_menus()
 
         settings = self.plg_settings.get_plg_settings()
         if settings.is_setup_visible:
@@ -480,12 +1019,5 @@ class MenuFromProject:
         del dlg
 
         if result != 0:
-            # clear web projects cache
-            try:
-                read_from_http.cache_clear()
-                read_from_file.cache_clear()
-            except Exception:
-                pass
-
-            # build menus
-            self.initMenus()
+            # update menus of changed projects
+            self.request_menus_update()
@@ -6,7 +6,7 @@
 
 # standard
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 # PyQGIS
 from qgis.core import QgsSettings
@@ -46,11 +46,41 @@ class PlgSettingsStructure:
 
     # Internal option
     is_setup_visible: bool = True
+    cache_content_hash: bool = False
+    cache_background_refresh: bool = True
+    max_parallel_loads: int = 4
+    document_cache_size: int = 256
 
 
 class PlgOptionsManager:
+    # settings read from QgsSettings, kept until settings are saved
+    _plg_settings: Optional[PlgSettingsStructure] = None
+
+    @classmethod
+    def get_plg_settings(cls) -> PlgSettingsStructure:
+        """Return plugin settings. \
+        Useful to get user preferences across plugin logic.
+
+        Settings are read once and kept in memory until they are saved with
+        save_from_object or invalidated. The returned object is shared: use a copy to
+        modify it.
+
+        :return: plugin settings
+        :rtype: PlgSettingsStructure
+        """
+        plg_settings = cls._plg_settings
+        if plg_settings is None:
+            plg_settings = cls.read_plg_settings()
+            cls._plg_settings = plg_settings
+        return plg_settings
+
+    @classmethod
+    def invalidate_plg_settings(cls) -> None:
+        """Forget settings kept in memory: settings are read again on next use."""
+        cls._plg_settings = None
+
     @staticmethod
-    def get_plg_settings() -> PlgSettingsStructure:
+    def read_plg_settings() -> PlgSettingsStructure:
         """Load and return plugin settings as a dictionary. \
         Useful to get user preferences across plugin logic.
 
@@ -71,6 +101,26 @@ class PlgOptionsManager:
             "menu_from_project/is_setup_visible", True, bool
         )
 
+        # Compare content hash of local projects to check cache validity.
+        options.cache_content_hash = s.value(
+            "menu_from_project/cache_content_hash", False, bool
+        )
+
+        # Show cached menus at startup and check projects in background.
+        options.cache_background_refresh = s.value(
+            "menu_from_project/cache_background_refresh", True, bool
+        )
+
+        # Number of projects loaded at the same time.
+        options.max_parallel_loads = s.value(
+            "menu_from_project/max_parallel_loads", 4, int
+        )
+
+        # Memory budget of project documents kept to load layers, in MB.
+        options.document_cache_size = s.value(
+            "menu_from_project/document_cache_size", 256, int
+        )
+
         try:
             s.beginGroup("menu_from_project")
             try:
@@ -185,3 +235,5 @@ class PlgOptionsManager:
                 s.endArray()
         finally:
             s.endGroup()
+
+        cls.invalidate_plg_settings()
@@ -6,6 +6,7 @@
 
 # Standard library
 import logging
+from copy import deepcopy
 from functools import partial
 
 # PyQGIS
@@ -338,7 +339,8 @@ class MenuConfDialog(QDialog, FORM_CLASS):
                     pass
 
     def onAccepted(self):
-        settings = self.plg_settings.get_plg_settings()
+        # copy of shared settings, which must not be modified before save
+        settings = deepcopy(self.plg_settings.get_plg_settings())
         settings.projects = []
         # self.log("count : {}".format(self.tableWidget.rowCount()))
         for row in range(self.tableWidget.rowCount()):
@@ -0,0 +1,158 @@
+"""
+    Memory used by project menu configurations of a large catalog.
+
+    Compares the current configuration classes with a copy of the previous
+    dataclasses (with __dict__ and a filename string per layer).
+
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        python -m tests.dev.bench_project_config_memory
+        python -m tests.dev.bench_project_config_memory --layers 50000
+"""
+
+# standard library
+import argparse
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, List
+
+# project
+from menu_from_project.datamodel.project_config import (
+    MenuGroupConfig,
+    MenuLayerConfig,
+    MenuProjectConfig,
+)
+from menu_from_project.logic.config_codec import (
+    decode_project_config,
+    encode_project_config,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+@dataclass
+class LegacyMenuLayerConfig:
+    name: str
+    layer_id: str
+    filename: str
+    visible: bool
+    expanded: bool
+    embedded: str
+    is_spatial: bool
+    layer_type: Any
+    metadata_abstract: str
+    metadata_title: str
+    layer_notes: str
+    abstract: str
+    title: str
+    geometry_type: Any = None
+
+
+@dataclass
+class LegacyMenuGroupConfig:
+    name: str
+    filename: str
+    childs: List[Any]
+    embedded: bool
+
+
+# ############################################################################
+# ########## Functions #############
+# ################################
+
+
+def build_catalog(
+    layer_class, group_class, layers: int, intern: bool, layers_per_group: int = 50
+) -> Any:
+    """Build a catalog of groups of layers, with strings built for each layer as
+    when they are read from a project. Filenames are interned as in project_read
+    if intern is True."""
+    groups = []
+    for g in range(0, layers, layers_per_group):
+        childs = []
+        for i in range(g, min(g + layers_per_group, layers)):
+            filename = "".join(["/mnt/share/catalog/", "catalog.qgz"])
+            childs.append(
+                layer_class(
+                    name=f"Layer {i}",
+                    layer_id=f"L{i:032d}",
+                    filename=sys.intern(filename) if intern else filename,
+                    visible=True,
+                    expanded=False,
+                    embedded=False,
+                    is_spatial=True,
+                    layer_type=None,
+                    metadata_abstract="".join(["Abstract of layer ", str(i % 10)]),
+                    metadata_title=f"Layer {i}",
+                    layer_notes="",
+                    abstract="".join(["Abstract of layer ", str(i % 10)]),
+                    title=f"Layer {i}",
+                    geometry_type=None,
+                )
+            )
+        groups.append(
+            group_class(
+                name=f"Group {g}",
+                filename="/mnt/share/catalog/catalog.qgz",
+                embedded=False,
+                childs=childs,
+            )
+        )
+    return group_class(name="", filename="", embedded=False, childs=groups)
+
+
+def measure(build) -> int:
+    """Return memory allocated by a build function and still used by its result"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--layers", type=int, default=10000)
+    args = parser.parse_args()
+
+    legacy = measure(
+        lambda: build_catalog(
+            LegacyMenuLayerConfig, LegacyMenuGroupConfig, args.layers, intern=False
+        )
+    )
+    current = measure(
+        lambda: build_catalog(
+            MenuLayerConfig, MenuGroupConfig, args.layers, intern=True
+        )
+    )
+    encoded = encode_project_config(
+        MenuProjectConfig(
+            project_name="catalog",
+            filename="/mnt/share/catalog/catalog.qgz",
+            uri="/mnt/share/catalog/catalog.qgz",
+            root_group=build_catalog(
+                MenuLayerConfig, MenuGroupConfig, args.layers, intern=True
+            ),
+        )
+    )
+    from_cache = measure(lambda: decode_project_config(encoded, metadata_key="catalog"))
+
+    print(f"{args.layers} layers")
+    print(f"previous dataclasses: {legacy / 1024 / 1024:8.2f} MB")
+    print(f"slotted classes:      {current / 1024 / 1024:8.2f} MB")
+    print(
+        f"read from cache:      {from_cache / 1024 / 1024:8.2f} MB (without metadata)"
+    )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    main()
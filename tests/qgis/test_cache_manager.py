@@ -0,0 +1,269 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.qgis.test_cache_manager
+        # for specific test
+        python -m unittest tests.qgis.test_cache_manager.TestCacheManager.test_single_index_file
+"""
+
+# standard library
+import shutil
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+# PyQGIS
+from qgis.core import QgsMapLayerType, QgsWkbTypes
+from qgis.testing import unittest
+
+from menu_from_project.datamodel.project_config import (
+    MenuGroupConfig,
+    MenuLayerConfig,
+    MenuProjectConfig,
+)
+from menu_from_project.logic.cache_manager import CACHE_INDEX_FILENAME, CacheManager
+from menu_from_project.logic.config_codec import (
+    CACHE_SCHEMA_VERSION,
+    decode_project_config,
+    encode_project_config,
+    set_layer_metadata,
+)
+from menu_from_project.logic.layer_recipe import LayerRecipeStore
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class Profile:
+    def __init__(self, folder: str):
+        self._folder = folder
+
+    def folder(self) -> str:
+        return self._folder
+
+    def userProfile(self):
+        return self
+
+    def userProfileManager(self):
+        return self
+
+
+def create_project_config(filename: str) -> MenuProjectConfig:
+    layer = MenuLayerConfig(
+        name="Cours d'eau",
+        layer_id="L35ecffe715c74f15bec52340aa3c9e3f",
+        filename=filename,
+        visible=True,
+        expanded=False,
+        embedded=False,
+        is_spatial=True,
+        layer_type=QgsMapLayerType.VectorLayer,
+        metadata_abstract="",
+        metadata_title="",
+        layer_notes="",
+        abstract="",
+        title="",
+        geometry_type=QgsWkbTypes.GeometryType.LineGeometry,
+    )
+    return MenuProjectConfig(
+        project_name="test",
+        filename=filename,
+        uri=filename,
+        root_group=MenuGroupConfig(
+            name="", filename=filename, embedded=False, childs=[layer]
+        ),
+    )
+
+
+class TestCacheManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        CacheManager._index = None
+        CacheManager._metadata = {}
+        self.cache_manager = CacheManager(Profile(self.tmp_dir))
+
+    def tearDown(self):
+        CacheManager._index = None
+        CacheManager._metadata = {}
+        shutil.rmtree(self.tmp_dir)
+
+    def test_single_index_file(self):
+        """Configurations of all projects are saved in a single file, with a
+        metadata store per project"""
+        projects = [
+            {"name": "first", "file": "/data/first.qgs"},
+            {"name": "second", "file": "/data/second.qgs"},
+        ]
+        for project in projects:
+            self.cache_manager.save_project_menu_config(
+                project, create_project_config(project["file"])
+            )
+
+        self.assertEqual(
+            sorted(path.name for path in self.cache_manager.get_cache_dir().iterdir()),
+            ["index.bin", "metadata"],
+        )
+
+        # index is read again from file
+        CacheManager._index = None
+        for project in projects:
+            self.assertEqual(
+                self.cache_manager.get_project_menu_config(
+                    project, check_fingerprint=False
+                ),
+                create_project_config(project["file"]),
+            )
+
+    def test_encoded_config(self):
+        """Decoded configuration is equal to encoded one, with enum values"""
+        project_config = create_project_config("/data/first.qgs")
+        decoded = decode_project_config(
+            encode_project_config(project_config), metadata_key="first"
+        )
+        self.assertEqual(decoded, project_config)
+
+        layer = decoded.root_group.childs[0]
+        self.assertEqual(layer.layer_type, QgsMapLayerType.VectorLayer)
+        self.assertEqual(layer.geometry_type, QgsWkbTypes.GeometryType.LineGeometry)
+
+    def test_metadata_store(self):
+        """Layer metadata are read from metadata store when needed"""
+        project = {"name": "first", "file": "/data/first.qgs"}
+        project_config = create_project_config(project["file"])
+        layer = project_config.root_group.childs[0]
+        layer.abstract = "Cours d'eau de la BD Carthage"
+        self.cache_manager.save_project_menu_config(project, project_config)
+
+        CacheManager._index = None
+        CacheManager._metadata = {}
+        cached_config = self.cache_manager.get_project_menu_config(
+            project, check_fingerprint=False
+        )
+        cached_layer = cached_config.root_group.childs[0]
+        self.assertEqual(cached_layer.abstract, "")
+        self.assertIsNotNone(cached_layer.metadata_key)
+
+        set_layer_metadata(
+            cached_layer,
+            self.cache_manager.get_layer_metadata(
+                cached_layer.metadata_key, cached_layer.filename, cached_layer.layer_id
+            ),
+        )
+        self.assertEqual(cached_layer, layer)
+        self.assertIsNone(cached_layer.metadata_key)
+
+    def test_other_schema_version(self):
+        """Index written with another schema version is rebuilt"""
+        project = {"name": "first", "file": "/data/first.qgs"}
+        self.cache_manager.save_project_menu_config(
+            project, create_project_config(project["file"])
+        )
+
+        index_path = self.cache_manager.get_cache_dir() / CACHE_INDEX_FILENAME
+        content = bytearray(index_path.read_bytes())
+        content[4:6] = (CACHE_SCHEMA_VERSION + 1).to_bytes(2, "little")
+        index_path.write_bytes(bytes(content))
+
+        CacheManager._index = None
+        self.assertIsNone(
+            self.cache_manager.get_project_menu_config(project, check_fingerprint=False)
+        )
+
+    def test_prune_projects(self):
+        """Cached data of projects not configured anymore are removed"""
+        projects = [
+            {"name": "first", "file": "/data/first.qgs"},
+            {"name": "second", "file": "/data/second.qgs"},
+        ]
+        for project in projects:
+            self.cache_manager.save_project_menu_config(
+                project, create_project_config(project["file"])
+            )
+        recipe_store = LayerRecipeStore(self.cache_manager.get_layer_recipes_dir())
+        recipe_store.folder.mkdir(parents=True)
+        for filename in ("/data/first.qgs", "/data/second.qgs", "/data/removed.qgs"):
+            recipe_store.get_recipes_path(filename).write_bytes(b"")
+
+        renamed = {"name": "renamed", "file": "/data/second.qgs"}
+        self.cache_manager.prune_projects([projects[0], renamed])
+
+        CacheManager._index = None
+        self.assertIsNotNone(
+            self.cache_manager.get_project_menu_config(
+                projects[0], check_fingerprint=False
+            )
+        )
+        self.assertIsNone(
+            self.cache_manager.get_project_menu_config(
+                projects[1], check_fingerprint=False
+            )
+        )
+        metadata_folder = self.cache_manager.get_metadata_path("first").parent
+        self.assertEqual(
+            [path.name for path in metadata_folder.iterdir()],
+            [self.cache_manager.get_metadata_path("first|/data/first.qgs").name],
+        )
+        # recipes of files not used by configured projects are removed
+        self.assertEqual(
+            sorted(path.name for path in recipe_store.folder.iterdir()),
+            sorted(
+                recipe_store.get_recipes_path(filename).name
+                for filename in ("/data/first.qgs", "/data/second.qgs")
+            ),
+        )
+
+    def test_rename_project(self):
+        """Cached data of a renamed project are moved, its metadata store is kept"""
+        project = {"name": "first", "file": "/data/first.qgs"}
+        project_config = create_project_config(project["file"])
+        layer = project_config.root_group.childs[0]
+        layer.abstract = "Cours d'eau de la BD Carthage"
+        self.cache_manager.save_project_menu_config(project, project_config)
+        cached_layer = self.cache_manager.get_project_menu_config(
+            project, check_fingerprint=False
+        ).root_group.childs[0]
+
+        renamed = {"name": "renamed", "file": "/data/first.qgs"}
+        self.cache_manager.rename_project(
+            project, renamed, replace(project_config, project_name="renamed")
+        )
+        self.cache_manager.prune_projects([renamed])
+
+        CacheManager._index = None
+        CacheManager._metadata = {}
+        self.assertIsNone(
+            self.cache_manager.get_project_menu_config(project, check_fingerprint=False)
+        )
+        renamed_config = self.cache_manager.get_project_menu_config(
+            renamed, check_fingerprint=False
+        )
+        self.assertEqual(renamed_config.project_name, "renamed")
+        # layers decoded before and after the rename read the same metadata store
+        for menu_layer in (cached_layer, renamed_config.root_group.childs[0]):
+            set_layer_metadata(
+                menu_layer,
+                self.cache_manager.get_layer_metadata(
+                    menu_layer.metadata_key, menu_layer.filename, menu_layer.layer_id
+                ),
+            )
+            self.assertEqual(menu_layer, layer)
+
+    def test_missing_project(self):
+        """Project not saved has no cached configuration"""
+        self.assertIsNone(
+            self.cache_manager.get_project_menu_config(
+                {"name": "missing", "file": "/data/missing.qgs"},
+                check_fingerprint=False,
+            )
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
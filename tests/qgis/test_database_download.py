@@ -0,0 +1,141 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.qgis.test_database_download
+        # for specific test
+        python -m unittest tests.qgis.test_database_download.TestDatabaseDownload.test_export_skipped_if_not_modified
+"""
+
+# standard library
+import shutil
+import tempfile
+from pathlib import Path
+
+# PyQGIS
+from qgis.core import QgsProjectStorage
+from qgis.PyQt.QtCore import QDateTime
+from qgis.testing import unittest
+
+from menu_from_project.logic.qgs_manager import download_from_database
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+PROJECT_URI = "postgresql:?service=test&schema=public&project=aeag-tiny"
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class RecordingProjectStorage:
+    """Project storage serving a local project file and counting project exports"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.last_modified = QDateTime.currentDateTimeUtc()
+        self.read_count = 0
+        self.metadata_ok = True
+        # exports fail after writing part of the project
+        self.export_ok = True
+
+    def readProjectStorageMetadata(self, uri):
+        metadata = QgsProjectStorage.Metadata()
+        metadata.name = "aeag-tiny"
+        metadata.lastModified = self.last_modified
+        return self.metadata_ok, metadata
+
+    def readProject(self, uri, device, context):
+        self.read_count += 1
+        content = Path(self.filename).read_bytes()
+        if not self.export_ok:
+            device.write(content[: len(content) // 2])
+            return False
+        device.write(content)
+        return True
+
+
+class RecordingProjectStorageRegistry:
+    def __init__(self, project_storage: RecordingProjectStorage):
+        self.project_storage = project_storage
+
+    def projectStorageFromUri(self, uri):
+        return self.project_storage
+
+
+class TestDatabaseDownload(unittest.TestCase):
+    def setUp(self):
+        self.download_folder = Path(tempfile.mkdtemp())
+        self.project_storage = RecordingProjectStorage(
+            str(Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz")
+        )
+        self.registry = RecordingProjectStorageRegistry(self.project_storage)
+
+    def tearDown(self):
+        shutil.rmtree(self.download_folder)
+
+    def download(self) -> str:
+        return download_from_database(PROJECT_URI, self.registry, self.download_folder)
+
+    def test_export_skipped_if_not_modified(self):
+        """Project is exported again only if last modification date changed"""
+        filename = self.download()
+        self.assertEqual(self.project_storage.read_count, 1)
+        self.assertTrue(Path(filename).exists())
+
+        self.assertEqual(self.download(), filename)
+        self.assertEqual(self.project_storage.read_count, 1)
+
+        self.project_storage.last_modified = self.project_storage.last_modified.addSecs(
+            60
+        )
+        self.assertEqual(self.download(), filename)
+        self.assertEqual(self.project_storage.read_count, 2)
+
+    def test_export_if_file_removed(self):
+        """Project is exported again if downloaded file was removed"""
+        Path(self.download()).unlink()
+        self.download()
+        self.assertEqual(self.project_storage.read_count, 2)
+
+    def test_metadata_not_read(self):
+        """Project is not exported if its storage metadata can't be read"""
+        self.project_storage.metadata_ok = False
+        with self.assertRaises(OSError):
+            self.download()
+        self.assertEqual(self.project_storage.read_count, 0)
+        self.assertEqual(list(self.download_folder.iterdir()), [])
+
+    def test_failed_export(self):
+        """A failed export leaves the previous export unchanged, and is tried again"""
+        self.project_storage.export_ok = False
+        with self.assertRaises(OSError):
+            self.download()
+        self.assertEqual(list(self.download_folder.iterdir()), [])
+
+        self.project_storage.export_ok = True
+        filename = self.download()
+        content = Path(filename).read_bytes()
+
+        self.project_storage.export_ok = False
+        self.project_storage.last_modified = self.project_storage.last_modified.addSecs(
+            60
+        )
+        self.assertEqual(self.download(), filename)
+        self.assertEqual(Path(filename).read_bytes(), content)
+        self.assertEqual(list(self.download_folder.iterdir()), [Path(filename)])
+
+        self.project_storage.export_ok = True
+        self.download()
+        self.assertEqual(self.project_storage.read_count, 4)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
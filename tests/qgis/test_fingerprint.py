@@ -0,0 +1,76 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.qgis.test_fingerprint
+        # for specific test
+        python -m unittest tests.qgis.test_fingerprint.TestFingerprint.test_project_fingerprint_valid
+"""
+
+# standard library
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# PyQGIS
+from qgis.testing import unittest
+
+from menu_from_project.logic.fingerprint import (
+    get_file_fingerprint,
+    get_project_fingerprint,
+    get_source_fingerprint,
+    is_file_fingerprint_valid,
+    is_project_fingerprint_valid,
+)
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = str(Path(self.tmp_dir) / "aeag-tiny.qgz")
+        shutil.copy(
+            Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz", self.filename
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_project_fingerprint_valid(self):
+        """Fingerprint is valid until the project file changes"""
+        fingerprint = get_project_fingerprint(
+            get_source_fingerprint(self.filename), embedded_filenames=[]
+        )
+        self.assertTrue(is_project_fingerprint_valid(self.filename, fingerprint))
+
+        with open(self.filename, "ab") as f:
+            f.write(b"\0")
+        self.assertFalse(is_project_fingerprint_valid(self.filename, fingerprint))
+
+    def test_missing_fingerprint(self):
+        """Cache without fingerprint must be rebuilt"""
+        self.assertFalse(is_project_fingerprint_valid(self.filename, None))
+
+    def test_content_hash(self):
+        """Touched file with same content is valid only if content hash is stored"""
+        fingerprint = get_file_fingerprint(self.filename)
+        fingerprint_with_hash = get_file_fingerprint(self.filename, with_hash=True)
+
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertFalse(is_file_fingerprint_valid(self.filename, fingerprint))
+        self.assertTrue(is_file_fingerprint_valid(self.filename, fingerprint_with_hash))
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
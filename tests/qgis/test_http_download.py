@@ -0,0 +1,116 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.qgis.test_http_download
+        # for specific test
+        python -m unittest tests.qgis.test_http_download.TestHttpDownload.test_conditional_download
+"""
+
+# standard library
+import os
+import shutil
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# PyQGIS
+from qgis.testing import start_app, unittest
+
+from menu_from_project.logic.qgs_manager import download_from_http
+
+start_app()
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    """Static file handler recording the status code of each response"""
+
+    status_codes = []
+
+    def send_response(self, code, message=None):
+        self.status_codes.append(code)
+        super().send_response(code, message)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpDownload(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.served_dir = tempfile.mkdtemp()
+        shutil.copy(
+            Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz", cls.served_dir
+        )
+        cls.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            partial(RecordingHandler, directory=cls.served_dir),
+        )
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever)
+        cls.server_thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/aeag-tiny.qgz"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server_thread.join()
+        cls.server.server_close()
+        shutil.rmtree(cls.served_dir)
+
+    def setUp(self):
+        self.download_folder = Path(tempfile.mkdtemp())
+        RecordingHandler.status_codes.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.download_folder)
+
+    def test_conditional_download(self):
+        """Project is downloaded again only if it changed on server"""
+        filename = download_from_http(self.url, self.download_folder)
+        self.assertTrue(Path(filename).exists())
+        self.assertEqual(RecordingHandler.status_codes, [200])
+
+        # Not modified: local copy is reused
+        self.assertEqual(download_from_http(self.url, self.download_folder), filename)
+        self.assertEqual(RecordingHandler.status_codes, [200, 304])
+
+        # Modified on server
+        served_file = Path(self.served_dir) / "aeag-tiny.qgz"
+        stat = os.stat(served_file)
+        os.utime(served_file, (stat.st_atime, stat.st_mtime + 10))
+        download_from_http(self.url, self.download_folder)
+        self.assertEqual(RecordingHandler.status_codes, [200, 304, 200])
+
+    def test_failed_download(self):
+        """Failed download raises an error without previous copy, else reuses it"""
+        missing_url = self.url.replace("aeag-tiny.qgz", "missing.qgz")
+        with self.assertRaises(OSError):
+            download_from_http(missing_url, self.download_folder)
+        self.assertEqual(list(self.download_folder.iterdir()), [])
+
+        filename = download_from_http(self.url, self.download_folder)
+        served_file = Path(self.served_dir) / "aeag-tiny.qgz"
+        hidden_file = served_file.with_suffix(".bak")
+        served_file.rename(hidden_file)
+        try:
+            self.assertEqual(
+                download_from_http(self.url, self.download_folder), filename
+            )
+        finally:
+            hidden_file.rename(served_file)
+        self.assertTrue(Path(filename).exists())
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
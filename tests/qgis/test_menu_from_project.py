@@ -0,0 +1,482 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.qgis.test_menu_from_project
+        # for specific test
+        python -m unittest tests.qgis.test_menu_from_project.TestMenuFromProject.test_layer_metadata_read_on_hover
+"""
+
+# standard library
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from unittest.mock import patch
+
+# PyQGIS
+from qgis.core import QgsProject, QgsSettings
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.gui import QgsMapCanvas
+from qgis.PyQt.QtWidgets import QMainWindow, QMenu
+from qgis.testing import start_app, unittest
+
+from menu_from_project.logic.cache_manager import CacheManager
+from menu_from_project.logic.project_read import get_project_menu_config
+from menu_from_project.logic.qgs_manager import QgsDomManager
+from menu_from_project.menu_from_project import MENUS_UPDATE_DELAY, MenuFromProject
+from menu_from_project.toolbelt.preferences import (
+    PlgOptionsManager,
+    PlgSettingsStructure,
+)
+
+start_app()
+
+# ############################################################################
+# ########## Functions #############
+# ################################
+
+
+def write_memory_project(path: Path) -> None:
+    """Write a project with a group of memory layers (m1, m2, m3) followed by a
+    memory layer (m0)"""
+    layers = "".join(
+        f'<layer-tree-layer name="{layer_id}" id="{layer_id}" checked="Qt::Checked"/>'
+        for layer_id in ("m1", "m2", "m3")
+    )
+    maplayers = "".join(
+        f'<maplayer type="vector" geometry="Point"><id>{layer_id}</id>'
+        "<datasource>Point?crs=EPSG:4326</datasource>"
+        f"<layername>{layer_id}</layername>"
+        '<provider encoding="UTF-8">memory</provider></maplayer>'
+        for layer_id in ("m0", "m1", "m2", "m3")
+    )
+    path.write_text(
+        "<!DOCTYPE qgis PUBLIC 'http://mrcc.com/qgis.dtd' 'SYSTEM'>"
+        f'<qgis version="3.34.0"><title>{path.stem}</title>'
+        f'<layer-tree-group><layer-tree-group name="Group">{layers}</layer-tree-group>'
+        '<layer-tree-layer name="m0" id="m0" checked="Qt::Checked"/>'
+        f"</layer-tree-group><projectlayers>{maplayers}</projectlayers><relations/>"
+        '<properties><Paths><Absolute type="bool">false</Absolute></Paths>'
+        "</properties></qgis>",
+        encoding="UTF-8",
+    )
+
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class FakeIface:
+    """QGIS interface providing the widgets and the profile used by the plugin"""
+
+    def __init__(self, profile_folder: str):
+        self.profile_folder = profile_folder
+        self.main_window = QMainWindow()
+        self.edit_menu = self.main_window.menuBar().addMenu("Edit")
+        self.add_layer_menu = QMenu("Add layer", self.main_window)
+        self.canvas = QgsMapCanvas()
+
+    def mainWindow(self) -> QMainWindow:
+        return self.main_window
+
+    def mapCanvas(self) -> QgsMapCanvas:
+        return self.canvas
+
+    def editMenu(self) -> QMenu:
+        return self.edit_menu
+
+    def addLayerMenu(self) -> QMenu:
+        return self.add_layer_menu
+
+    def userProfileManager(self):
+        return self
+
+    def userProfile(self):
+        return self
+
+    def folder(self) -> str:
+        return self.profile_folder
+
+
+class RecordingLoader:
+    """Layer loader recording loaded layer ids and their menu"""
+
+    def __init__(self):
+        self.loads = []
+
+    def loadLayer(self, uri, fileName, layerId, menu=None, visible=None, expanded=None):
+        self.loads.append((layerId, menu))
+
+    def loadLayers(self, layers, menu=None):
+        self.loads.append(([layer.layer_id for layer in layers], menu))
+
+
+class TestMenuFromProject(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        QgsSettings().setValue("locale/userLocale", "en_US")
+        CacheManager._index = None
+        CacheManager._metadata = {}
+        PlgOptionsManager._plg_settings = PlgSettingsStructure(optionTooltip=True)
+
+        self.iface = FakeIface(str(self.tmp_dir))
+        with patch("menu_from_project.logic.layer_load.iface", self.iface):
+            self.plugin = MenuFromProject(self.iface)
+
+    def tearDown(self):
+        self.plugin.remove_menus()
+        QgsProject.instance().clear()
+        CacheManager._index = None
+        CacheManager._metadata = {}
+        PlgOptionsManager.invalidate_plg_settings()
+        shutil.rmtree(self.tmp_dir)
+
+    def build_memory_project_menu(self) -> QMenu:
+        """Build the menu of a project of memory layers
+
+        :return: project menu
+        :rtype: QMenu
+        """
+        path = self.tmp_dir / "memory.qgs"
+        write_memory_project(path)
+        project = {"file": str(path), "name": "memory", "location": "new"}
+        project_config = get_project_menu_config(project, QgsDomManager())
+        self.plugin.project_configs = [(project, project_config)]
+        self.plugin.update_menus(changed_indexes=set())
+        return self.plugin.hosts[0].menu
+
+    def test_lazy_group_menu(self):
+        """Group menus are populated when first shown"""
+        PlgOptionsManager._plg_settings.optionLoadAll = True
+        menu = self.build_memory_project_menu()
+        entries = self.plugin.hosts[0].entries
+        group_menu = menu.actions()[0].menu()
+        self.assertTrue(group_menu.isEmpty())
+        self.assertEqual(len(entries), 1)
+
+        for _ in range(2):
+            group_menu.aboutToShow.emit()
+            self.assertEqual(
+                [action.text() for action in group_menu.actions()],
+                ["m1", "m2", "m3", "Load all"],
+            )
+        self.assertEqual(
+            [action.data() for action in group_menu.actions()], [1, 2, 3, 4]
+        )
+        self.assertEqual(len(entries), 5)
+
+    def test_parallel_project_loads(self):
+        """Projects are loaded in tasks, up to the maximum number of parallel loads,
+        and menus are added in configured order"""
+        PlgOptionsManager._plg_settings.max_parallel_loads = 2
+        projects = []
+        for name in ("first", "second", "third"):
+            path = self.tmp_dir / f"{name}.qgs"
+            write_memory_project(path)
+            projects.append({"file": str(path), "name": name, "location": "new"})
+
+        self.plugin.project_configs = [(project, None) for project in projects]
+        self.plugin.pending_indexes = {0, 1, 2}
+        self.plugin.load_queue = deque([0, 1, 2])
+        self.plugin.start_project_loads()
+        self.assertEqual(sorted(self.plugin.load_tasks), [0, 1])
+        self.assertEqual(list(self.plugin.load_queue), [2])
+
+        deadline = time.monotonic() + 30
+        while self.plugin.load_tasks and time.monotonic() < deadline:
+            self.assertLessEqual(len(self.plugin.load_tasks), 2)
+            QCoreApplication.processEvents()
+
+        self.assertFalse(self.plugin.load_queue)
+        self.assertFalse(self.plugin.pending_indexes)
+        self.assertTrue(all(config for _, config in self.plugin.project_configs))
+        self.assertEqual(
+            [host.menu.title() for host in self.plugin.hosts],
+            ["&first", "&second", "&third"],
+        )
+
+    def test_canceled_project_loads(self):
+        """Canceled loads are counted as running until they end, and their project
+        is not read again meanwhile"""
+        PlgOptionsManager._plg_settings.max_parallel_loads = 2
+        projects = []
+        for name in ("first", "second", "third"):
+            path = self.tmp_dir / f"{name}.qgs"
+            write_memory_project(path)
+            projects.append({"file": str(path), "name": name, "location": "new"})
+
+        self.plugin.project_configs = [(project, None) for project in projects]
+        self.plugin.pending_indexes = {0, 1, 2}
+        self.plugin.load_queue = deque([0, 1, 2])
+        self.plugin.start_project_loads()
+        self.plugin.cancel_project_loads()
+        self.assertFalse(self.plugin.load_tasks)
+        self.assertEqual(len(self.plugin.canceled_loads), 2)
+
+        # menus update queuing the same projects again
+        self.plugin.pending_indexes = {0, 1, 2}
+        self.plugin.load_queue = deque([0, 1, 2])
+        self.plugin.start_project_loads()
+        self.assertFalse(self.plugin.load_tasks)
+
+        deadline = time.monotonic() + 30
+        while (
+            self.plugin.load_tasks
+            or self.plugin.canceled_loads
+            or self.plugin.load_queue
+        ) and time.monotonic() < deadline:
+            self.assertLessEqual(
+                len(self.plugin.load_tasks) + len(self.plugin.canceled_loads), 2
+            )
+            canceled_files = set(self.plugin.canceled_loads.values())
+            for index in self.plugin.load_tasks:
+                self.assertNotIn(projects[index]["file"], canceled_files)
+            QCoreApplication.processEvents()
+
+        self.assertFalse(self.plugin.pending_indexes)
+        self.assertTrue(all(config for _, config in self.plugin.project_configs))
+
+    def wait_project_loads(self) -> None:
+        """Process events until all project load tasks are ended"""
+        deadline = time.monotonic() + 30
+        while (
+            self.plugin.load_tasks
+            or self.plugin.canceled_loads
+            or self.plugin.load_queue
+        ) and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+        self.assertFalse(self.plugin.load_tasks)
+
+    def test_cache_background_refresh(self):
+        """Menus are built from cache at once, then replaced when the changed project
+        is loaded in background"""
+        path = self.tmp_dir / "memory.qgs"
+        write_memory_project(path)
+        PlgOptionsManager._plg_settings.projects = [
+            {"file": str(path), "name": "memory", "location": "new"}
+        ]
+        self.plugin.initMenus()
+        self.wait_project_loads()
+        self.plugin.remove_menus()
+
+        # project changes while QGIS is closed
+        path.write_text(
+            path.read_text(encoding="UTF-8").replace('name="Group"', 'name="Changed"'),
+            encoding="UTF-8",
+        )
+        mtime = path.stat().st_mtime + 10
+        os.utime(path, (mtime, mtime))
+
+        with patch("menu_from_project.logic.layer_load.iface", self.iface):
+            self.plugin = MenuFromProject(self.iface)
+        self.plugin.initMenus()
+        # project is checked in background
+        self.assertEqual(
+            list(self.plugin.load_tasks) + list(self.plugin.load_queue), [0]
+        )
+        cached_menu = self.plugin.hosts[0].menu
+        self.assertEqual(cached_menu.actions()[0].text(), "Group")
+
+        self.wait_project_loads()
+        menu = self.plugin.hosts[0].menu
+        self.assertIsNot(menu, cached_menu)
+        self.assertEqual(menu.actions()[0].text(), "Changed")
+
+    def test_menus_update_requests(self):
+        """Menus update requests received within the update delay are coalesced"""
+        with patch.object(
+            self.plugin, "update_menus", wraps=self.plugin.update_menus
+        ) as update_menus:
+            for _ in range(3):
+                self.plugin.request_menus_update()
+                QCoreApplication.processEvents()
+            self.assertFalse(update_menus.called)
+
+            deadline = time.monotonic() + (MENUS_UPDATE_DELAY * 5) / 1000
+            while time.monotonic() < deadline:
+                QCoreApplication.processEvents()
+            update_menus.assert_called_once()
+
+    def test_menus_update(self):
+        """Only added, renamed or not loaded projects are loaded on menus update,
+        only projects not cached are read and menus follow configured order"""
+        PlgOptionsManager._plg_settings.cache_background_refresh = False
+        projects = {}
+        for name in ("first", "second", "third"):
+            path = self.tmp_dir / f"{name}.qgs"
+            write_memory_project(path)
+            projects[name] = {"file": str(path), "name": name, "location": "new"}
+
+        loaded, read = [], []
+        load_project_config = self.plugin.load_project_config
+        read_project_config = self.plugin.read_project_config
+
+        def record_load(task, project, cached_config):
+            loaded.append(project["name"])
+            return load_project_config(task, project, cached_config)
+
+        def record_read(project, *args):
+            read.append(project["name"])
+            return read_project_config(project, *args)
+
+        self.plugin.load_project_config = record_load
+        self.plugin.read_project_config = record_read
+
+        menu_bar = self.plugin.get_menu_bar("new")
+        steps = (
+            ("initial", ["first", "second"], ["first", "second"], ["first", "second"]),
+            ("unchanged", ["first", "second"], [], []),
+            ("added", ["first", "second", "third"], ["third"], ["third"]),
+            ("reordered", ["third", "first", "second"], [], []),
+            ("renamed", ["third", "renamed", "second"], ["renamed"], []),
+            ("removed", ["third", "renamed"], [], []),
+        )
+        for step, names, expected_loaded, expected_read in steps:
+            with self.subTest(step=step):
+                loaded.clear()
+                read.clear()
+                previous_menus = {
+                    host.menu.title(): host.menu for host in self.plugin.hosts
+                }
+                PlgOptionsManager._plg_settings.projects = [
+                    (
+                        dict(projects["first"], name=name)
+                        if name == "renamed"
+                        else projects[name]
+                    )
+                    for name in names
+                ]
+                self.plugin.initMenus()
+                self.wait_project_loads()
+
+                self.assertEqual(sorted(loaded), sorted(expected_loaded))
+                self.assertEqual(sorted(read), sorted(expected_read))
+                titles = [f"&{name}" for name in names]
+                self.assertEqual(
+                    [host.menu.title() for host in self.plugin.hosts], titles
+                )
+                self.assertEqual(
+                    [
+                        action.text()
+                        for action in menu_bar.actions()
+                        if action.text() != "Edit"
+                    ],
+                    titles,
+                )
+                # menus of projects not loaded again are kept
+                for host in self.plugin.hosts:
+                    name = host.menu.title()[1:]
+                    if name not in expected_loaded and f"&{name}" in previous_menus:
+                        self.assertIs(host.menu, previous_menus[f"&{name}"])
+
+    def test_load_all_order(self):
+        """Layers loaded in one batch by "Load all" are in the same order as layers
+        loaded one by one from the last to the first"""
+        PlgOptionsManager._plg_settings.optionLoadAll = True
+        PlgOptionsManager._plg_settings.optionCreateGroup = True
+        menu = self.build_memory_project_menu()
+        group_menu = menu.actions()[0].menu()
+        group_menu.aboutToShow.emit()
+        *layer_actions, load_all_action = group_menu.actions()
+
+        load_all_action.trigger()
+        group = QgsProject.instance().layerTreeRoot().findGroup("Group")
+        batch_names = [child.name() for child in group.children()]
+        self.assertEqual(batch_names, ["m1", "m2", "m3"])
+        self.assertEqual(len(QgsProject.instance().mapLayers()), 3)
+
+        QgsProject.instance().clear()
+        for action in reversed(layer_actions):
+            action.trigger()
+        group = QgsProject.instance().layerTreeRoot().findGroup("Group")
+        self.assertEqual([child.name() for child in group.children()], batch_names)
+
+    def test_load_all_without_group(self):
+        """Without layer tree group, layers loaded by "Load all" are read by the
+        project as layers loaded one by one"""
+        PlgOptionsManager._plg_settings.optionLoadAll = True
+        PlgOptionsManager._plg_settings.optionCreateGroup = False
+        menu = self.build_memory_project_menu()
+        group_menu = menu.actions()[0].menu()
+        group_menu.aboutToShow.emit()
+        *layer_actions, load_all_action = group_menu.actions()
+        root = QgsProject.instance().layerTreeRoot()
+
+        load_all_action.trigger()
+        batch_names = [child.name() for child in root.children()]
+        self.assertEqual(sorted(batch_names), ["m1", "m2", "m3"])
+
+        QgsProject.instance().clear()
+        for action in layer_actions:
+            action.trigger()
+        self.assertEqual([child.name() for child in root.children()], batch_names)
+
+    def test_menu_action_dispatch(self):
+        """Actions of all submenus are dispatched by the project menu, "Load all"
+        actions load layers of their group in one call"""
+        PlgOptionsManager._plg_settings.optionLoadAll = True
+        loader = RecordingLoader()
+        self.plugin.layer_loader = loader
+
+        menu = self.build_memory_project_menu()
+        group_action, m0_action = menu.actions()
+        group_menu = group_action.menu()
+        group_menu.aboutToShow.emit()
+        m1_action, m2_action, m3_action, load_all_action = group_menu.actions()
+
+        m2_action.trigger()
+        m0_action.trigger()
+        load_all_action.trigger()
+        group_action.trigger()
+
+        self.assertEqual(
+            loader.loads,
+            [
+                ("m2", group_menu),
+                ("m0", menu),
+                (["m1", "m2", "m3"], group_menu),
+            ],
+        )
+
+    def test_layer_metadata_read_on_hover(self):
+        """Metadata of layers decoded from cache are read when a layer is hovered"""
+        filename = str(Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz")
+        project = {"file": filename, "name": "aeag", "location": "new"}
+        project_config = get_project_menu_config(project, QgsDomManager())
+        cache_manager = CacheManager(self.iface)
+        cache_manager.save_project_menu_config(project, project_config)
+
+        CacheManager._index = None
+        CacheManager._metadata = {}
+        cached_config = cache_manager.get_project_menu_config(
+            project, check_fingerprint=False
+        )
+        layer = cached_config.root_group.childs[0]
+        self.assertIsNotNone(layer.metadata_key)
+        self.assertEqual(layer.metadata_title, "")
+
+        self.plugin.project_configs = [(project, cached_config)]
+        self.plugin.update_menus(changed_indexes=set())
+        action = self.plugin.hosts[0].menu.actions()[0]
+
+        action.hover()
+        self.assertIsNone(layer.metadata_key)
+        self.assertEqual(layer, project_config.root_group.childs[0])
+        expected = project_config.root_group.childs[0]
+        self.assertEqual(
+            action.toolTip(),
+            f"<b>{expected.metadata_title}</b><br/>{expected.metadata_abstract}",
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
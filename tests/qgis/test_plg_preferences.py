@@ -0,0 +1,53 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.qgis.test_plg_preferences
+        # for specific test
+        python -m unittest tests.qgis.test_plg_preferences.TestPlgPreferences.test_settings_kept_until_save
+"""
+
+# standard library
+from copy import deepcopy
+
+# PyQGIS
+from qgis.testing import start_app, unittest
+
+from menu_from_project.toolbelt.preferences import PlgOptionsManager
+
+start_app()
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestPlgPreferences(unittest.TestCase):
+    def setUp(self):
+        PlgOptionsManager.invalidate_plg_settings()
+        self.initial_settings = deepcopy(PlgOptionsManager.get_plg_settings())
+
+    def tearDown(self):
+        PlgOptionsManager.save_from_object(self.initial_settings)
+
+    def test_settings_kept_until_save(self):
+        """Settings are read once and read again after save"""
+        settings = PlgOptionsManager.get_plg_settings()
+        self.assertIs(PlgOptionsManager.get_plg_settings(), settings)
+
+        new_settings = deepcopy(settings)
+        new_settings.optionLoadAll = not settings.optionLoadAll
+        PlgOptionsManager.save_from_object(new_settings)
+
+        saved_settings = PlgOptionsManager.get_plg_settings()
+        self.assertIsNot(saved_settings, settings)
+        self.assertEqual(saved_settings.optionLoadAll, new_settings.optionLoadAll)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,8 @@
 """
 
 # standard library
+import shutil
+import tempfile
 
 # PyQGIS
 from qgis.testing import unittest
@@ -22,9 +24,57 @@ from menu_from_project.datamodel.project_config import (
     MenuGroupConfig,
     MenuLayerConfig,
 )
-from menu_from_project.logic.project_read import get_project_menu_config
+from menu_from_project.logic.project_read import (
+    get_group_menu_config,
+    get_project_menu_config,
+)
 from menu_from_project.logic.qgs_manager import QgsDomManager
 
+# ############################################################################
+# ########## Functions #############
+# ################################
+
+
+def embedded_group(name: str, project: str, layer_ids: list) -> str:
+    layers = "".join(
+        f'<layer-tree-layer name="{layer_id}" id="{layer_id}" checked="Qt::Checked">'
+        '<customproperties><property key="embedded" value="1"/></customproperties>'
+        "</layer-tree-layer>"
+        for layer_id in layer_ids
+    )
+    return (
+        f'<layer-tree-group name="{name}" checked="Qt::Checked" expanded="1">'
+        '<customproperties><Option type="Map">'
+        '<Option name="embedded" value="1" type="QString"/>'
+        f'<Option name="embedded_project" value="./{project}" type="QString"/>'
+        f"</Option></customproperties>{layers}</layer-tree-group>"
+    )
+
+
+def local_group(name: str, layer_ids: list, childs: str = "") -> str:
+    layers = "".join(
+        f'<layer-tree-layer name="{layer_id}" id="{layer_id}" checked="Qt::Checked"/>'
+        for layer_id in layer_ids
+    )
+    return f'<layer-tree-group name="{name}">{childs}{layers}</layer-tree-group>'
+
+
+def write_project(path: Path, tree: str, layer_ids: list) -> None:
+    maplayers = "".join(
+        f'<maplayer type="vector" geometry="Point"><id>{layer_id}</id>'
+        f"<title>{layer_id} title</title></maplayer>"
+        for layer_id in layer_ids
+    )
+    path.write_text(
+        "<!DOCTYPE qgis PUBLIC 'http://mrcc.com/qgis.dtd' 'SYSTEM'>"
+        f'<qgis version="3.34.0"><title>{path.stem}</title>'
+        f"<layer-tree-group>{tree}</layer-tree-group>"
+        f"<projectlayers>{maplayers}</projectlayers><relations/>"
+        '<properties><Paths><Absolute type="bool">false</Absolute></Paths>'
+        "</properties></qgis>",
+        encoding="UTF-8",
+    )
+
 
 # ############################################################################
 # ########## Classes #############
@@ -109,6 +159,106 @@ class TestProjectMenuConfig(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_get_project_menu_config_canceled(self):
+        """Canceled reads return no configuration, cancelation is checked per group"""
+        filename = str(Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz")
+        project = {
+            "file": filename,
+            "name": "test_import",
+        }
+
+        checks = []
+
+        def is_canceled() -> bool:
+            checks.append(True)
+            return len(checks) > 1
+
+        for canceled in (lambda: True, is_canceled):
+            result = get_project_menu_config(
+                project=project,
+                qgs_dom_manager=QgsDomManager(),
+                is_canceled=canceled,
+            )
+            self.assertIsNone(result)
+        self.assertEqual(len(checks), 2)
+
+
+class TestEmbeddedProjects(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        # main project embeds groups of first and second projects, first project
+        # embeds a group of third project, and has another group, not used by main
+        # project, embedding a group of a missing project
+        write_project(
+            self.tmp_dir / "main.qgs",
+            embedded_group("First", "first.qgs", ["f1"])
+            + embedded_group("Second", "second.qgs", ["s1"])
+            + local_group("Local", ["m1"]),
+            ["m1"],
+        )
+        write_project(
+            self.tmp_dir / "first.qgs",
+            local_group("First", ["f1", "f2"], embedded_group("Third", "third.qgs", []))
+            + local_group("Other", [], embedded_group("Unused", "unused.qgs", [])),
+            ["f1", "f2"],
+        )
+        write_project(
+            self.tmp_dir / "second.qgs", local_group("Second", ["s1"]), ["s1"]
+        )
+        write_project(self.tmp_dir / "third.qgs", local_group("Third", ["t1"]), ["t1"])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_prefetched_embedded_projects(self):
+        """Embedded projects scanned concurrently give the same configuration as
+        embedded projects scanned when needed"""
+        uri = str(self.tmp_dir / "main.qgs")
+        qgs_dom_manager = QgsDomManager()
+        prefetched = get_project_menu_config(
+            project={"file": uri, "name": "main"}, qgs_dom_manager=qgs_dom_manager
+        )
+        # main project and its 3 embedded projects, projects embedded by groups
+        # not used by main project are not scanned
+        self.assertEqual(
+            sorted(Path(uri).name for uri in qgs_dom_manager.scans),
+            ["first.qgs", "main.qgs", "second.qgs", "third.qgs"],
+        )
+
+        qgs_dom_manager = QgsDomManager()
+        scan, filename = qgs_dom_manager.getProjectScan(uri)
+        sequential = MenuProjectConfig(
+            project_name="main",
+            filename=filename,
+            uri=uri,
+            root_group=get_group_menu_config(
+                node=scan.layer_tree,
+                maplayer_dict=scan.maplayers,
+                qgs_dom_manager=qgs_dom_manager,
+                init_filename=filename,
+                absolute_project=scan.absolute,
+            ),
+        )
+        self.assertEqual(prefetched, sequential)
+
+        first, second, local = prefetched.root_group.childs
+        self.assertEqual(
+            [child.name for child in first.childs], ["Third", "f1", "f2", "f1"]
+        )
+        self.assertEqual(first.childs[0].childs[0].title, "t1 title")
+        self.assertEqual([child.title for child in second.childs], ["s1 title"] * 2)
+        self.assertEqual(local.childs[0].title, "m1 title")
+
+    def test_missing_embedded_project(self):
+        """A missing embedded project fails the configuration read, as when embedded
+        projects are scanned when needed"""
+        (self.tmp_dir / "second.qgs").unlink()
+        with self.assertRaises(Exception):
+            get_project_menu_config(
+                project={"file": str(self.tmp_dir / "main.qgs"), "name": "main"},
+                qgs_dom_manager=QgsDomManager(),
+            )
+
 
 # ############################################################################
 # ####### Stand-alone run ########
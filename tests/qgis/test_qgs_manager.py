@@ -0,0 +1,116 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.qgis.test_qgs_manager
+        # for specific test
+        python -m unittest tests.qgis.test_qgs_manager.TestQgsDomManager.test_document_budget
+"""
+
+# standard library
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# PyQGIS
+from qgis.testing import unittest
+
+from menu_from_project.logic import qgs_manager
+from menu_from_project.logic.qgs_manager import QgsDomManager, read_from_file
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestQgsDomManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filenames = []
+        for name in ("first.qgz", "second.qgz"):
+            filename = str(Path(self.tmp_dir) / name)
+            shutil.copy(
+                Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz", filename
+            )
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_document_budget(self):
+        """Least recently used documents are removed over budget, others are kept"""
+        first, second = self.filenames
+        qgs_dom_manager = QgsDomManager(max_document_bytes=1)
+
+        qgs_dom_manager.getMapLayerIndex(first)
+        doc, project_path = qgs_dom_manager.getQgsDoc(second)
+        self.assertEqual(project_path, second)
+        self.assertEqual(list(qgs_dom_manager.docs), [second])
+        self.assertNotIn(first, qgs_dom_manager.layer_indexes)
+
+        self.assertIs(qgs_dom_manager.getQgsDoc(second)[0], doc)
+        self.assertEqual(qgs_dom_manager.docs.evictions, 1)
+        self.assertEqual(qgs_dom_manager.docs.hits, 1)
+
+    def test_map_layer_index(self):
+        """Maplayer nodes are found in an index built once per document"""
+        first = self.filenames[0]
+        layer_id = "L35ecffe715c74f15bec52340aa3c9e3f"
+        qgs_dom_manager = QgsDomManager()
+
+        with patch.object(
+            qgs_manager,
+            "create_map_layer_dict",
+            wraps=qgs_manager.create_map_layer_dict,
+        ) as create_map_layer_dict:
+            node = qgs_dom_manager.getMapLayerDomFromQgs(first, layer_id)
+            self.assertIsNone(qgs_dom_manager.getMapLayerDomFromQgs(first, "missing"))
+            create_map_layer_dict.assert_called_once()
+
+        self.assertEqual(node.nodeName(), "maplayer")
+        self.assertEqual(node.namedItem("id").toElement().text(), layer_id)
+        self.assertEqual(
+            sorted(qgs_dom_manager.getMapLayerIndex(first)),
+            [
+                "L35ecffe715c74f15bec52340aa3c9e3f",
+                "L8150cde67501427eade1e787479c2f70",
+                "Lbd28399787e349488c2f7bb0298b370d",
+            ],
+        )
+
+    def test_read_qgz_in_memory(self):
+        """Project document of a .qgz file is read without extracting the archive"""
+        first = self.filenames[0]
+        with patch("zipfile.ZipFile.extract") as extract, patch(
+            "zipfile.ZipFile.extractall"
+        ) as extractall:
+            doc = read_from_file(first)
+        extract.assert_not_called()
+        extractall.assert_not_called()
+
+        self.assertEqual(doc.documentElement().tagName(), "qgis")
+        self.assertEqual(
+            sorted(path.name for path in Path(self.tmp_dir).iterdir()),
+            ["first.qgz", "second.qgz"],
+        )
+
+    def test_clear(self):
+        """Cleared manager reads documents again"""
+        qgs_dom_manager = QgsDomManager()
+        qgs_dom_manager.getMapLayerIndex(self.filenames[0])
+        qgs_dom_manager.getProjectScan(self.filenames[0])
+
+        qgs_dom_manager.clear()
+        self.assertEqual(len(qgs_dom_manager.docs), 0)
+        self.assertEqual(len(qgs_dom_manager.layer_indexes), 0)
+        self.assertEqual(len(qgs_dom_manager.scans), 0)
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.unit.test_document_cache
+        # for specific test
+        python -m unittest tests.unit.test_document_cache.TestDocumentCache.test_eviction
+"""
+
+# standard library
+import unittest
+
+# project
+from menu_from_project.logic.document_cache import DocumentCache
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestDocumentCache(unittest.TestCase):
+    def test_eviction(self):
+        """Least recently used documents are evicted over budget"""
+        cache = DocumentCache(max_bytes=100)
+        self.assertEqual(cache.put("first", "doc1", 40), [])
+        self.assertEqual(cache.put("second", "doc2", 40), [])
+        self.assertEqual(cache.get("first"), "doc1")
+
+        self.assertEqual(cache.put("third", "doc3", 40), ["second"])
+        self.assertEqual(list(cache), ["first", "third"])
+        self.assertEqual(cache.total_bytes, 80)
+
+    def test_document_over_budget(self):
+        """Last stored document is kept, even over budget"""
+        cache = DocumentCache(max_bytes=100)
+        cache.put("first", "doc1", 40)
+        self.assertEqual(cache.put("big", "doc2", 400), ["first"])
+        self.assertEqual(cache.get("big"), "doc2")
+
+    def test_counters(self):
+        """Hits, misses and evictions are counted"""
+        cache = DocumentCache(max_bytes=10)
+        self.assertIsNone(cache.get("first"))
+        cache.put("first", "doc1", 10)
+        cache.get("first")
+        cache.put("second", "doc2", 10)
+        cache.put("second", "doc2", 5)
+
+        self.assertEqual(
+            cache.stats(),
+            {"documents": 1, "bytes": 5, "hits": 1, "misses": 1, "evictions": 1},
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
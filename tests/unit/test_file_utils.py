@@ -0,0 +1,63 @@
+#! python3  # noqa E265
+
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+        # for whole tests
+        python -m unittest tests.unit.test_file_utils
+        # for specific test
+        python -m unittest tests.unit.test_file_utils.TestFileUtils.test_write_file_atomically
+"""
+
+# standard library
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# project
+from menu_from_project.logic.file_utils import write_file_atomically
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestFileUtils(unittest.TestCase):
+    """Test atomic file writes"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write_file_atomically(self):
+        """File is written in created folders, without remaining temporary file"""
+        path = self.tmp_dir / "cache" / "index.bin"
+        write_file_atomically(path, b"first")
+        write_file_atomically(path, b"second")
+
+        self.assertEqual(path.read_bytes(), b"second")
+        self.assertEqual(list(path.parent.iterdir()), [path])
+
+    def test_interrupted_write(self):
+        """Previous content is kept when the file can't be replaced"""
+        path = self.tmp_dir / "index.bin"
+        write_file_atomically(path, b"first")
+
+        with patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_file_atomically(path, b"second")
+
+        self.assertEqual(path.read_bytes(), b"first")
+        self.assertEqual(list(path.parent.iterdir()), [path])
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
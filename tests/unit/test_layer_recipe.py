@@ -0,0 +1,158 @@
+#! python3  # noqa E265
+
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+        # for whole tests
+        python -m unittest tests.unit.test_layer_recipe
+        # for specific test
+        python -m unittest tests.unit.test_layer_recipe.TestLayerRecipe.test_layer_ids
+"""
+
+# standard library
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from xml.dom import minidom
+
+# project
+from menu_from_project.logic.layer_recipe import LayerRecipeStore
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+SAMPLE_QGS = b"""<!DOCTYPE qgis PUBLIC 'http://mrcc.com/qgis.dtd' 'SYSTEM'>
+<qgis projectname="" version="3.34.0">
+  <trust active="0"/>
+  <layer-tree-group/>
+  <projectlayers>
+    <maplayer type="vector" geometry="Polygon">
+      <id>region</id>
+      <datasource>./region.gpkg</datasource>
+    </maplayer>
+    <maplayer type="vector" geometry="Point">
+      <id>city</id>
+      <vectorjoins>
+        <join joinLayerId="population"/>
+      </vectorjoins>
+    </maplayer>
+    <maplayer type="vector">
+      <id>population</id>
+    </maplayer>
+    <maplayer type="raster">
+      <id>dem</id>
+    </maplayer>
+  </projectlayers>
+  <relations>
+    <relation referencedLayer="region" referencingLayer="city" id="fk_region">
+      <fieldRef referencedField="id" referencingField="region_id"/>
+    </relation>
+  </relations>
+  <properties>
+    <Paths>
+      <Absolute type="bool">true</Absolute>
+    </Paths>
+  </properties>
+</qgis>
+"""
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestLayerRecipe(unittest.TestCase):
+    """Test layer load recipes"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.filename = str(self.tmp_dir / "sample.qgs")
+        Path(self.filename).write_bytes(SAMPLE_QGS)
+        self.store = LayerRecipeStore(self.tmp_dir / "recipes")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_layer_ids(self):
+        """Joined layers and referencing layers are needed to load a layer"""
+        self.assertIsNone(self.store.get_layer_ids(self.filename, ["region"]))
+
+        self.store.scan_project(self.filename)
+        self.assertEqual(
+            self.store.get_layer_ids(self.filename, ["region"]),
+            {"region", "city", "population"},
+        )
+        self.assertEqual(self.store.get_layer_ids(self.filename, ["dem"]), {"dem"})
+        self.assertIsNone(self.store.get_layer_ids(self.filename, ["unknown"]))
+
+    def test_document_content(self):
+        """Document contains project properties, relations and requested layers"""
+        self.store.scan_project(self.filename)
+        content = self.store.get_document_content(self.filename, ["city", "dem"])
+
+        doc = minidom.parseString(content)
+        self.assertEqual(
+            [
+                node.getElementsByTagName("id")[0].firstChild.data
+                for node in doc.getElementsByTagName("maplayer")
+            ],
+            ["city", "dem"],
+        )
+        self.assertEqual(
+            doc.getElementsByTagName("datasource"), [], "region is not copied"
+        )
+        self.assertEqual(len(doc.getElementsByTagName("relation")), 1)
+        self.assertEqual(
+            doc.getElementsByTagName("Absolute")[0].firstChild.data, "true"
+        )
+        self.assertEqual(
+            doc.getElementsByTagName("trust")[0].getAttribute("active"), "0"
+        )
+
+    def test_changed_qgs(self):
+        """Elements located in a .qgs file are not used once the file changed"""
+        self.store.scan_project(self.filename)
+        # elements of .qgs files are not copied
+        self.assertLess(
+            self.store.get_recipes_path(self.filename).stat().st_size,
+            len(SAMPLE_QGS),
+        )
+
+        with open(self.filename, "ab") as f:
+            f.write(b"\n")
+        self.assertIsNone(self.store.get_document_content(self.filename, ["dem"]))
+
+    def test_scan_qgz(self):
+        """Recipes of sample project from .qgz archive"""
+        filename = str(Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz")
+        scan = self.store.scan_project(filename)
+
+        content = self.store.get_document_content(filename, scan.maplayers)
+        doc = minidom.parseString(content)
+        self.assertEqual(len(doc.getElementsByTagName("maplayer")), len(scan.maplayers))
+
+    def test_changed_qgz(self):
+        """Elements copied from a .qgz archive are not used once the archive changed"""
+        filename = str(self.tmp_dir / "aeag-tiny.qgz")
+        shutil.copyfile(
+            Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz", filename
+        )
+        scan = self.store.scan_project(filename)
+        layer_id = next(iter(scan.maplayers))
+        self.assertIsNotNone(self.store.get_document_content(filename, [layer_id]))
+
+        stat = os.stat(filename)
+        os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(self.store.get_layer_ids(filename, [layer_id]))
+        self.assertIsNone(self.store.get_document_content(filename, [layer_id]))
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.unit.test_project_diff
+        # for specific test
+        python -m unittest tests.unit.test_project_diff.TestProjectDiff.test_renamed
+"""
+
+# standard library
+import unittest
+
+# project
+from menu_from_project.logic.project_diff import match_projects
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+def project(file: str, name: str, location: str = "new") -> dict:
+    return {"file": file, "name": name, "location": location, "type_storage": "file"}
+
+
+class TestProjectDiff(unittest.TestCase):
+    def setUp(self):
+        self.previous = [
+            project("a.qgs", "A"),
+            project("b.qgs", "B"),
+            project("c.qgs", "C", "merge"),
+        ]
+
+    def test_unchanged(self):
+        self.assertEqual(match_projects(self.previous, self.previous), [0, 1, 2])
+
+    def test_added_removed_reordered(self):
+        projects = [
+            project("c.qgs", "C", "layer"),
+            project("d.qgs", "D"),
+            project("a.qgs", "A"),
+        ]
+        self.assertEqual(match_projects(self.previous, projects), [2, None, 0])
+
+    def test_renamed(self):
+        projects = [project("a.qgs", "A"), project("b.qgs", "Renamed")]
+        self.assertEqual(match_projects(self.previous, projects), [0, 1])
+
+    def test_same_file(self):
+        previous = [project("a.qgs", "First"), project("a.qgs", "Second")]
+        projects = [project("a.qgs", "Other"), project("a.qgs", "First")]
+        self.assertEqual(match_projects(previous, projects), [1, 0])
+        self.assertEqual(match_projects(previous, projects * 2), [1, 0, None, None])
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
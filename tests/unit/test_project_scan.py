@@ -0,0 +1,208 @@
+#! python3  # noqa E265
+
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+        # for whole tests
+        python -m unittest tests.unit.test_project_scan
+        # for specific test
+        python -m unittest tests.unit.test_project_scan.TestProjectScan.test_scan_qgz
+"""
+
+# standard library
+import io
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# project
+from menu_from_project.logic import project_scan
+from menu_from_project.logic.project_scan import (
+    LAYER_TREE_GROUP,
+    LAYER_TREE_LAYER,
+    ProjectScanner,
+    scan_project,
+)
+
+# ############################################################################
+# ########## Globals #############
+# ################################
+
+SAMPLE_QGS = b"""<!DOCTYPE qgis PUBLIC 'http://mrcc.com/qgis.dtd' 'SYSTEM'>
+<qgis projectname="" version="3.34.0">
+  <title>Sample project</title>
+  <trust active="1"/>
+  <layer-tree-group>
+    <customproperties>
+      <Option/>
+    </customproperties>
+    <layer-tree-group name="Embedded group" checked="Qt::Checked" expanded="1">
+      <customproperties>
+        <Option type="Map">
+          <Option name="embedded" value="1" type="QString"/>
+          <Option name="embedded_project" value="./master.qgs" type="QString"/>
+        </Option>
+      </customproperties>
+      <layer-tree-layer name="Embedded layer" id="layer_b" checked="Qt::Unchecked">
+        <customproperties>
+          <property key="embedded" value="1"/>
+        </customproperties>
+      </layer-tree-layer>
+    </layer-tree-group>
+    <layer-tree-layer name="Local layer" id="layer_a" checked="Qt::Checked" expanded="0">
+      <customproperties>
+        <Option/>
+      </customproperties>
+    </layer-tree-layer>
+  </layer-tree-group>
+  <projectlayers>
+    <maplayer type="vector" geometry="Polygon">
+      <id>layer_a</id>
+      <title>  </title>
+      <abstract>Layer &amp; abstract</abstract>
+      <resourceMetadata>
+        <title>Metadata title</title>
+        <abstract>Metadata abstract</abstract>
+      </resourceMetadata>
+      <userNotes value="Some&#xa;notes"/>
+      <customproperties>
+        <property key="embedded" value="1"/>
+      </customproperties>
+    </maplayer>
+  </projectlayers>
+  <relations/>
+  <properties>
+    <Paths>
+      <Absolute type="bool">false</Absolute>
+    </Paths>
+  </properties>
+  <Layouts>
+    <Layout name="layout">
+      <layer-tree-group>
+        <layer-tree-layer name="Legend layer" id="layer_a"/>
+      </layer-tree-group>
+    </Layout>
+  </Layouts>
+</qgis>
+"""
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+class TestProjectScan(unittest.TestCase):
+    """Test streaming project scanner"""
+
+    def test_scan_properties(self):
+        """Project properties are read"""
+        scan = ProjectScanner().scan(io.BytesIO(SAMPLE_QGS))
+
+        self.assertEqual(scan.title, "Sample project")
+        self.assertTrue(scan.trusted)
+        self.assertFalse(scan.absolute)
+
+    def test_scan_layer_tree(self):
+        """Only the project layer tree is read, with custom properties of each node"""
+        scan = ProjectScanner().scan(io.BytesIO(SAMPLE_QGS))
+
+        root = scan.layer_tree
+        self.assertEqual(root.tag, LAYER_TREE_GROUP)
+        self.assertEqual(
+            [child.tag for child in root.childs], [LAYER_TREE_GROUP, LAYER_TREE_LAYER]
+        )
+
+        group = root.childs[0]
+        self.assertIs(group.parent, root)
+        self.assertEqual(group.attribute("name"), "Embedded group")
+        self.assertEqual(group.custom_properties["embedded"], "1")
+        self.assertEqual(group.custom_properties["embedded_project"], "./master.qgs")
+
+        embedded_layer = group.childs[0]
+        self.assertEqual(embedded_layer.attribute("id"), "layer_b")
+        self.assertEqual(embedded_layer.custom_properties, {"embedded": "1"})
+
+        local_layer = root.childs[1]
+        self.assertEqual(local_layer.attribute("checked"), "Qt::Checked")
+        self.assertEqual(local_layer.custom_properties, {})
+
+    def test_scan_maplayers(self):
+        """Maplayer metadata are read, maplayer custom properties are ignored"""
+        scan = ProjectScanner().scan(io.BytesIO(SAMPLE_QGS))
+
+        self.assertEqual(list(scan.maplayers), ["layer_a"])
+        maplayer = scan.maplayers["layer_a"]
+        self.assertEqual(maplayer.layer_type, "vector")
+        self.assertEqual(maplayer.geometry, "Polygon")
+        self.assertEqual(maplayer.title, "")
+        self.assertEqual(maplayer.abstract, "Layer & abstract")
+        self.assertEqual(maplayer.metadata_title, "Metadata title")
+        self.assertEqual(maplayer.metadata_abstract, "Metadata abstract")
+        self.assertEqual(maplayer.layer_notes, "Some\nnotes")
+
+    def test_duplicated_maplayer_id(self):
+        """First maplayer of an id is kept, as QDomDocument lookups do"""
+        content = SAMPLE_QGS.replace(
+            b"</projectlayers>",
+            b'<maplayer type="raster"><id>layer_a</id></maplayer></projectlayers>',
+        )
+        scan = ProjectScanner().scan(io.BytesIO(content))
+
+        self.assertEqual(list(scan.maplayers), ["layer_a"])
+        self.assertEqual(scan.maplayers["layer_a"].layer_type, "vector")
+
+    def test_copy_elements(self):
+        """Maplayer and relations elements are copied, whatever the read chunk size"""
+        for chunk_size in (3, 64, project_scan.SCAN_CHUNK_SIZE):
+            with self.subTest(chunk_size=chunk_size), patch.object(
+                project_scan, "SCAN_CHUNK_SIZE", chunk_size
+            ):
+                copy_stream = io.BytesIO()
+                scan = ProjectScanner(copy_stream).scan(io.BytesIO(SAMPLE_QGS))
+
+                maplayer = scan.maplayers["layer_a"]
+                content = copy_stream.getvalue()
+                self.assertEqual(
+                    content[
+                        maplayer.xml_offset : maplayer.xml_offset + maplayer.xml_length
+                    ],
+                    SAMPLE_QGS[
+                        SAMPLE_QGS.index(b"<maplayer ") : SAMPLE_QGS.index(
+                            b"</maplayer>"
+                        )
+                        + len(b"</maplayer>")
+                    ],
+                )
+                self.assertEqual(
+                    content[
+                        scan.relations_xml_offset : scan.relations_xml_offset
+                        + scan.relations_xml_length
+                    ],
+                    b"<relations/>",
+                )
+
+    def test_scan_qgz(self):
+        """Read sample project from .qgz archive"""
+        filename = str(Path(__file__).parent / ".." / "projets" / "aeag-tiny.qgz")
+        scan = scan_project(filename)
+
+        self.assertEqual(
+            [child.attribute("id") for child in scan.layer_tree.childs],
+            [
+                "L8150cde67501427eade1e787479c2f70",
+                "L35ecffe715c74f15bec52340aa3c9e3f",
+                "Lbd28399787e349488c2f7bb0298b370d",
+            ],
+        )
+        self.assertEqual(
+            scan.maplayers["L35ecffe715c74f15bec52340aa3c9e3f"].metadata_title,
+            "Cours d'eau (BD Carthage)",
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+    Usage from the repo root folder:
+
+    .. code-block:: bash
+
+        # for whole tests
+        python -m unittest tests.unit.test_relation_index
+        # for specific test
+        python -m unittest tests.unit.test_relation_index.TestRelationIndex.test_get_relations
+"""
+
+# standard library
+import unittest
+
+# project
+from menu_from_project.logic.relation_index import RelationIndex
+
+# ############################################################################
+# ########## Classes #############
+# ################################
+
+
+def relation(referenced: str, referencing: str) -> dict:
+    return {
+        "strength": "Association",
+        "referencedLayer": referenced,
+        "id": f"{referenced}_{referencing}",
+        "name": f"fk_{referencing}",
+        "referencingLayer": referencing,
+        "referencedField": "id",
+        "referencingField": f"{referenced}_id",
+    }
+
+
+class TestRelationIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RelationIndex(
+            [
+                relation("region", "department"),
+                relation("department", "town"),
+                relation("town", "region"),
+                relation("river", "station"),
+            ]
+        )
+
+    def test_get_relations(self):
+        """Relations are found by referenced and referencing layer"""
+        self.assertEqual(
+            [r["id"] for r in self.index.get_relations(source="department")],
+            ["department_town"],
+        )
+        self.assertEqual(
+            [r["id"] for r in self.index.get_relations(source="town", target="town")],
+            ["town_region", "department_town"],
+        )
+        self.assertEqual(self.index.get_relations(source="station"), [])
+
+    def test_relations_are_copies(self):
+        """Returned relations can be modified without changing the index"""
+        self.index.get_relations(source="river")[0]["referencedLayer"] = "new_id"
+        self.assertEqual(
+            self.index.get_relations(source="river")[0]["referencedLayer"], "river"
+        )
+
+
+# ############################################################################
+# ####### Stand-alone run ########
+# ################################
+if __name__ == "__main__":
+    unittest.main()